@@ -0,0 +1,186 @@
+"""
+Memory / recall / latency benchmark of the knowledge-base collection profiles.
+
+Embeds the corpus and the queries once, then indexes the same vectors into one
+collection per profile (see collection_profiles.COLLECTION_PROFILES) and reports
+per profile:
+
+- memory: estimated Qdrant RAM and disk for the vectors, quantized vectors and HNSW links
+- recall: recall@k against the corpus labels, and overlap@k with the "default" (float32) results
+- latency: p50/p95/p99 of the dense search
+
+Qdrant's local mode (":memory:", the default) searches exactly and ignores HNSW
+and quantization settings, so there only Matryoshka truncation changes the
+results. Pass --url to benchmark every setting against a Qdrant server; the
+collections are then force-indexed so the HNSW graph and quantization are used.
+
+Usage:
+    python -m benchmarks.collection_profiles --output profiles.json
+    python -m benchmarks.collection_profiles --url http://localhost:6333 --profiles default scalar binary matryoshka-256
+"""
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from benchmarks.retrieval_benchmark import (
+    build_corpus, git_commit, load_corpus, percentiles, recall_at_k, unique_doc_ids,
+)
+from src.app_config import app_config
+from src.database_handler.collection_profiles import COLLECTION_PROFILES, get_collection_profile
+
+
+def estimated_memory_mb(profile, points, model_size):
+    """RAM and disk estimate: original vectors, quantized copy (always in RAM) and level-0 HNSW links."""
+    size = profile.vector_size(model_size)
+    vectors = points * size * 4
+    quantized = 0
+    if profile.quantization == "scalar":
+        quantized = points * size
+    elif profile.quantization == "binary":
+        quantized = points * math.ceil(size / 8)
+    links = points * (profile.hnsw_m or 16) * 2 * 4
+    ram = quantized + links + (0 if profile.on_disk else vectors)
+    disk = vectors if profile.on_disk else 0
+    return round(ram / 1024 / 1024, 3), round(disk / 1024 / 1024, 3)
+
+
+def create_handler(url=None):
+    from src.database_handler.qdrant_handler import QdrantHandler
+
+    handler = QdrantHandler()
+    handler.client = QdrantClient(url=url, api_key=app_config.QDRANT_API_KEY) if url else QdrantClient(":memory:")
+    return handler
+
+
+def embed_corpus(handler, documents, queries):
+    """Chunk and embed every document and query once; all profiles index the same vectors."""
+    points = []
+    for doc in documents:
+        for point in handler.chunk_markdown(doc["text"], f"doc-{doc['id']}", ""):
+            point["payload"]["eval_doc_id"] = doc["id"]
+            points.append(point)
+    vectors = handler.get_embeddings([point["payload"]["text"] for point in points])
+    query_vectors = handler.get_query_embeddings([query["query"] for query in queries])
+    return points, vectors, query_vectors
+
+
+def wait_for_index(client, collection_name, timeout=300):
+    """Index even a small benchmark collection, so HNSW and quantization are actually exercised."""
+    client.update_collection(collection_name, optimizers_config=models.OptimizersConfigDiff(indexing_threshold=1))
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+
+
+def index_profile(handler, profile, points, vectors, server, batch_size):
+    collection_name = f"profile_{profile.name.replace('-', '_')}"
+    if handler.client.collection_exists(collection_name):
+        handler.client.delete_collection(collection_name)
+    handler.create_collection(collection_name, hybrid=False, profile=profile)
+    size = handler.vector_dimensions[collection_name]
+    start = time.perf_counter()
+    for offset in range(0, len(points), batch_size):
+        handler.insert_vectors([
+            {"id": point["id"], "vector": handler.fit_vector(vector, size), "payload": point["payload"]}
+            for point, vector in zip(points[offset:offset + batch_size], vectors[offset:offset + batch_size])
+        ], collection_name)
+    if server:
+        wait_for_index(handler.client, collection_name)
+    return collection_name, time.perf_counter() - start
+
+
+def evaluate(handler, collection_name, queries, query_vectors, k, limit):
+    latencies, ranked = [], []
+    recall = 0.0
+    for query, vector in zip(queries, query_vectors):
+        start = time.perf_counter()
+        results = handler.search_vectors(vector, limit=limit, collection_name=collection_name,
+                                         payload_fields=["eval_doc_id"])
+        latencies.append(time.perf_counter() - start)
+        doc_ids = unique_doc_ids(results)
+        ranked.append(doc_ids)
+        recall += recall_at_k(doc_ids, query["relevant"], k)
+    return ranked, round(recall / len(queries), 4), percentiles(latencies)
+
+
+def overlap_at_k(ranked, baseline, k):
+    return round(sum(
+        len(set(doc_ids[:k]) & set(base[:k])) / max(len(base[:k]), 1) for doc_ids, base in zip(ranked, baseline)
+    ) / len(ranked), 4)
+
+
+def main(args):
+    app_config.EMBEDDING_CACHE_SIZE = 0
+    app_config.EMBEDDING_CACHE_BACKEND = None
+    # The profiles of the scratch collections are recorded in a throwaway manifest
+    app_config.INDEX_MANIFEST_PATH = os.path.join(tempfile.mkdtemp(), "index_manifest.json")
+
+    documents, queries = load_corpus(args.corpus) if args.corpus else build_corpus(args.seed)
+    handler = create_handler(args.url)
+    handler.load_models()
+    points, vectors, query_vectors = embed_corpus(handler, documents, queries)
+    model_size = handler.vector_size
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "engine": "server" if args.url else "local",
+        "corpus": args.corpus or f"synthetic(seed={args.seed})",
+        "points": len(points),
+        "queries": len(queries),
+        "embedding": handler.embedding_key,
+        "k": args.k,
+        "profiles": {},
+    }
+    # The default profile is the float32 baseline for overlap@k
+    names = ["default"] + [name for name in args.profiles if name != "default"]
+    baseline = None
+    for name in names:
+        profile = get_collection_profile(name)
+        collection_name, index_seconds = index_profile(handler, profile, points, vectors, bool(args.url), args.batch_size)
+        ranked, recall, latency = evaluate(handler, collection_name, queries, query_vectors, args.k, args.limit)
+        baseline = baseline or ranked
+        ram_mb, disk_mb = estimated_memory_mb(profile, len(points), model_size)
+        report["profiles"][name] = {
+            "settings": profile.model_dump(exclude={"name"}),
+            "vector_size": profile.vector_size(model_size),
+            "index_seconds": round(index_seconds, 3),
+            "estimated_ram_mb": ram_mb,
+            "estimated_disk_mb": disk_mb,
+            f"recall@{args.k}": recall,
+            f"overlap@{args.k}": overlap_at_k(ranked, baseline, args.k),
+            "latency": latency,
+        }
+        print(
+            f"{name:<15} dims={profile.vector_size(model_size):<4} ram~{ram_mb:.2f}MB disk~{disk_mb:.2f}MB  "
+            f"recall@{args.k}={recall:.3f}  overlap@{args.k}={report['profiles'][name][f'overlap@{args.k}']:.3f}  "
+            f"p95={latency.get('p95_ms')}ms"
+        )
+        handler.client.delete_collection(collection_name)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory/recall/latency tradeoff of the Qdrant collection profiles.")
+    parser.add_argument("--profiles", nargs="+", choices=list(COLLECTION_PROFILES), default=list(COLLECTION_PROFILES))
+    parser.add_argument("--url", default=None, help="Qdrant server URL; in-process ':memory:' if omitted.")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10, help="Chunks retrieved per query.")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--corpus", default=None, help="JSON fixture with documents and queries; synthetic if omitted.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed of the synthetic corpus.")
+    parser.add_argument("--output", default=None, help="Path to write the JSON report; printed to stdout if omitted.")
+    main(parser.parse_args())
@@ -0,0 +1,110 @@
+"""
+Concurrency benchmark for the /ask endpoint.
+
+Fires batches of concurrent /ask requests at a running API and reports throughput
+and latency per concurrency level, while probing the / health check to show it
+stays responsive under load.
+
+Usage:
+    python -m benchmarks.concurrency_benchmark --url http://0.0.0.0:8080 --levels 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+DEFAULT_QUESTION = "What’s the heaviest load you’ll need to lift?"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed_post(client, url, payload):
+    start = time.perf_counter()
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def probe_health(client, url, stop_event, latencies):
+    while not stop_event.is_set():
+        start = time.perf_counter()
+        await client.get(url)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.1)
+
+
+async def run_level(client, base_url, concurrency, rounds, question):
+    payload = {"question": question}
+    health_latencies = []
+    stop_event = asyncio.Event()
+    probe = asyncio.create_task(probe_health(client, f"{base_url}/", stop_event, health_latencies))
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = await asyncio.gather(
+            *(timed_post(client, f"{base_url}/ask", payload) for _ in range(concurrency)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                errors += 1
+            else:
+                latencies.append(result)
+    elapsed = time.perf_counter() - start
+
+    stop_event.set()
+    await probe
+
+    return {
+        "concurrency": concurrency,
+        "requests": concurrency * rounds,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "latency_p50_s": round(percentile(latencies, 50), 3),
+        "latency_p95_s": round(percentile(latencies, 95), 3),
+        "latency_mean_s": round(statistics.mean(latencies), 3) if latencies else 0.0,
+        "health_p95_s": round(percentile(health_latencies, 95), 4),
+        "health_max_s": round(max(health_latencies), 4) if health_latencies else 0.0,
+    }
+
+
+async def main(args):
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=max(args.levels) + 4)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        report = []
+        for level in args.levels:
+            result = await run_level(client, args.url.rstrip("/"), level, args.rounds, args.question)
+            print(
+                f"concurrency={result['concurrency']:>3}  "
+                f"throughput={result['throughput_rps']:.2f} req/s  "
+                f"p50={result['latency_p50_s']:.2f}s  p95={result['latency_p95_s']:.2f}s  "
+                f"health_p95={result['health_p95_s'] * 1000:.1f}ms"
+            )
+            report.append(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /ask throughput across concurrency levels.")
+    parser.add_argument("--url", default="http://0.0.0.0:8080")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--question", default=DEFAULT_QUESTION)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=None, help="Optional path to write the JSON report.")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+"""
+Embedding backend benchmark.
+
+Loads each backend in a fresh process and reports load time, single-query
+latency, batch throughput, RSS growth and agreement (cosine similarity) with the
+first backend's embeddings.
+
+Usage:
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --backends sentence-transformers fastembed fastembed-int8 --output embedding_backends.json
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import statistics
+import time
+
+import psutil
+
+QUERIES = [
+    "How do I reset my password?",
+    "What are your opening hours?",
+    "Can I return a product after 30 days?",
+    "My order SKU-48213 has not arrived yet",
+    "What’s the heaviest load you’ll need to lift?",
+    "Do you ship internationally?",
+    "How can I update my billing address?",
+    "The app shows error E1042 when I log in",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+
+def run_backend(spec, repeats, batch_size, batch_count, queue):
+    from src.database_handler.embedding_backend import create_embedding_backend
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+    backend = create_embedding_backend(spec)
+    backend.encode(["warm-up"], batch_size=1)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(repeats):
+        for query in QUERIES:
+            start = time.perf_counter()
+            backend.encode([query], batch_size=1)
+            latencies.append(time.perf_counter() - start)
+
+    texts = [QUERIES[i % len(QUERIES)] + f" ({i})" for i in range(batch_size * batch_count)]
+    start = time.perf_counter()
+    backend.encode(texts, batch_size=batch_size)
+    batch_seconds = time.perf_counter() - start
+
+    queue.put({
+        "backend": spec,
+        "load_seconds": round(load_seconds, 3),
+        "query_latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "query_latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "query_latency_mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "batch_throughput_texts_per_s": round(len(texts) / batch_seconds, 1),
+        "rss_delta_mb": round((process.memory_info().rss - rss_before) / 1024 / 1024, 1),
+        "embeddings": backend.encode(QUERIES, batch_size=len(QUERIES)),
+    })
+
+
+def main(args):
+    context = multiprocessing.get_context("spawn")
+    report = []
+    reference = None
+    for spec in args.backends:
+        queue = context.Queue()
+        worker = context.Process(
+            target=run_backend, args=(spec, args.repeats, args.batch_size, args.batch_count, queue)
+        )
+        worker.start()
+        result = queue.get()
+        worker.join()
+
+        embeddings = result.pop("embeddings")
+        if reference is None:
+            reference = embeddings
+        result["mean_cosine_vs_reference"] = round(
+            statistics.mean(cosine(a, b) for a, b in zip(embeddings, reference)), 4
+        )
+        print(
+            f"{spec:<24} load={result['load_seconds']:.1f}s  "
+            f"p50={result['query_latency_p50_ms']:.1f}ms  p95={result['query_latency_p95_ms']:.1f}ms  "
+            f"batch={result['batch_throughput_texts_per_s']:.0f} texts/s  "
+            f"rss+={result['rss_delta_mb']:.0f}MB  cos={result['mean_cosine_vs_reference']:.4f}"
+        )
+        report.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare embedding backends on CPU.")
+    parser.add_argument(
+        "--backends", nargs="+", default=["sentence-transformers", "fastembed", "fastembed-int8"],
+        help="EMBEDDING_MODEL specs to compare; the first one is the reference for cosine agreement.",
+    )
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-count", type=int, default=8)
+    parser.add_argument("--output", default=None, help="Optional path to write the JSON report.")
+    main(parser.parse_args())
@@ -0,0 +1,84 @@
+"""
+Micro-batching benchmark for query embeddings.
+
+Fires bursts of concurrent, distinct queries at QdrantHandler.aget_query_embedding
+with the micro-batcher on and off and reports embeddings/second and per-query
+latency. No Qdrant connection is needed; the query cache is bypassed by making
+every query unique.
+
+Usage:
+    python -m benchmarks.micro_batching --concurrency 1 8 32 64
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from src.app_config import app_config
+from src.database_handler.qdrant_handler import QdrantHandler
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed_embedding(handler, query):
+    start = time.perf_counter()
+    await handler.aget_query_embedding(query)
+    return time.perf_counter() - start
+
+
+async def run(handler, concurrency, rounds, label):
+    latencies = []
+    start = time.perf_counter()
+    for round_index in range(rounds):
+        queries = [f"{label} question {round_index}-{i} about order status" for i in range(concurrency)]
+        latencies.extend(await asyncio.gather(*(timed_embedding(handler, q) for q in queries)))
+    elapsed = time.perf_counter() - start
+    return {
+        "embeddings_per_s": round(len(latencies) / elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+async def main(args):
+    app_config.EMBEDDING_CACHE_SIZE = 0
+    handler = QdrantHandler()
+    handler.load_models()
+    batcher = handler.embedding_batcher
+
+    report = []
+    for concurrency in args.concurrency:
+        handler.embedding_batcher = None
+        unbatched = await run(handler, concurrency, args.rounds, f"plain-{concurrency}")
+        handler.embedding_batcher = batcher
+        batched = await run(handler, concurrency, args.rounds, f"batched-{concurrency}")
+        speedup = batched["embeddings_per_s"] / unbatched["embeddings_per_s"]
+        print(
+            f"concurrency={concurrency:>3}  unbatched={unbatched['embeddings_per_s']:.0f}/s "
+            f"(p95 {unbatched['latency_p95_ms']:.1f}ms)  batched={batched['embeddings_per_s']:.0f}/s "
+            f"(p95 {batched['latency_p95_ms']:.1f}ms)  speedup={speedup:.2f}x"
+        )
+        report.append({
+            "concurrency": concurrency,
+            "unbatched": unbatched,
+            "batched": batched,
+            "speedup": round(speedup, 2),
+        })
+    report.append({"batcher": batcher.stats() if batcher else None})
+    await handler.aclose_connection()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched query embedding.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Optional path to write the JSON report.")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+REST vs gRPC transport benchmark for Qdrant.
+
+Bulk-upserts random vectors into a scratch collection and then runs single
+searches over each transport, reporting upsert points/second and search
+latency. Vectors are random, so no embedding model is loaded and the numbers
+isolate the transport (serialization and round trips). Needs a running Qdrant
+at QDRANT_URL with its gRPC port (QDRANT_GRPC_PORT) reachable.
+
+Usage:
+    python -m benchmarks.qdrant_transport --points 20000 --searches 500
+"""
+import argparse
+import json
+import random
+import time
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from src.database_handler.qdrant_handler import client_options
+
+COLLECTION_NAME = "transport_benchmark"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def random_vector(rng, size):
+    return [rng.uniform(-1, 1) for _ in range(size)]
+
+
+def bench_upsert(client, rng, points, batch_size, vector_size):
+    elapsed = 0.0
+    for start in range(0, points, batch_size):
+        batch = [
+            models.PointStruct(id=point_id, vector=random_vector(rng, vector_size), payload={"text": f"chunk {point_id}"})
+            for point_id in range(start, min(start + batch_size, points))
+        ]
+        # Only the request is timed, not building the random vectors
+        started = time.perf_counter()
+        client.upsert(COLLECTION_NAME, points=batch, wait=True)
+        elapsed += time.perf_counter() - started
+    return {"points_per_s": round(points / elapsed, 1), "seconds": round(elapsed, 2)}
+
+
+def bench_search(client, rng, searches, limit, vector_size):
+    queries = [random_vector(rng, vector_size) for _ in range(searches)]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        client.query_points(COLLECTION_NAME, query=query, limit=limit, with_payload=["text"])
+        latencies.append(time.perf_counter() - started)
+    return {
+        "searches_per_s": round(searches / sum(latencies), 1),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def run(transport, args):
+    client = QdrantClient(**client_options(transport))
+    rng = random.Random(args.seed)
+    try:
+        if client.collection_exists(COLLECTION_NAME):
+            client.delete_collection(COLLECTION_NAME)
+        client.create_collection(
+            COLLECTION_NAME,
+            vectors_config=models.VectorParams(size=args.vector_size, distance=models.Distance.COSINE),
+        )
+        upsert = bench_upsert(client, rng, args.points, args.batch_size, args.vector_size)
+        search = bench_search(client, rng, args.searches, args.limit, args.vector_size)
+        client.delete_collection(COLLECTION_NAME)
+    finally:
+        client.close()
+    return {"upsert": upsert, "search": search}
+
+
+def main(args):
+    report = {"points": args.points, "searches": args.searches, "vector_size": args.vector_size}
+    for transport in args.transports:
+        report[transport] = run(transport, args)
+        print(
+            f"{transport:>4}  upsert={report[transport]['upsert']['points_per_s']:.0f} points/s  "
+            f"search={report[transport]['search']['searches_per_s']:.0f}/s "
+            f"(p50 {report[transport]['search']['latency_p50_ms']:.1f}ms, "
+            f"p95 {report[transport]['search']['latency_p95_ms']:.1f}ms)"
+        )
+    if "rest" in report and "grpc" in report:
+        report["grpc_speedup"] = {
+            "upsert": round(report["grpc"]["upsert"]["points_per_s"] / report["rest"]["upsert"]["points_per_s"], 2),
+            "search": round(report["grpc"]["search"]["searches_per_s"] / report["rest"]["search"]["searches_per_s"], 2),
+        }
+        print(f"gRPC speedup: {report['grpc_speedup']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant REST against gRPC for upserts and searches.")
+    parser.add_argument("--transports", nargs="+", default=["rest", "grpc"], choices=["rest", "grpc"])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--searches", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--vector-size", type=int, default=768)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--output", default=None, help="Optional path to write the JSON report.")
+    main(parser.parse_args())
@@ -0,0 +1,352 @@
+"""
+Retrieval evaluation and latency benchmark for QdrantHandler.search_similar_texts.
+
+Indexes a corpus into an in-process Qdrant (":memory:" or a local path) through the
+regular chunking and bulk ingestion code, then runs every query through the same
+stages as search_similar_texts (embed -> search -> rerank) and reports:
+
+- quality: recall@k, MRR and nDCG@k, before and after rerank, overall and per query type
+- latency: p50/p95/p99 per stage (embed, search, rerank) and end to end
+- memory: peak RSS of the process
+- with --policy: the adaptive rerank policy (skip, cascade, budget) instead of
+  always reranking, and how often it took each decision
+
+The corpus is either the built-in synthetic customer-service corpus (SKUs, order
+codes, error strings) or a JSON fixture:
+
+    {"documents": [{"id": 1, "text": "..."}],
+     "queries": [{"query": "...", "relevant": [1], "type": "optional group"}]}
+
+Results are emitted as JSON together with the git commit and the retrieval
+settings, so runs can be compared across commits. Retrieval settings are taken
+from the usual environment variables (EMBEDDING_MODEL, RERANK_MAX_LENGTH,
+CHUNK_SIZE, CHUNK_OVERLAP, ...).
+
+Usage:
+    python -m benchmarks.retrieval_benchmark --modes dense hybrid --k 5 --output retrieval.json
+    python -m benchmarks.retrieval_benchmark --corpus fixtures/faq.json --qdrant-path /tmp/qdrant-bench
+    python -m benchmarks.retrieval_benchmark --policy --limit 20 --skip-gap 0.1 \
+        --cascade-model ms-marco-MiniLM-L-12-v2 --budget-ms 150
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from src.app_config import app_config
+from src.database_handler.rerank_policy import RerankPolicy
+
+PRODUCTS = [
+    "Trail Runner", "Summit Backpack", "Aero Tent", "Glacier Jacket", "Canyon Boots",
+    "Ridge Headlamp", "Delta Kayak", "Harbor Dry Bag", "Alpine Stove", "Pine Hammock",
+]
+CATEGORIES = ["footwear", "bag", "shelter", "outerwear", "lighting", "watercraft", "cooking", "camp furniture"]
+MATERIALS = ["ripstop nylon", "recycled polyester", "aluminium", "merino wool", "Gore-Tex", "carbon fibre"]
+ERRORS = [
+    ("payment was declined by the issuing bank", "use another card or contact your bank"),
+    ("the order could not be found", "check the order number in your confirmation email"),
+    ("the session has expired", "sign out and sign in again"),
+    ("the shipping address failed validation", "enter the address exactly as on your ID"),
+    ("the coupon has already been redeemed", "each coupon can be used only once per account"),
+]
+
+
+def build_corpus(seed: int = 7):
+    """Return (documents, queries). Each query lists the IDs of its relevant documents."""
+    rng = random.Random(seed)
+    documents, queries = [], []
+
+    for index in range(60):
+        name = f"{PRODUCTS[index % len(PRODUCTS)]} {index // len(PRODUCTS) + 1}"
+        sku = f"SKU-{rng.randint(10000, 99999)}"
+        category = rng.choice(CATEGORIES)
+        material = rng.choice(MATERIALS)
+        warranty = rng.randint(1, 5)
+        doc_id = len(documents)
+        documents.append({
+            "id": doc_id,
+            "text": (
+                f"{name} ({sku}) is a {category} product made of {material}. "
+                f"It comes with a {warranty}-year warranty. Returns are accepted within 30 days "
+                f"if the item is unused and in its original packaging."
+            ),
+        })
+        queries.append({"query": f"Is {sku} covered by warranty?", "relevant": [doc_id], "type": "sku"})
+        queries.append({"query": f"What is the {name} made of?", "relevant": [doc_id], "type": "natural"})
+
+    for index, (description, fix) in enumerate(ERRORS * 4):
+        code = f"E{1000 + index * 7}"
+        doc_id = len(documents)
+        documents.append({
+            "id": doc_id,
+            "text": f"Error {code} means {description}. To resolve error {code}, {fix}.",
+        })
+        queries.append({"query": f"The app shows {code}, what should I do?", "relevant": [doc_id], "type": "error_code"})
+
+    for index in range(40):
+        order = f"ORD-{rng.randint(100000, 999999)}"
+        doc_id = len(documents)
+        documents.append({
+            "id": doc_id,
+            "text": f"Order {order} was shipped on day {index + 1} with tracking via the standard carrier.",
+        })
+        queries.append({"query": f"Where is my order {order}?", "relevant": [doc_id], "type": "order_code"})
+
+    return documents, queries
+
+
+def load_corpus(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    return fixture["documents"], fixture["queries"]
+
+
+def recall_at_k(ranked_ids, relevant, k):
+    return len(set(ranked_ids[:k]) & set(relevant)) / len(relevant)
+
+
+def reciprocal_rank(ranked_ids, relevant):
+    for rank, doc_id in enumerate(ranked_ids, start=1):
+        if doc_id in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked_ids, relevant, k):
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, doc_id in enumerate(ranked_ids[:k], start=1) if doc_id in relevant)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(pct):
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    return {
+        "p50_ms": round(pick(50) * 1000, 3),
+        "p95_ms": round(pick(95) * 1000, 3),
+        "p99_ms": round(pick(99) * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def create_handler(qdrant_path=None):
+    from src.database_handler.qdrant_handler import QdrantHandler
+
+    handler = QdrantHandler()
+    if qdrant_path:
+        handler.client = QdrantClient(path=qdrant_path)
+    else:
+        handler.client = QdrantClient(":memory:")
+        handler.async_client = AsyncQdrantClient(":memory:")
+    return handler
+
+
+def index_corpus(handler, documents, collection_name, hybrid):
+    """Index documents through the regular chunking and bulk ingestion path."""
+    if handler.client.collection_exists(collection_name):
+        handler.client.delete_collection(collection_name)
+    handler.create_collection(collection_name, hybrid=hybrid)
+
+    def points():
+        for doc in documents:
+            for point in handler.chunk_markdown(doc["text"], f"doc-{doc['id']}", ""):
+                point["payload"]["eval_doc_id"] = doc["id"]
+                yield point
+
+    start = time.perf_counter()
+    handler.bulk_insert_points(points(), collection_name)
+    return time.perf_counter() - start
+
+
+def unique_doc_ids(results):
+    """Map chunk hits back to document IDs, keeping the first (best) rank of each document."""
+    seen, ranked = set(), []
+    for doc in results:
+        doc_id = doc["payload"]["eval_doc_id"]
+        if doc_id not in seen:
+            seen.add(doc_id)
+            ranked.append(doc_id)
+    return ranked
+
+
+def run_query(handler, query, collection_name, hybrid, limit, k, timings, decisions=None):
+    start = time.perf_counter()
+    query_vector = handler.get_query_embedding(query)
+    sparse_vector = handler.get_sparse_query_embedding(query) if hybrid else None
+    embedded = time.perf_counter()
+    if hybrid:
+        results = handler.hybrid_search_vectors(query_vector, sparse_vector, limit=limit, collection_name=collection_name)
+    else:
+        results = handler.search_vectors(query_vector, limit=limit, collection_name=collection_name)
+    searched = time.perf_counter()
+    if decisions is None:
+        reranked = handler.rerank_results(query, results, top_k=k)
+    else:
+        # Adaptive policy: the budget counts from the start of the query, as in search_similar_texts
+        decision, reranked = handler.rerank_decision(query, results, hybrid, start)
+        decisions[decision] = decisions.get(decision, 0) + 1
+    done = time.perf_counter()
+
+    timings["embed"].append(embedded - start)
+    timings["search"].append(searched - embedded)
+    timings["rerank"].append(done - searched)
+    timings["total"].append(done - start)
+    return unique_doc_ids(results), unique_doc_ids(reranked)
+
+
+def evaluate(handler, queries, collection_name, hybrid, k, limit, decisions=None):
+    timings = {"embed": [], "search": [], "rerank": [], "total": []}
+    totals = {}
+    for query in queries:
+        retrieved_ids, reranked_ids = run_query(
+            handler, query["query"], collection_name, hybrid, limit, k, timings, decisions
+        )
+        relevant = query["relevant"]
+        scores = {
+            "recall": recall_at_k(retrieved_ids, relevant, k),
+            "mrr": reciprocal_rank(retrieved_ids, relevant),
+            "ndcg": ndcg_at_k(retrieved_ids, relevant, k),
+            "rerank_recall": recall_at_k(reranked_ids, relevant, k),
+            "rerank_mrr": reciprocal_rank(reranked_ids, relevant),
+            "rerank_ndcg": ndcg_at_k(reranked_ids, relevant, k),
+        }
+        for group in ("all", query.get("type", "default")):
+            bucket = totals.setdefault(group, {"count": 0, **{name: 0.0 for name in scores}})
+            bucket["count"] += 1
+            for name, value in scores.items():
+                bucket[name] += value
+
+    quality = {}
+    for group, bucket in totals.items():
+        count = bucket.pop("count")
+        quality[group] = {"queries": count}
+        for name, value in bucket.items():
+            label = f"{name}@{k}" if name.endswith(("recall", "ndcg")) else name
+            quality[group][label] = round(value / count, 4)
+    latency = {stage: percentiles(values) for stage, values in timings.items()}
+    return quality, latency
+
+
+def main(args):
+    # Every query should pay for a real embedding; the query cache would hide that cost
+    app_config.EMBEDDING_CACHE_SIZE = 0
+    app_config.EMBEDDING_CACHE_BACKEND = None
+    # The profiles of the benchmark collections are recorded in a throwaway manifest, not the real one
+    app_config.INDEX_MANIFEST_PATH = os.path.join(tempfile.mkdtemp(), "index_manifest.json")
+
+    documents, queries = load_corpus(args.corpus) if args.corpus else build_corpus(args.seed)
+    handler = create_handler(args.qdrant_path)
+    handler.rerank_policy = RerankPolicy(
+        candidates=args.limit, top_k=args.k, skip_gap=args.skip_gap, skip_score=args.skip_score,
+        cascade_model=args.cascade_model, cascade_margin=args.cascade_margin, budget_ms=args.budget_ms,
+    )
+    limit = handler.rerank_policy.candidates
+    start = time.perf_counter()
+    handler.load_models()
+    model_load_seconds = time.perf_counter() - start
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": args.corpus or f"synthetic(seed={args.seed})",
+        "documents": len(documents),
+        "queries": len(queries),
+        "k": args.k,
+        "candidates": limit,
+        "settings": {
+            "embedding": handler.embedding_key,
+            "rerank_max_length": app_config.RERANK_MAX_LENGTH,
+            "chunk_size": app_config.CHUNK_SIZE,
+            "chunk_overlap": app_config.CHUNK_OVERLAP,
+            "sparse_model": app_config.SPARSE_MODEL,
+            "rerank_policy": {
+                "enabled": args.policy,
+                "model": handler.rerank_policy.model,
+                "skip_gap": handler.rerank_policy.skip_gap,
+                "skip_score": handler.rerank_policy.skip_score,
+                "cascade_model": handler.rerank_policy.cascade_model,
+                "cascade_margin": handler.rerank_policy.cascade_margin,
+                "cascade_candidates": handler.rerank_policy.cascade_candidates,
+                "budget_ms": handler.rerank_policy.budget_ms,
+            },
+        },
+        "model_load_seconds": round(model_load_seconds, 3),
+        "modes": {},
+    }
+    for mode in args.modes:
+        hybrid = mode == "hybrid"
+        collection_name = f"bench_{mode}"
+        index_seconds = index_corpus(handler, documents, collection_name, hybrid)
+        decisions = {} if args.policy else None
+        quality, latency = evaluate(handler, queries, collection_name, hybrid, args.k, limit, decisions)
+        report["modes"][mode] = {
+            "index_seconds": round(index_seconds, 3),
+            "points": handler.client.count(collection_name).count,
+            "quality": quality,
+            "latency": latency,
+        }
+        if decisions is not None:
+            report["modes"][mode]["rerank_decisions"] = decisions
+            print(f"{mode:<7} rerank decisions: {decisions}")
+        overall = quality["all"]
+        print(
+            f"{mode:<7} recall@{args.k}={overall[f'recall@{args.k}']:.3f}  mrr={overall['mrr']:.3f}  "
+            f"ndcg@{args.k}={overall[f'ndcg@{args.k}']:.3f}  | reranked: recall@{args.k}={overall[f'rerank_recall@{args.k}']:.3f}  "
+            f"mrr={overall['rerank_mrr']:.3f}  ndcg@{args.k}={overall[f'rerank_ndcg@{args.k}']:.3f}  "
+            f"| p95 embed={latency['embed'].get('p95_ms')}ms search={latency['search'].get('p95_ms')}ms "
+            f"rerank={latency['rerank'].get('p95_ms')}ms"
+        )
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(f"peak RSS: {report['peak_rss_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retrieval quality and latency benchmark on an in-process Qdrant.")
+    parser.add_argument("--modes", nargs="+", choices=["dense", "hybrid"], default=["dense", "hybrid"])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=None, help="Candidates fetched before reranking (default RERANK_CANDIDATES).")
+    parser.add_argument("--policy", action="store_true", help="Rerank through the adaptive rerank policy.")
+    parser.add_argument("--skip-gap", type=float, default=None, help="Policy: dense score gap that skips reranking.")
+    parser.add_argument("--skip-score", type=float, default=None, help="Policy: minimum top dense score to skip reranking.")
+    parser.add_argument("--cascade-model", default=None, help="Policy: large flashrank model for ambiguous sets.")
+    parser.add_argument("--cascade-margin", type=float, default=None, help="Policy: small-model score margin that is ambiguous.")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Policy: per-query latency budget.")
+    parser.add_argument("--corpus", default=None, help="JSON fixture with documents and queries; synthetic if omitted.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed of the synthetic corpus.")
+    parser.add_argument("--qdrant-path", default=None, help="Use local on-disk Qdrant at this path instead of ':memory:'.")
+    parser.add_argument("--output", default=None, help="Path to write the JSON report; printed to stdout if omitted.")
+    main(parser.parse_args())
@@ -1,3 +1,6 @@
+import json
+import uuid
+
 import streamlit as st
 import requests
 
@@ -6,29 +9,53 @@ st.title("💬 Chat with AI")
 
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "thread_id" not in st.session_state:
+    # The server keeps the conversation history per user and thread
+    st.session_state.user_id = str(uuid.uuid4())
+    st.session_state.thread_id = str(uuid.uuid4())
 
-def get_bot_response(question, history):
-    # Combine previous history + new user input into one string
-    full_prompt = ""
-    for chat in history:
-        full_prompt += f"User: {chat['user']}\nAssistant: {chat['bot']}\n"
-    full_prompt += f"User: {question}\nAssistant:"
+def iter_sse_events(response):
+    """Parse a Server-Sent Events response into (event, data) pairs."""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
 
+def stream_bot_response(question, status):
     payload = {
-        "question": full_prompt
+        "question": question,
+        "user_id": st.session_state.user_id,
+        "thread_id": st.session_state.thread_id,
     }
 
     try:
-        response = requests.post(
-            "http://0.0.0.0:8010/ask",
+        with requests.post(
+            "http://0.0.0.0:8010/ask/stream",
             json=payload,
+            stream=True,
             timeout=1000
-        )
-        response.raise_for_status()
-        json_response = response.json()
-        return json_response.get("response", "No response from server.")
+        ) as response:
+            response.raise_for_status()
+            for event, data in iter_sse_events(response):
+                if event == "token":
+                    status.empty()
+                    yield data.get("content", "")
+                elif event == "tool_call":
+                    status.caption(f"🔎 Running `{data.get('name')}`...")
+                elif event == "tool_result":
+                    status.caption("✍️ Writing the answer...")
+                elif event == "error":
+                    yield f"❌ Error: {data.get('detail')}"
     except requests.exceptions.RequestException as e:
-        return f"❌ Error: {str(e)}"
+        yield f"❌ Error: {str(e)}"
 
 # Show chat history
 for chat in st.session_state.chat_history:
@@ -44,12 +71,15 @@ if user_input:
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    bot_response = get_bot_response(user_input, st.session_state.chat_history)
-
     with st.chat_message("assistant"):
-        st.markdown(bot_response, unsafe_allow_html=True)
+        status = st.empty()
+        status.caption("⏳ Thinking...")
+        bot_response = st.write_stream(
+            stream_bot_response(user_input, status)
+        )
+        status.empty()
 
     st.session_state.chat_history.append({
         "user": user_input,
-        "bot": bot_response
+        "bot": bot_response if isinstance(bot_response, str) else "".join(map(str, bot_response))
     })
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import List, Optional
 
 class AppConfig(BaseSettings):
     MONGODB_URL: Optional[str] = None
@@ -21,9 +21,79 @@ class AppConfig(BaseSettings):
     MONGODB_URI: Optional[str] = None
     MONGODB_DB_NAME: Optional[str] = None
     MONGODB_COLLECTION_NAME: Optional[str] = None
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_SOCKET_TIMEOUT_MS: Optional[int] = None
     QDRANT_URL: Optional[str] = None
     QDRANT_API_KEY: Optional[str] = None
     QDRANT_COLLECTION_NAME: Optional[str] = None
+    QDRANT_TRANSPORT: str = "grpc"
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_TIMEOUT: int = 10
+    QDRANT_KEEPALIVE_MS: int = 30000
+    QDRANT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    QDRANT_COLLECTION_PROFILE: str = "default"
+    MODEL_WORKERS: int = 4
+    LOG_LEVEL: str = "INFO"
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    PRELOAD_MODELS: bool = False
+    CHUNK_SIZE: int = 256
+    CHUNK_OVERLAP: int = 32
+    RERANK_MAX_LENGTH: int = 512
+    RERANK_MODEL: str = "ms-marco-TinyBERT-L-2-v2"
+    RERANK_CANDIDATES: int = 7
+    RERANK_TOP_K: int = 5
+    RERANK_SKIP_GAP: Optional[float] = None
+    RERANK_SKIP_SCORE: Optional[float] = None
+    RERANK_CASCADE_MODEL: Optional[str] = None
+    RERANK_CASCADE_MARGIN: float = 0.1
+    RERANK_CASCADE_CANDIDATES: int = 10
+    RERANK_BUDGET_MS: Optional[float] = None
+    CONTEXT_PACKING_ENABLED: bool = True
+    CONTEXT_MAX_TOKENS: int = 1500
+    CONTEXT_MAX_SENTENCES: int = 6
+    CONTEXT_DEDUPE_THRESHOLD: float = 0.8
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBED_BATCH_ENABLED: bool = True
+    EMBED_BATCH_MAX_SIZE: int = 32
+    EMBED_BATCH_MAX_WAIT_MS: float = 5.0
+    INGEST_BATCH_SIZE: int = 256
+    INGEST_UPLOAD_WORKERS: int = 2
+    INDEX_MANIFEST_PATH: str = "./dataset/index_manifest.json"
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_TTL: Optional[float] = None
+    EMBEDDING_CACHE_BACKEND: Optional[str] = None
+    EMBEDDING_CACHE_PATH: str = "./dataset/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_COLLECTION: str = "embedding_cache"
+    HYBRID_SEARCH: bool = False
+    SPARSE_MODEL: str = "Qdrant/bm25"
+    HYBRID_PREFETCH_LIMIT: int = 20
+    SEARCH_PAYLOAD_FIELDS: List[str] = ["text", "filename", "page", "heading", "sheet", "doc_id", "chunk_id"]
+    SEARCH_TEXT_AFTER_RERANK: bool = False
+    SEARCH_PREVIEW_CHARS: int = 512
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: Optional[float] = 86400
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10000
+    CONVERSATION_MEMORY_ENABLED: bool = True
+    CONVERSATION_AGENT_NAME: str = "chani-ai"
+    CONVERSATION_WINDOW: int = 10
+    CONVERSATION_SUMMARY_MIN_MESSAGES: int = 6
+    CONVERSATION_MAX_MESSAGES: int = 50
+    CONVERSATION_ARCHIVE_COLLECTION: str = "conversation_archive"
+    CONVERSATION_ARCHIVE_BUCKET_SIZE: int = 100
+    CONVERSATION_WRITE_BATCH_SIZE: int = 100
+    CONVERSATION_WRITE_FLUSH_MS: float = 200.0
+    CONVERSATION_WRITE_QUEUE_SIZE: int = 10000
+    CONVERSATION_WRITE_RETRY_MS: float = 500.0
+    CONVERSATION_WRITE_SUBMIT_TIMEOUT: float = 1.0
+    CONVERSATION_WRITE_SHUTDOWN_TIMEOUT: float = 10.0
+    CONVERSATION_WRITE_SPILL_PATH: str = "./dataset/conversation_spill.jsonl"
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
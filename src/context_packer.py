@@ -0,0 +1,140 @@
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.app_config import app_config
+from src.metrics import CONTEXT_TOKENS, CONTEXT_TOKENS_SAVED
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+# Words that say nothing about which sentence answers the query
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it my of on or the this to what when where "
+    "which who why will with you your".split()
+)
+# Rough tokens per word, only used when no tokenizer is available for the model
+WORD_TOKEN_RATIO = 1.3
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model_name: Optional[str]):
+    """tiktoken encoding of the model, or None when tiktoken cannot provide one (e.g. offline)."""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model_name or "")
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ No tokenizer for {model_name}, estimating token counts from words: {e}")
+        return None
+
+
+class ContextPacker:
+    """
+    Packs reranked passages into a token budget before they reach the LLM.
+
+    Passages that are near-duplicates of a better-ranked one are dropped, and only
+    the sentences sharing terms with the query are kept (sentences repeated in
+    overlapping chunks are emitted once). The result is compact text, one block
+    per passage with a numbered citation, counted with the MODEL_NAME tokenizer
+    and cut off at max_tokens.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, max_tokens: Optional[int] = None,
+                 max_sentences: Optional[int] = None, dedupe_threshold: Optional[float] = None):
+        self.model_name = model_name or app_config.MODEL_NAME
+        self.max_tokens = max_tokens or app_config.CONTEXT_MAX_TOKENS
+        self.max_sentences = max_sentences or app_config.CONTEXT_MAX_SENTENCES
+        self.dedupe_threshold = app_config.CONTEXT_DEDUPE_THRESHOLD if dedupe_threshold is None else dedupe_threshold
+
+    def count_tokens(self, text: str) -> int:
+        encoding = get_encoding(self.model_name)
+        if encoding is None:
+            return int(len(text.split()) * WORD_TOKEN_RATIO) + 1
+        return len(encoding.encode(text, disallowed_special=()))
+
+    @staticmethod
+    def words(text: str) -> List[str]:
+        return WORD_PATTERN.findall(text.lower())
+
+    @staticmethod
+    def shingles(words: List[str], size: int = 3) -> set:
+        if len(words) < size:
+            return {tuple(words)} if words else set()
+        return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    def dedupe(self, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop passages whose word 3-grams are mostly contained in a better-ranked passage."""
+        kept, kept_shingles = [], []
+        for passage in passages:
+            shingles = self.shingles(self.words(passage.get("text") or ""))
+            if not shingles:
+                continue
+            if any(len(shingles & other) / len(shingles) >= self.dedupe_threshold for other in kept_shingles):
+                continue
+            kept.append(passage)
+            kept_shingles.append(shingles)
+        return kept
+
+    def relevant_sentences(self, query: str, text: str) -> List[str]:
+        """The max_sentences sentences sharing most terms with the query, in their original order."""
+        sentences = [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence and sentence.strip()]
+        terms = set(self.words(query)) - STOPWORDS
+        scored = [(len(terms & set(self.words(sentence))), index) for index, sentence in enumerate(sentences)]
+        matching = sorted((item for item in scored if item[0] > 0), key=lambda item: (-item[0], item[1]))
+        # A passage with no query terms at all (e.g. a paraphrase) keeps its leading sentences
+        chosen = [index for _, index in matching[:self.max_sentences]] or list(range(min(len(sentences), self.max_sentences)))
+        return [sentences[index] for index in sorted(chosen)]
+
+    @staticmethod
+    def citation(number: int, payload: Dict[str, Any]) -> str:
+        parts = [payload.get("filename") or "source"]
+        if payload.get("page") is not None:
+            parts.append(f"p. {payload['page']}")
+        if payload.get("sheet"):
+            parts.append(f"sheet {payload['sheet']}")
+        elif payload.get("heading"):
+            parts.append(payload["heading"])
+        return f"[{number}] {', '.join(str(part) for part in parts)}"
+
+    def pack(self, query: str, passages: List[Dict[str, Any]]) -> str:
+        """Compact, cited context for the query within max_tokens."""
+        blocks, used, seen = [], 0, set()
+        for passage in self.dedupe(passages):
+            sentences = []
+            for sentence in self.relevant_sentences(query, passage["text"]):
+                key = " ".join(self.words(sentence))
+                if key and key not in seen:
+                    sentences.append(sentence)
+            if not sentences:
+                continue
+            header = self.citation(len(blocks) + 1, passage.get("payload") or {})
+            # Drop trailing sentences until the block fits; stop once not even one sentence does
+            while sentences:
+                block = f"{header}\n{' '.join(sentences)}"
+                tokens = self.count_tokens(block)
+                if used + tokens <= self.max_tokens:
+                    break
+                sentences.pop()
+            if not sentences:
+                break
+            seen.update(" ".join(self.words(sentence)) for sentence in sentences)
+            blocks.append(block)
+            used += tokens
+        return "\n\n".join(blocks) if blocks else "No relevant information found."
+
+    def pack_results(self, query: str, results: List[Dict[str, Any]]) -> str:
+        """Pack search results and record how many prompt tokens packing saved."""
+        packed = self.pack(query, results)
+        raw_tokens = self.count_tokens(json.dumps(results, ensure_ascii=False, default=str))
+        packed_tokens = self.count_tokens(packed)
+        CONTEXT_TOKENS.labels("raw").observe(raw_tokens)
+        CONTEXT_TOKENS.labels("packed").observe(packed_tokens)
+        CONTEXT_TOKENS_SAVED.observe(max(raw_tokens - packed_tokens, 0))
+        logger.debug(f"Packed {len(results)} passages: {raw_tokens} -> {packed_tokens} tokens")
+        return packed
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.app_config import app_config
+from src.database_handler.async_mongo_handler import AsyncMemoryHandler, close_async_client
+from src.database_handler.write_behind import ConversationWriteBehind
+from src.prompt import SUMMARY_PROMPT
+from src.schema import ConversationInfor, Message, UserQuestion, UserThread
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationMemory:
+    """
+    Server-side conversation history per (user_id, thread_id), persisted through AsyncMemoryHandler.
+
+    Only the latest `window` messages are replayed to the LLM. Older messages are
+    folded into a rolling summary stored on the conversation document, so the prompt
+    stays bounded however long the thread grows. Reads and writes never leave the
+    event loop; asave_turn only queues the turn for the write-behind writer. After
+    each flush the written threads are handed to a separate summarizer task, so LLM
+    calls never delay persistence.
+    """
+
+    def __init__(self, llm, async_handler: Optional[AsyncMemoryHandler] = None, window: Optional[int] = None,
+                 summary_min_messages: Optional[int] = None):
+        self.llm = llm
+        self.async_handler = async_handler or AsyncMemoryHandler(
+            app_config.MONGODB_DB_NAME, app_config.MONGODB_COLLECTION_NAME
+        )
+        self.writer = ConversationWriteBehind(self.async_handler, on_flush=self.schedule_summaries)
+        # Threads waiting for a summary refresh, keyed by thread key so each is summarized once
+        self.summary_queue: Dict[Tuple[str, str, str], UserThread] = {}
+        self.summarizer: Optional[asyncio.Task] = None
+        self.window = window or app_config.CONVERSATION_WINDOW
+        self.summary_min_messages = summary_min_messages or app_config.CONVERSATION_SUMMARY_MIN_MESSAGES
+
+    def connect(self):
+        """Bind the handler; the client does not talk to MongoDB before its first operation."""
+        self.async_handler.connect_to_database()
+        if self.async_handler.collection is None:
+            logger.warning("⚠️ Conversation memory unavailable, answering every question statelessly")
+
+    async def astart(self):
+        """
+        Connect and create the conversation and archive indexes without blocking the event loop,
+        then start the writer, which first writes back turns spilled by an earlier run.
+        """
+        self.connect()
+        if self.async_handler.collection is not None:
+            await self.async_handler.create_indexes()
+            self.writer.ensure_worker()
+
+    def thread(self, user_question: UserQuestion) -> Optional[UserThread]:
+        """The thread a question belongs to, or None for stateless requests."""
+        if not user_question.thread_id or self.async_handler.collection is None:
+            return None
+        if not user_question.user_id:
+            # UserQuestion rejects this; never let such callers share a namespace
+            raise ValueError("user_id is required when thread_id is given")
+        return UserThread(
+            user_id=user_question.user_id,
+            thread_id=user_question.thread_id,
+            agent_name=app_config.CONVERSATION_AGENT_NAME,
+        )
+
+    @staticmethod
+    def first_index(conversation: Dict[str, Any]) -> int:
+        """Absolute index of the first message in the (possibly trimmed or sliced) document."""
+        messages = conversation.get("messages", [])
+        return conversation.get("message_count", len(messages)) - len(messages)
+
+    async def aload(self, thread: UserThread) -> Tuple[str, List[Dict[str, Any]]]:
+        try:
+            conversation = await self.async_handler.retrieve_conversation(
+                thread, last_n=self.window + self.summary_min_messages
+            )
+        except Exception as e:
+            logger.error(f"❌ Error loading conversation {thread.thread_id}: {e}")
+            return "", []
+        return self.unsummarized(conversation)
+
+    def unsummarized(self, conversation: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        messages = conversation.get("messages", [])
+        # Messages not summarized yet stay verbatim, at most window + summary_min_messages of them
+        start = max(conversation.get("summarized_count", 0) - self.first_index(conversation), 0)
+        return conversation.get("summary", ""), messages[start:]
+
+    @staticmethod
+    def build_messages(question: str, summary: str = "", history: Optional[List[Dict[str, Any]]] = None) -> list:
+        """LLM input: the summary of older turns, the recent turns verbatim, then the new question."""
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        messages.extend({"role": message["role"], "content": message["content"]} for message in history or [])
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    @staticmethod
+    def turn(thread: UserThread, question: str, answer: str) -> ConversationInfor:
+        return ConversationInfor(
+            user_thread_infor=thread,
+            messages=[Message(role="user", content=question), Message(role="assistant", content=answer)],
+        )
+
+    def pending_summary(self, conversation: Dict[str, Any]) -> Optional[Tuple[str, int, int]]:
+        """Summary prompt for the messages that fell out of the window, once enough have piled up."""
+        messages = conversation.get("messages", [])
+        offset = self.first_index(conversation)
+        summarized = conversation.get("summarized_count", 0)
+        end = offset + len(messages) - self.window
+        if end - summarized < self.summary_min_messages:
+            return None
+        # Messages archived before they could be summarized are skipped
+        transcript = "\n".join(
+            f"{message['role'].capitalize()}: {message['content']}"
+            for message in messages[max(summarized - offset, 0):end - offset]
+        )
+        prompt = SUMMARY_PROMPT.format(summary=conversation.get("summary") or "(none)", messages=transcript)
+        return prompt, summarized, end
+
+    async def asave_turn(self, thread: UserThread, question: str, answer: str) -> bool:
+        """Queue the turn for the write-behind writer; False when the queue stayed full and it was spilled to disk."""
+        return await self.writer.submit(self.turn(thread, question, answer))
+
+    def schedule_summaries(self, threads: List[UserThread]):
+        """Queue summary refreshes of threads that were just written, run by the summarizer task."""
+        for thread in threads:
+            self.summary_queue[self.async_handler.thread_key(thread)] = thread
+        if self.summarizer is None or self.summarizer.done():
+            self.summarizer = asyncio.get_running_loop().create_task(self.run_summaries())
+
+    async def run_summaries(self):
+        while self.summary_queue:
+            key = next(iter(self.summary_queue))
+            await self.asummarize([self.summary_queue.pop(key)])
+
+    async def asummarize(self, threads: List[UserThread]):
+        """Refresh the rolling summaries of threads that were just written, where due."""
+        for thread in threads:
+            try:
+                pending = self.pending_summary(await self.async_handler.retrieve_conversation(thread))
+                if pending:
+                    prompt, summarized, end = pending
+                    summary = (await self.llm.ainvoke(prompt)).content
+                    await self.async_handler.update_summary(thread, summary, end, summarized)
+            except Exception as e:
+                logger.error(f"❌ Error summarizing conversation {thread.thread_id}: {e}")
+
+    async def aclose(self, timeout: Optional[float] = None):
+        """
+        Flush queued turns (for at most timeout seconds), then close the connections.
+        Pending summaries are abandoned; they are refreshed after the thread's next write.
+        """
+        await self.writer.close(timeout)
+        if self.summarizer is not None:
+            self.summarizer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.summarizer
+            self.summarizer = None
+        self.summary_queue.clear()
+        self.close()
+
+    def close(self):
+        self.async_handler.close_connection()
+        close_async_client()
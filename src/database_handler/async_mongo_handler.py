@@ -0,0 +1,316 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from src.app_config import app_config
+from src.database_handler.mongo_handler import ConversationQueries, client_options
+from src.schema import ConversationInfor, UserThread
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+# One pooled client per process; motor clients are cheap to share and expensive to multiply
+shared_client: Optional[AsyncIOMotorClient] = None
+shared_client_lock = threading.Lock()
+
+
+def get_async_client() -> AsyncIOMotorClient:
+    global shared_client
+    with shared_client_lock:
+        if shared_client is None:
+            if not app_config.MONGODB_URI:
+                raise ValueError("❌ MongoDB credentials are missing. Check your configuration.")
+            shared_client = AsyncIOMotorClient(app_config.MONGODB_URI, **client_options())
+            logger.info("✅ Async MongoDB client created.")
+        return shared_client
+
+
+def close_async_client():
+    global shared_client
+    with shared_client_lock:
+        if shared_client is not None:
+            shared_client.close()
+            shared_client = None
+            logger.info("🔒 Async MongoDB client closed.")
+
+
+class AsyncBaseMongoDBHandler:
+    """
+    Async counterpart of BaseMongoDBHandler on the event loop (motor).
+
+    All handlers share the process-wide pooled client unless one is passed in, e.g.
+    a mongomock_motor.AsyncMongoMockClient in tests.
+    """
+
+    def __init__(self, db_name: str, collection_name: str, client: Optional[AsyncIOMotorClient] = None):
+        self.client = client
+        self.db = None
+        self.collection = None
+        self.db_name = db_name
+        self.collection_name = collection_name
+
+    def connect_to_database(self):
+        """Bind to the shared client; motor connects lazily on the first operation."""
+        try:
+            if not all([self.db_name, self.collection_name]):
+                raise ValueError("❌ MongoDB database or collection name is missing. Check your configuration.")
+            if self.client is None:
+                self.client = get_async_client()
+            self.db = self.client[self.db_name]
+            self.collection = self.db[self.collection_name]
+        except Exception as e:
+            logger.error(f"❌ MongoDB connection error: {e}")
+            self.db = None
+            self.collection = None
+
+    async def insert_one(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a single document into MongoDB."""
+        if self.collection is None:
+            return {"status": "error", "message": "No database connection"}
+
+        try:
+            # insert_one sets data["_id"], so the stored document needs no read-back
+            await self.collection.insert_one(data)
+            return {"status": "success", "message": "Document inserted successfully", "data": data}
+        except Exception as e:
+            logger.error(f"❌ Error inserting document: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def insert_many(self, data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Insert multiple documents into MongoDB."""
+        if self.collection is None:
+            return {"status": "error", "message": "No database connection"}
+
+        try:
+            result = await self.collection.insert_many(data_list)
+            return {
+                "status": "success",
+                "message": f"{len(result.inserted_ids)} documents inserted successfully",
+                "inserted_ids": result.inserted_ids,
+            }
+        except Exception as e:
+            logger.error(f"❌ Error inserting documents: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def find_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Find a single document in MongoDB."""
+        if self.collection is None:
+            return None
+
+        try:
+            return await self.collection.find_one(query)
+        except Exception as e:
+            logger.error(f"❌ Error finding document: {e}")
+            return None
+
+    async def find_many(self, query: Dict[str, Any], limit: int = 0) -> List[Dict[str, Any]]:
+        """Find multiple documents in MongoDB."""
+        if self.collection is None:
+            return []
+
+        try:
+            cursor = self.collection.find(query)
+            if limit > 0:
+                cursor = cursor.limit(limit)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error(f"❌ Error finding documents: {e}")
+            return []
+
+    async def update_one(self, query: Dict[str, Any], update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a single document in MongoDB."""
+        if self.collection is None:
+            return {"status": "error", "message": "No database connection"}
+
+        try:
+            result = await self.collection.update_one(query, {"$set": update_data})
+            if result.modified_count > 0:
+                return {
+                    "status": "success",
+                    "message": "Document updated successfully",
+                    "modified_count": result.modified_count,
+                }
+            return {"status": "info", "message": "No document was updated", "modified_count": 0}
+        except Exception as e:
+            logger.error(f"❌ Error updating document: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def delete_one(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Delete a single document from MongoDB."""
+        if self.collection is None:
+            return {"status": "error", "message": "No database connection"}
+
+        try:
+            result = await self.collection.delete_one(query)
+            if result.deleted_count > 0:
+                return {
+                    "status": "success",
+                    "message": "Document deleted successfully",
+                    "deleted_count": result.deleted_count,
+                }
+            return {"status": "info", "message": "No document was deleted", "deleted_count": 0}
+        except Exception as e:
+            logger.error(f"❌ Error deleting document: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def delete_many(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Delete multiple documents from MongoDB."""
+        if self.collection is None:
+            return {"status": "error", "message": "No database connection"}
+
+        try:
+            result = await self.collection.delete_many(query)
+            return {
+                "status": "success",
+                "message": f"{result.deleted_count} documents deleted successfully",
+                "deleted_count": result.deleted_count,
+            }
+        except Exception as e:
+            logger.error(f"❌ Error deleting documents: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def close_connection(self):
+        """Release this handler; the shared client is closed by close_async_client()."""
+        self.db = None
+        self.collection = None
+
+
+class AsyncMemoryHandler(ConversationQueries, AsyncBaseMongoDBHandler):
+    """Async counterpart of MemoryHandler, using the same documents and queries."""
+
+    def __init__(self, db_name: str, collection_name: str, client: Optional[AsyncIOMotorClient] = None,
+                 archive_collection_name: Optional[str] = None, max_messages: Optional[int] = None,
+                 archive_bucket_size: Optional[int] = None):
+        super().__init__(db_name, collection_name, client)
+        self.configure_conversations(archive_collection_name, max_messages, archive_bucket_size)
+
+    def connect_to_database(self):
+        super().connect_to_database()
+        if self.collection is not None:
+            self.archive = self.db[self.archive_collection_name]
+
+    async def create_indexes(self):
+        """Index the thread key on the conversation and archive collections."""
+        try:
+            try:
+                await self.collection.create_index(self.THREAD_KEY, name="thread_key", unique=True)
+            except OperationFailure as e:
+                logger.warning(f"⚠️ Unique thread index not created, falling back to a plain index: {e}")
+                await self.collection.create_index(self.THREAD_KEY, name="thread_key")
+            keys = self.THREAD_KEY + [("first_index", ASCENDING)]
+            try:
+                # Unique per bucket, which makes archive_updates idempotent
+                await self.archive.create_index(keys, name="thread_key_bucket", unique=True)
+            except OperationFailure as e:
+                logger.warning(f"⚠️ Unique archive bucket index not created, falling back to a plain index: {e}")
+                await self.archive.create_index(keys, name="thread_key_first_index")
+        except Exception as e:
+            logger.error(f"❌ Error creating conversation indexes: {e}")
+
+    async def clear_conversation(self, thread_infor: UserThread) -> bool:
+        """Clear a specific conversation."""
+        query = {"user_id": thread_infor.user_id, "thread_id": thread_infor.thread_id}
+        result = await self.collection.delete_one(query)
+        await self.archive.delete_many(query)
+        return result.deleted_count > 0
+
+    async def insert_or_update_conversation(self, conversation_infor: ConversationInfor):
+        if not conversation_infor.messages:
+            return
+
+        previous = await self.collection.find_one_and_update(**self.append_update(conversation_infor))
+        trimmed, first_index = self.trimmed_messages(previous, conversation_infor)
+        for query, update in self.archive_updates(conversation_infor.user_thread_infor, trimmed, first_index):
+            try:
+                await self.archive.update_one(query, update, upsert=True)
+            except DuplicateKeyError:
+                logger.debug(f"Messages from {query['first_index'] + query['count']} already archived")
+
+    async def bulk_append(self, conversations: List[ConversationInfor]) -> List[ConversationInfor]:
+        """
+        Append a batch of updates (one per thread) with two bulk_write calls.
+
+        Trimmed messages are computed from one read of the current windows. Each
+        window update only applies if its thread did not change after that read, and
+        only the messages trimmed by updates that applied are archived, afterwards.
+        Returns the updates that did not apply, to be retried on a fresh read.
+        """
+        windows = {}
+        cursor = self.collection.find(
+            {"$or": [self.thread_filter(c.user_thread_infor) for c in conversations]},
+            {"user_id": 1, "thread_id": 1, "agent_name": 1, "messages": 1, "message_count": 1},
+        )
+        async for document in cursor:
+            windows[(document["user_id"], document["thread_id"], document["agent_name"])] = document
+
+        archive_operations, operations = [], []
+        for conversation in conversations:
+            thread = conversation.user_thread_infor
+            previous = windows.get(self.thread_key(thread))
+            trimmed, first_index = self.trimmed_messages(previous, conversation)
+            archive_operations.append([
+                UpdateOne(query, update, upsert=True)
+                for query, update in self.archive_updates(thread, trimmed, first_index)
+            ])
+            operations.append(UpdateOne(
+                self.guarded_append_filter(conversation, previous),
+                self.append_operation(conversation),
+                upsert=True,
+            ))
+
+        failed = []
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            failed = sorted({error["index"] for error in e.details.get("writeErrors", [])})
+            if not failed:
+                raise
+            logger.warning(f"⚠️ {len(failed)} conversation updates raced with other writers, retrying")
+
+        applied = [operation for index, thread_operations in enumerate(archive_operations) if index not in failed
+                   for operation in thread_operations]
+        if applied:
+            await self.archive_trimmed(applied)
+        return [conversations[index] for index in failed]
+
+    async def archive_trimmed(self, operations: List[UpdateOne]):
+        """
+        Write archive_updates operations. Their windows are already trimmed, so a failure
+        is logged rather than raised: retrying the batch would append the messages again.
+        """
+        try:
+            await self.archive.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys are buckets archived by an earlier attempt
+            errors = [error for error in e.details.get("writeErrors", []) if error["code"] != DUPLICATE_KEY]
+            if errors:
+                logger.error(f"❌ Error archiving trimmed messages: {errors}")
+        except Exception as e:
+            logger.error(f"❌ Error archiving trimmed messages: {e}")
+
+    async def retrieve_conversation(self, thread_infor: UserThread, last_n: Optional[int] = None) -> Dict[str, Any]:
+        """Fetch a conversation; with last_n only its latest last_n messages are read."""
+        conversation = await self.collection.find_one(
+            self.thread_filter(thread_infor), self.conversation_projection(last_n)
+        )
+        if conversation:
+            conversation["_id"] = str(conversation["_id"])
+            return conversation
+        return {}
+
+    async def retrieve_archived_messages(self, thread_infor: UserThread) -> List[Dict[str, Any]]:
+        """All archived messages of a thread, oldest first."""
+        cursor = self.archive.find(self.thread_filter(thread_infor), {"messages": 1}).sort("first_index", ASCENDING)
+        return [message async for bucket in cursor for message in bucket["messages"]]
+
+    async def update_summary(self, thread_infor: UserThread, summary: str, summarized_count: int,
+                             previous_count: int = 0) -> bool:
+        result = await self.collection.update_one(
+            *self.summary_update(thread_infor, summary, summarized_count, previous_count)
+        )
+        return result.modified_count > 0
@@ -0,0 +1,133 @@
+import logging
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+from qdrant_client.http import models
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionProfile(BaseModel):
+    """
+    Storage and index settings of a knowledge-base collection.
+
+    quantization keeps a compressed copy of the vectors in RAM ("scalar" int8, 4x
+    smaller, or "binary", 32x smaller); searches run on it and rescore the
+    oversampled candidates with the original vectors. on_disk moves the original
+    vectors and the payload to disk. dimensions truncates the embeddings
+    (Matryoshka models such as nomic-embed-text-v1.5 keep most of their quality
+    at 512 or 256 dimensions).
+    """
+
+    name: str
+    # "scalar" or "binary"; "product" only appears in profiles read from existing collections
+    quantization: Optional[str] = None
+    rescore: bool = True
+    oversampling: float = 2.0
+    on_disk: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    search_ef: Optional[int] = None
+    dimensions: Optional[int] = None
+
+    def vector_size(self, model_size: int) -> int:
+        return min(self.dimensions, model_size) if self.dimensions else model_size
+
+    def hnsw_config(self) -> Optional[models.HnswConfigDiff]:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        if self.quantization:
+            raise ValueError(f"Unknown quantization '{self.quantization}'. Available: scalar, binary")
+        return None
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        """Search-time settings: HNSW ef and rescoring of quantized candidates."""
+        if self.search_ef is None and not self.quantization:
+            return None
+        quantization = models.QuantizationSearchParams(
+            rescore=self.rescore, oversampling=self.oversampling
+        ) if self.quantization else None
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    profile.name: profile
+    for profile in (
+        CollectionProfile(name="default"),
+        CollectionProfile(name="scalar", quantization="scalar"),
+        CollectionProfile(name="scalar-disk", quantization="scalar", on_disk=True),
+        CollectionProfile(name="binary", quantization="binary", oversampling=3.0, on_disk=True),
+        CollectionProfile(name="matryoshka-512", quantization="scalar", dimensions=512),
+        CollectionProfile(name="matryoshka-256", quantization="scalar", dimensions=256),
+        CollectionProfile(name="compact", quantization="scalar", on_disk=True, hnsw_m=8,
+                          hnsw_ef_construct=64, search_ef=64, dimensions=256),
+    )
+}
+
+
+def get_collection_profile(name: Optional[str]) -> CollectionProfile:
+    if not name:
+        return COLLECTION_PROFILES["default"]
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}'. Available: {', '.join(COLLECTION_PROFILES)}")
+    return COLLECTION_PROFILES[name]
+
+
+def quantization_kind(config) -> Optional[str]:
+    if isinstance(config, models.ScalarQuantization):
+        return "scalar"
+    if isinstance(config, models.BinaryQuantization):
+        return "binary"
+    if isinstance(config, models.ProductQuantization):
+        return "product"
+    return None
+
+
+def profile_for_collection(vectors: models.VectorParams, config: models.CollectionConfig,
+                           hint: Optional[str] = None) -> CollectionProfile:
+    """
+    Profile of an existing collection, read from its Qdrant config.
+
+    Quantization, on-disk vectors, HNSW settings and the vector size come from the
+    collection itself (per-vector settings override the collection-wide ones).
+    Qdrant does not store the search-time settings (rescore, oversampling,
+    search_ef): they are taken from the hinted profile, e.g. the one recorded in
+    the IndexManifest when the collection was created, if its quantization
+    matches the collection, and otherwise from the first built-in profile with
+    that quantization.
+    """
+    quantization = quantization_kind(vectors.quantization_config or config.quantization_config)
+
+    def hnsw(setting: str) -> Optional[int]:
+        value = getattr(vectors.hnsw_config, setting, None)
+        return getattr(config.hnsw_config, setting, None) if value is None else value
+
+    hinted = COLLECTION_PROFILES.get(hint) if hint else None
+    if hinted is not None and hinted.quantization != quantization:
+        logger.warning(f"⚠️ Profile '{hint}' recorded for a collection with quantization {quantization}, "
+                       "deriving its search settings from the collection config")
+        hinted = None
+    search = hinted or next(
+        (profile for profile in COLLECTION_PROFILES.values() if profile.quantization == quantization),
+        CollectionProfile(name=quantization or "default", quantization=quantization),
+    )
+    return CollectionProfile(
+        name=search.name,
+        quantization=quantization,
+        rescore=search.rescore,
+        oversampling=search.oversampling,
+        on_disk=bool(vectors.on_disk),
+        hnsw_m=hnsw("m"),
+        hnsw_ef_construct=hnsw("ef_construct"),
+        search_ef=search.search_ef,
+        dimensions=vectors.size,
+    )
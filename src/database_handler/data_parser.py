@@ -1,53 +1,244 @@
-import pymupdf  # PyMuPDF
+import argparse
+import hashlib
+import logging
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-class DataParser:
-    def __init__(self):
-        pass
+import pymupdf  # PyMuPDF
+from openpyxl import load_workbook
 
-    def pdf_to_markdown(self, pdf_path, output_md, images_dir):
-        doc = pymupdf.open(pdf_path)
-        os.makedirs(images_dir, exist_ok=True)
-        md_lines = []
-        img_count = 0
+logger = logging.getLogger(__name__)
+
+
+def save_image(doc, xref: int, images_dir: str) -> Optional[str]:
+    """
+    Write an embedded image in its original encoding, named by content hash.
+
+    Identical images (the same logo on every page, or in several PDFs sharing the
+    directory) are stored once; an existing file is not rewritten. CMYK images are
+    converted to RGB PNGs, since most viewers cannot show them.
+    """
+    image = doc.extract_image(xref)
+    if not image or not image.get("image"):
+        return None
+    data, ext = image["image"], image.get("ext", "png")
+    if image.get("colorspace", 0) >= 4:
+        data, ext = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.Pixmap(doc, xref)).tobytes("png"), "png"
+    img_path = os.path.join(images_dir, f"{hashlib.sha1(data).hexdigest()[:16]}.{ext}")
+    if not os.path.exists(img_path):
+        tmp_path = f"{img_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, img_path)
+    return img_path
+
+
+def pdf_pages(pdf_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the plain text of each PDF page, one page in memory at a time."""
+    with pymupdf.open(pdf_path) as doc:
         for page_num in range(doc.page_count):
+            yield {"page": page_num + 1, "text": doc.load_page(page_num).get_text("text").strip()}
+
+
+def format_cell(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def xlsx_rows(xlsx_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the non-empty rows of every sheet as "Header: value" text.
+
+    The workbook is opened in read-only mode, so rows are streamed from the file
+    instead of loading the whole workbook. The first non-empty row of a sheet is
+    taken as its header.
+    """
+    workbook = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            header = None
+            for row_num, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                cells = [format_cell(value) for value in row]
+                if not any(cells):
+                    continue
+                if header is None:
+                    header = [cell or f"Column {index + 1}" for index, cell in enumerate(cells)]
+                    continue
+                text = "; ".join(
+                    f"{header[index] if index < len(header) else f'Column {index + 1}'}: {cell}"
+                    for index, cell in enumerate(cells) if cell
+                )
+                yield {"sheet": sheet.title, "row": row_num, "text": text}
+    finally:
+        workbook.close()
+
+
+def convert_pages(pdf_path: str, output_path: str, images_dir: str, start: int, end: int,
+                  extract_images: bool = True) -> Tuple[int, int]:
+    """Convert pages [start, end) of a PDF to markdown, writing each page as soon as it is read."""
+    if extract_images:
+        os.makedirs(images_dir, exist_ok=True)
+    img_count = 0
+    saved: Dict[int, Optional[str]] = {}
+    with pymupdf.open(pdf_path) as doc, open(output_path, "w", encoding="utf-8") as f:
+        for page_num in range(start, min(end, doc.page_count)):
             page = doc.load_page(page_num)
             text = page.get_text("text")  # plain text; for structured output: use 'dict' or 'blocks'
             # Add page heading
-            md_lines.append(f"\n## Page {page_num + 1}\n")
-            md_lines.append(text.strip())
-            # Extract images
-            images = page.get_images(full=True)
-            for img_index, img in enumerate(images):
+            f.write(f"\n## Page {page_num + 1}\n\n{text.strip()}\n")
+            if not extract_images:
+                continue
+            for img_index, img in enumerate(page.get_images(full=True)):
                 xref = img[0]
-                pix = pymupdf.Pixmap(doc, xref)
-                if pix.n < 5:
-                    img_path = os.path.join(images_dir, f"page{page_num+1}_img{img_index+1}.png")
-                    pix.save(img_path)
-                else:
-                    pix = pymupdf.Pixmap(pymupdf.csRGB, pix)
-                    img_path = os.path.join(images_dir, f"page{page_num+1}_img{img_index+1}.png")
-                    pix.save(img_path)
-                pix = None
-                md_lines.append(f"\n![Image {page_num+1}-{img_index+1}]({img_path})\n")
-                img_count += 1
-
-        with open(output_md, "w", encoding="utf-8") as f:
-            f.write("\n".join(md_lines))
-
-        print(f"Markdown created at {output_md} with {img_count} images.")
-
-    def process_folder(self, folder_path, output_dir):
-        for filename in os.listdir(folder_path):
-            if filename.endswith('.pdf'):
-                pdf_path = os.path.join(folder_path, filename)
-                output_md = os.path.join(output_dir, f"{os.path.splitext(filename)[0]}.md")
-                images_dir = os.path.join(output_dir, f"{os.path.splitext(filename)[0]}_images")
-                self.pdf_to_markdown(pdf_path, output_md, images_dir)
+                if xref not in saved:
+                    saved[xref] = save_image(doc, xref, images_dir)
+                if saved[xref]:
+                    f.write(f"\n![Image {page_num+1}-{img_index+1}]({saved[xref]})\n")
+                    img_count += 1
+    return end - start, img_count
+
+
+class DataParser:
+    def __init__(self, workers: Optional[int] = None, pages_per_job: int = 50, extract_images: bool = True):
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_job = pages_per_job
+        self.extract_images = extract_images
+
+    @staticmethod
+    def output_paths(pdf_path: str, output_dir: str) -> Tuple[str, str]:
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        return os.path.join(output_dir, f"{stem}.md"), os.path.join(output_dir, f"{stem}_images")
+
+    @staticmethod
+    def is_up_to_date(pdf_path: str, output_md: str) -> bool:
+        return os.path.exists(output_md) and os.path.getmtime(output_md) >= os.path.getmtime(pdf_path)
+
+    def pdf_to_markdown(self, pdf_path, output_md, images_dir):
+        tmp_path = f"{output_md}.tmp"
+        with pymupdf.open(pdf_path) as doc:
+            page_count = doc.page_count
+        _, img_count = convert_pages(pdf_path, tmp_path, images_dir, 0, page_count, self.extract_images)
+        os.replace(tmp_path, output_md)
+        logger.info(f"✅ Markdown created at {output_md} with {img_count} images.")
+
+    def plan(self, folder_path: str, output_dir: str, force: bool = False) -> Dict[str, List[Tuple[int, int]]]:
+        """Page ranges to convert per PDF, skipping PDFs whose markdown is newer than the source."""
+        jobs = {}
+        for filename in sorted(os.listdir(folder_path)):
+            if not filename.endswith(".pdf"):
+                continue
+            pdf_path = os.path.join(folder_path, filename)
+            output_md, _ = self.output_paths(pdf_path, output_dir)
+            if not force and self.is_up_to_date(pdf_path, output_md):
+                logger.info(f"ℹ️ Skipping {filename}, markdown is up to date")
+                continue
+            with pymupdf.open(pdf_path) as doc:
+                page_count = doc.page_count
+            jobs[pdf_path] = [
+                (start, min(start + self.pages_per_job, page_count))
+                for start in range(0, max(page_count, 1), self.pages_per_job)
+            ]
+        return jobs
+
+    @staticmethod
+    def merge_parts(parts: List[str], output_md: str):
+        """Concatenate the page-range outputs in order and replace the markdown file atomically."""
+        tmp_path = f"{output_md}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for part in parts:
+                with open(part, "r", encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out)
+                os.remove(part)
+        os.replace(tmp_path, output_md)
+
+    def process_folder(self, folder_path, output_dir, force: bool = False):
+        """Convert every PDF in folder_path, one process-pool job per PDF page range."""
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = self.plan(folder_path, output_dir, force)
+        if not jobs:
+            return
+
+        remaining = {pdf_path: len(ranges) for pdf_path, ranges in jobs.items()}
+        images = {pdf_path: 0 for pdf_path in jobs}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for pdf_path, ranges in jobs.items():
+                output_md, images_dir = self.output_paths(pdf_path, output_dir)
+                for index, (start, end) in enumerate(ranges):
+                    part = f"{output_md}.part{index}"
+                    future = executor.submit(
+                        convert_pages, pdf_path, part, images_dir, start, end, self.extract_images
+                    )
+                    futures[future] = pdf_path
+
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    images[pdf_path] += future.result()[1]
+                except Exception as e:
+                    logger.error(f"❌ Error converting {pdf_path}: {e}")
+                    remaining[pdf_path] = None
+                    continue
+                if remaining[pdf_path] is None:
+                    continue
+                remaining[pdf_path] -= 1
+                if remaining[pdf_path] == 0:
+                    output_md, _ = self.output_paths(pdf_path, output_dir)
+                    self.merge_parts([f"{output_md}.part{i}" for i in range(len(jobs[pdf_path]))], output_md)
+                    logger.info(f"✅ Markdown created at {output_md} with {images[pdf_path]} images.")
+
+        # Leave no partial output behind for PDFs that failed
+        for pdf_path, count in remaining.items():
+            if count is None:
+                output_md, _ = self.output_paths(pdf_path, output_dir)
+                for index in range(len(jobs[pdf_path])):
+                    if os.path.exists(f"{output_md}.part{index}"):
+                        os.remove(f"{output_md}.part{index}")
 
     def process_xlsx(self, xlsx_path, output_dir):
-        print(f"Processing XLSX file: {xlsx_path}")
+        """Convert a workbook to markdown, one section per sheet and one line per row."""
+        if not os.path.exists(xlsx_path):
+            logger.error(f"❌ XLSX file {xlsx_path} does not exist")
+            return
+        os.makedirs(output_dir, exist_ok=True)
+        output_md = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(xlsx_path))[0]}.md")
+        tmp_path = f"{output_md}.tmp"
+        rows = 0
+        sheet = None
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row in xlsx_rows(xlsx_path):
+                if row["sheet"] != sheet:
+                    sheet = row["sheet"]
+                    f.write(f"\n## {sheet}\n\n")
+                f.write(f"- {row['text']}\n")
+                rows += 1
+        os.replace(tmp_path, output_md)
+        logger.info(f"✅ Markdown created at {output_md} with {rows} rows.")
+
+
+def main():
+    from src.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Convert PDFs (and the schedule workbook) to markdown in parallel.")
+    parser.add_argument("--input", default="./dataset/pdf_files", help="Folder with the PDF files")
+    parser.add_argument("--output", default="./dataset/markdown_files", help="Folder for the markdown files")
+    parser.add_argument("--xlsx", default="./dataset/schedule.xlsx", help="Workbook to convert, empty to skip")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pages-per-job", type=int, default=50, help="Pages per worker job for large PDFs")
+    parser.add_argument("--no-images", action="store_true", help="Do not extract embedded images")
+    parser.add_argument("--force", action="store_true", help="Convert PDFs even if their markdown is up to date")
+    args = parser.parse_args()
+
+    log_listener = setup_logging()
+    try:
+        data_parser = DataParser(args.workers, args.pages_per_job, extract_images=not args.no_images)
+        data_parser.process_folder(args.input, args.output, force=args.force)
+        if args.xlsx:
+            data_parser.process_xlsx(args.xlsx, args.output)
+    finally:
+        log_listener.stop()
+
 
-parser = DataParser()
-parser.process_folder("./dataset/pdf_files", "./dataset/markdown_files")
-parser.process_xlsx("./dataset/schedule.xlsx", "./dataset/markdown_files")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Type
+
+DEFAULT_EMBEDDING_MODEL = "nomic-ai/nomic-embed-text-v1.5"
+
+
+class EmbeddingBackend(ABC):
+    """Interface of the text embedding backends used by QdrantHandler."""
+
+    name = "base"
+    default_model = DEFAULT_EMBEDDING_MODEL
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or self.default_model
+
+    @abstractmethod
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """Embed texts, one vector per text, in order."""
+
+    @property
+    def dimension(self) -> int:
+        """Size of the vectors encode() returns."""
+        return len(self.encode(["dimension"], batch_size=1)[0])
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch SentenceTransformer backend."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: Optional[str] = None):
+        super().__init__(model_name)
+        # Imported here: pulling in torch is the slowest part of process startup
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(self.model_name, trust_remote_code=True)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        return self.model.encode(texts, batch_size=batch_size).tolist()
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension() or super().dimension
+
+
+class FastEmbedBackend(EmbeddingBackend):
+    """ONNX Runtime backend through fastembed."""
+
+    name = "fastembed"
+
+    def __init__(self, model_name: Optional[str] = None):
+        super().__init__(model_name)
+        from fastembed import TextEmbedding
+        self.model = TextEmbedding(model_name=self.model_name)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        return [vector.tolist() for vector in self.model.embed(texts, batch_size=batch_size)]
+
+    @property
+    def dimension(self) -> int:
+        return self.model.embedding_size
+
+
+class QuantizedFastEmbedBackend(FastEmbedBackend):
+    """int8-quantized ONNX model through fastembed."""
+
+    name = "fastembed-int8"
+    default_model = f"{DEFAULT_EMBEDDING_MODEL}-Q"
+
+
+EMBEDDING_BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    backend.name: backend
+    for backend in (SentenceTransformerBackend, FastEmbedBackend, QuantizedFastEmbedBackend)
+}
+
+
+def parse_embedding_spec(spec: Optional[str]) -> Tuple[str, str]:
+    """
+    Parse an EMBEDDING_MODEL value into (backend name, model name).
+
+    Accepted forms are "<backend>:<model>", "<backend>" (backend default model) and
+    "<model>" (SentenceTransformer). Unset means the SentenceTransformer default.
+    """
+    if not spec:
+        return SentenceTransformerBackend.name, SentenceTransformerBackend.default_model
+    backend, _, model = spec.partition(":")
+    if backend not in EMBEDDING_BACKENDS:
+        if model:
+            raise ValueError(
+                f"Unknown embedding backend '{backend}'. Available: {', '.join(EMBEDDING_BACKENDS)}"
+            )
+        return SentenceTransformerBackend.name, spec
+    return backend, model or EMBEDDING_BACKENDS[backend].default_model
+
+
+def create_embedding_backend(spec: Optional[str]) -> EmbeddingBackend:
+    backend, model = parse_embedding_spec(spec)
+    return EMBEDDING_BACKENDS[backend](model)
@@ -0,0 +1,206 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.app_config import app_config
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+TRAILING_PUNCTUATION = " \t\n?!.,;:"
+
+
+class SQLiteEmbeddingStore:
+    """Persistent embedding store in a local SQLite file (shared by workers on one host)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or app_config.EMBEDDING_CACHE_PATH
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key: str) -> Optional[Tuple[List[float], float]]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT vector, created_at FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return array("f", row[0]).tolist(), row[1]
+
+    def set(self, key: str, vector: List[float], created_at: float):
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                (key, array("f", vector).tobytes(), created_at),
+            )
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class MongoEmbeddingStore:
+    """Shared embedding store in a MongoDB collection (shared by all API instances)."""
+
+    def __init__(self, db_name: Optional[str] = None, collection_name: Optional[str] = None):
+        from src.database_handler.mongo_handler import BaseMongoDBHandler
+
+        self.handler = BaseMongoDBHandler(
+            db_name or app_config.MONGODB_DB_NAME,
+            collection_name or app_config.EMBEDDING_CACHE_COLLECTION,
+        )
+        self.handler.connect_to_database()
+
+    def get(self, key: str) -> Optional[Tuple[List[float], float]]:
+        document = self.handler.find_one({"_id": key})
+        if not document:
+            return None
+        return document["vector"], document["created_at"]
+
+    def set(self, key: str, vector: List[float], created_at: float):
+        if self.handler.collection is None:
+            return
+        self.handler.collection.update_one(
+            {"_id": key},
+            {"$set": {"vector": vector, "created_at": created_at}},
+            upsert=True,
+        )
+
+    def close(self):
+        self.handler.close_connection()
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of query embeddings keyed on normalized query text.
+
+    Entries optionally expire after ttl seconds. A persistent store (SQLite or
+    MongoDB) can back the in-process LRU so embeddings survive restarts and are
+    shared between workers. Hit/miss counters are available through stats().
+    """
+
+    def __init__(self, namespace: str = "", max_size: Optional[int] = None, ttl: Optional[float] = None,
+                 store: Optional[Any] = None):
+        self.namespace = namespace
+        self.max_size = app_config.EMBEDDING_CACHE_SIZE if max_size is None else max_size
+        self.ttl = app_config.EMBEDDING_CACHE_TTL if ttl is None else ttl
+        self.store = store
+        self.entries: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation."""
+        return WHITESPACE_PATTERN.sub(" ", text).strip(TRAILING_PUNCTUATION).lower()
+
+    def make_key(self, text: str) -> str:
+        return f"{self.namespace}:{self.normalize(text)}"
+
+    def is_expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    def get_local(self, key: str) -> Optional[List[float]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if self.is_expired(entry[1]):
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put_local(self, key: str, vector: List[float], created_at: float):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (vector, created_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get(self, text: str, local_only: bool = False) -> Optional[List[float]]:
+        """
+        Look up the embedding of a query.
+
+        With local_only=True only the in-process LRU is consulted and a miss is not
+        counted, so callers can cheaply probe before falling back to get().
+        """
+        key = self.make_key(text)
+        vector = self.get_local(key)
+        if vector is None and not local_only and self.store is not None:
+            try:
+                stored = self.store.get(key)
+            except Exception as e:
+                logger.error(f"❌ Error reading embedding cache store: {e}")
+                stored = None
+            if stored is not None and not self.is_expired(stored[1]):
+                vector = stored[0]
+                self.put_local(key, vector, stored[1])
+
+        if vector is not None:
+            with self.lock:
+                self.hits += 1
+        elif not local_only:
+            with self.lock:
+                self.misses += 1
+        return vector
+
+    def set(self, text: str, vector: List[float]):
+        key = self.make_key(text)
+        created_at = time.time()
+        self.put_local(key, vector, created_at)
+        if self.store is not None:
+            try:
+                self.store.set(key, vector, created_at)
+            except Exception as e:
+                logger.error(f"❌ Error writing embedding cache store: {e}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+
+def create_embedding_cache(namespace: str = "") -> EmbeddingCache:
+    """Build the query embedding cache configured by EMBEDDING_CACHE_BACKEND ("sqlite", "mongo" or unset)."""
+    store = None
+    backend = (app_config.EMBEDDING_CACHE_BACKEND or "").lower()
+    try:
+        if backend == "sqlite":
+            store = SQLiteEmbeddingStore()
+        elif backend == "mongo":
+            store = MongoEmbeddingStore()
+        elif backend:
+            logger.error(f"❌ Unknown embedding cache backend '{backend}', using in-process cache only")
+    except Exception as e:
+        logger.error(f"❌ Error opening embedding cache backend '{backend}': {e}")
+        store = None
+    return EmbeddingCache(namespace=namespace, store=store)
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from src.app_config import app_config
+
+logger = logging.getLogger(__name__)
+
+# Top-level key holding the collection profile of each collection, next to the per-collection file entries
+PROFILES_KEY = "_profiles"
+
+
+class IndexManifest:
+    """
+    Local record of what has been indexed into each Qdrant collection.
+
+    For every source file it keeps the content hash, the mtime seen at indexing
+    time and the IDs of the points created from it, so re-indexing only has to
+    touch new, changed or removed files. It also records the CollectionProfile
+    each collection was created with, whose search settings apply to it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or app_config.INDEX_MANIFEST_PATH
+        self.data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def load(self) -> "IndexManifest":
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except Exception as e:
+                logger.error(f"❌ Error reading index manifest {self.path}, starting from scratch: {e}")
+                self.data = {}
+        return self
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def entries(self, collection_name: str) -> Dict[str, Dict[str, Any]]:
+        return self.data.setdefault(collection_name, {})
+
+    def get(self, collection_name: str, filename: str) -> Optional[Dict[str, Any]]:
+        return self.entries(collection_name).get(filename)
+
+    def set(self, collection_name: str, filename: str, content_hash: str, mtime: float, point_ids: list):
+        self.entries(collection_name)[filename] = {
+            "content_hash": content_hash,
+            "mtime": mtime,
+            "point_ids": point_ids,
+        }
+
+    def remove(self, collection_name: str, filename: str):
+        self.entries(collection_name).pop(filename, None)
+
+    def profile(self, collection_name: str) -> Optional[str]:
+        return self.data.get(PROFILES_KEY, {}).get(collection_name)
+
+    def set_profile(self, collection_name: str, profile_name: str):
+        self.data.setdefault(PROFILES_KEY, {})[collection_name] = profile_name
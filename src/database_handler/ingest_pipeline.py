@@ -0,0 +1,246 @@
+import argparse
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.database_handler.data_parser import pdf_pages, xlsx_rows
+from src.database_handler.index_manifest import IndexManifest
+from src.database_handler.qdrant_handler import QdrantHandler, close_qdrant_clients
+from src.database_handler.text_chunker import TOKEN_PATTERN, TextChunker
+
+logger = logging.getLogger(__name__)
+
+SOURCE_EXTENSIONS = (".pdf", ".xlsx")
+
+
+class IngestPipeline:
+    """
+    One-pass ingestion of PDF and XLSX sources into Qdrant.
+
+    Sources are read lazily (one PDF page or one sheet row at a time), chunked and
+    handed as a generator to QdrantHandler.bulk_insert_points, which embeds and
+    upserts them in INGEST_BATCH_SIZE pages. Memory stays bounded by one batch
+    whatever the corpus size, and no intermediate markdown or image files are written.
+    """
+
+    def __init__(self, qdrant_db: QdrantHandler, chunker: Optional[TextChunker] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """metadata (e.g. product_line, language) is added to the payload of every point, for SearchFilter."""
+        self.qdrant_db = qdrant_db
+        self.chunker = chunker or qdrant_db.chunker
+        self.metadata = metadata or {}
+
+    def pdf_chunks(self, pdf_path: str) -> Iterator[Dict[str, Any]]:
+        """Chunk each page on its own so every chunk keeps its page number."""
+        for page in pdf_pages(pdf_path):
+            if not page["text"]:
+                continue
+            for chunk in self.chunker.chunk(page["text"]):
+                yield {
+                    "text": chunk["text"],
+                    "page": page["page"],
+                    "heading": None,
+                    "start_offset": chunk["start_offset"],
+                    "end_offset": chunk["end_offset"],
+                }
+
+    def xlsx_chunks(self, xlsx_path: str) -> Iterator[Dict[str, Any]]:
+        """Pack consecutive rows of a sheet into chunks of up to chunk_size tokens."""
+        rows: List[Dict[str, Any]] = []
+        tokens = 0
+
+        def make_chunk():
+            return {
+                "text": "\n".join(row["text"] for row in rows),
+                "page": None,
+                "heading": rows[0]["sheet"],
+                "sheet": rows[0]["sheet"],
+                "row_start": rows[0]["row"],
+                "row_end": rows[-1]["row"],
+            }
+
+        for row in xlsx_rows(xlsx_path):
+            row_tokens = len(TOKEN_PATTERN.findall(row["text"]))
+            if rows and (row["sheet"] != rows[0]["sheet"] or tokens + row_tokens > self.chunker.chunk_size):
+                yield make_chunk()
+                rows, tokens = [], 0
+            rows.append(row)
+            tokens += row_tokens
+        if rows:
+            yield make_chunk()
+
+    def file_chunks(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        if file_path.endswith(".pdf"):
+            return self.pdf_chunks(file_path)
+        return self.xlsx_chunks(file_path)
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """Hash the source file in blocks to detect changes between runs."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def file_points(self, file_path: str, digest: str, mtime: float, point_ids: List[str],
+                    failed: set) -> Iterator[Dict[str, Any]]:
+        """
+        Points of one source file, with the same payload fields as QdrantHandler.chunk_markdown.
+
+        IDs of the yielded points are appended to point_ids. A file that cannot be read
+        is logged and added to failed instead of aborting the whole run.
+        """
+        filename = os.path.basename(file_path)
+        doc_id = self.qdrant_db.generate_doc_id(filename)
+        try:
+            for chunk_index, chunk in enumerate(self.file_chunks(file_path)):
+                point_id = self.qdrant_db.generate_doc_id(f"{filename}#{chunk_index}")
+                point_ids.append(point_id)
+                text = chunk.pop("text")
+                yield {
+                    "id": point_id,
+                    "payload": {
+                        "text": text,
+                        "preview": self.qdrant_db.preview_text(text),
+                        "document_type": os.path.splitext(filename)[1].lstrip("."),
+                        **self.metadata,
+                        "filename": filename,
+                        "file_path": file_path,
+                        "doc_id": doc_id,
+                        "chunk_id": f"{doc_id}-{chunk_index}",
+                        "chunk_index": chunk_index,
+                        "content_hash": digest,
+                        "mtime": mtime,
+                        **chunk,
+                    },
+                }
+        except Exception as e:
+            logger.error(f"❌ Error reading {file_path}: {e}")
+            failed.add(filename)
+
+    def ingest_directory(self, directory_path: str, collection_name: Optional[str] = None,
+                         manifest_path: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Incrementally ingest the PDF and XLSX files of a directory.
+
+        Like QdrantHandler.sync_markdown_directory, unchanged files (by mtime, then
+        content hash) are skipped, and points of removed files or of chunks that a
+        changed file no longer has are deleted.
+
+        Returns:
+            Dict[str, Any]: Counts of added, updated, unchanged, removed and failed files and a success flag
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0, "success": False}
+        if not self.qdrant_db.client:
+            logger.error("❌ No Qdrant connection")
+            return stats
+
+        if not os.path.exists(directory_path):
+            logger.error(f"❌ Directory {directory_path} does not exist")
+            return stats
+
+        collection = collection_name or self.qdrant_db.collection_name
+        manifest = IndexManifest(manifest_path).load()
+        entries = manifest.entries(collection)
+        changed = {}
+        seen = set()
+
+        for filename in sorted(os.listdir(directory_path)):
+            if not filename.endswith(SOURCE_EXTENSIONS):
+                continue
+            seen.add(filename)
+            file_path = os.path.join(directory_path, filename)
+            mtime = os.stat(file_path).st_mtime
+            entry = entries.get(filename)
+            if entry and not force and entry["mtime"] == mtime:
+                stats["unchanged"] += 1
+                continue
+            digest = self.file_hash(file_path)
+            if entry and not force and entry["content_hash"] == digest:
+                entry["mtime"] = mtime
+                stats["unchanged"] += 1
+                continue
+            stats["updated" if entry else "added"] += 1
+            changed[filename] = {"file_path": file_path, "digest": digest, "mtime": mtime, "point_ids": []}
+
+        # Entries of other sources (e.g. markdown synced into the same collection) are left alone
+        removed_files = {filename for filename in entries if filename.endswith(SOURCE_EXTENSIONS)} - seen
+        stats["removed"] = len(removed_files)
+        logger.info(
+            f"✅ Ingest plan: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+        )
+
+        failed = set()
+        success = True
+        if changed:
+            points = (
+                point
+                for file in changed.values()
+                for point in self.file_points(file["file_path"], file["digest"], file["mtime"], file["point_ids"], failed)
+            )
+            success = self.qdrant_db.bulk_insert_points(points, collection)
+
+        stale_ids = []
+        for filename, file in changed.items():
+            if filename in failed:
+                continue
+            entry = entries.get(filename)
+            if entry:
+                stale_ids.extend(set(entry["point_ids"]) - set(file["point_ids"]))
+        for filename in removed_files:
+            stale_ids.extend(entries[filename]["point_ids"])
+        if success and stale_ids:
+            success = self.qdrant_db.delete_vectors(stale_ids, collection)
+        # After the writes, so no answer built on the old index is cached while they run
+        if changed or removed_files:
+            self.qdrant_db.invalidate_answer_cache()
+
+        # Only record files whose points made it into Qdrant; failures are retried next run
+        if success:
+            for filename, file in changed.items():
+                if filename not in failed:
+                    manifest.set(collection, filename, file["digest"], file["mtime"], file["point_ids"])
+            for filename in removed_files:
+                manifest.remove(collection, filename)
+        manifest.save()
+        stats["failed"] = len(failed)
+        stats["success"] = success and not failed
+        return stats
+
+
+def main():
+    from src.logger import setup_logging
+
+    parser = argparse.ArgumentParser(description="Ingest PDF and XLSX files into Qdrant in one pass.")
+    parser.add_argument("--input", default="./dataset/pdf_files", help="Folder with the PDF and XLSX files")
+    parser.add_argument("--collection", default=None, help="Qdrant collection (default: the configured one)")
+    parser.add_argument("--manifest", default=None, help="Index manifest path (default: INDEX_MANIFEST_PATH)")
+    parser.add_argument("--force", action="store_true", help="Re-ingest files even if they are unchanged")
+    parser.add_argument("--product-line", default=None, help="Product line of the documents, for search filters")
+    parser.add_argument("--language", default=None, help="Language of the documents, for search filters")
+    parser.add_argument("--profile", default=None,
+                        help="Collection profile for a new collection (default: QDRANT_COLLECTION_PROFILE)")
+    args = parser.parse_args()
+
+    log_listener = setup_logging()
+    qdrant_db = QdrantHandler()
+    try:
+        qdrant_db.connect_to_database()
+        collection = args.collection or qdrant_db.collection_name
+        if not qdrant_db.client.collection_exists(collection):
+            qdrant_db.create_collection(collection, profile=args.profile)
+        metadata = {key: value for key, value in
+                    {"product_line": args.product_line, "language": args.language}.items() if value}
+        stats = IngestPipeline(qdrant_db, metadata=metadata).ingest_directory(args.input, collection, args.manifest, args.force)
+        logger.info(f"Ingestion finished: {stats}")
+    finally:
+        qdrant_db.close_connection()
+        close_qdrant_clients()
+        log_listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item requests into batched calls.
+
+    Items submitted within max_wait_ms of the first item of a batch (up to
+    max_batch_size items) are handed to batch_fn in one call on the given
+    executor runner, and each caller gets its own result back. batch_fn must
+    return one result per item, in order. close() fails every caller still
+    waiting, whether its item is queued or in a running batch.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 run_blocking: Callable[..., Awaitable[Any]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.batch_fn = batch_fn
+        self.run_blocking = run_blocking
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.inflight = set()
+        # Futures of every submitted item not answered yet
+        self.waiting = set()
+        self.batches = 0
+        self.items = 0
+
+    def ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.worker is None or self.worker.done():
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self.collect())
+
+    async def submit(self, item: Any) -> Any:
+        self.ensure_worker()
+        future = self.loop.create_future()
+        self.waiting.add(future)
+        future.add_done_callback(self.waiting.discard)
+        self.queue.put_nowait((item, future))
+        return await future
+
+    async def collect(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = self.loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Process on the executor while the next batch is being collected
+            task = self.loop.create_task(self.process(batch))
+            self.inflight.add(task)
+            task.add_done_callback(self.inflight.discard)
+
+    async def process(self, batch):
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.run_blocking(self.batch_fn, [item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"❌ Batched call failed for {len(batch)} items: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    async def close(self):
+        """Stop collecting, cancel running batches and fail the callers still waiting."""
+        if self.worker is not None:
+            self.worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.worker
+            self.worker = None
+        for task in list(self.inflight):
+            task.cancel()
+        await asyncio.gather(*self.inflight, return_exceptions=True)
+        for future in list(self.waiting):
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher closed before the item was processed"))
+        self.queue = None
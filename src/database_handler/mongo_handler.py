@@ -1,15 +1,30 @@
-from pymongo import MongoClient
-from typing import Optional, List, Dict, Any
+from pymongo import ASCENDING, MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import Optional, List, Dict, Any, Tuple
 import logging
 import datetime
-import atexit
 from src.app_config import app_config
-from src.schema.celeb import (
+from src.schema import (
     ConversationInfor,
     UserThread,
     Message,
 )
 
+logger = logging.getLogger(__name__)
+
+
+def client_options() -> Dict[str, Any]:
+    """Connection pool and timeout settings shared by the sync and async clients."""
+    options = {
+        "maxPoolSize": app_config.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": app_config.MONGODB_MIN_POOL_SIZE,
+        "connectTimeoutMS": app_config.MONGODB_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": app_config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": app_config.MONGODB_SOCKET_TIMEOUT_MS,
+        "maxIdleTimeMS": app_config.MONGODB_MAX_IDLE_TIME_MS,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
 
 class BaseMongoDBHandler:
     def __init__(self, db_name: str, collection_name: str):
@@ -19,7 +34,6 @@ class BaseMongoDBHandler:
         self.collection = None
         self.db_name = db_name
         self.collection_name = collection_name
-        atexit.register(self.close_connection)
 
     def connect_to_database(self):
         """Establish a connection to MongoDB."""
@@ -30,66 +44,66 @@ class BaseMongoDBHandler:
                 )
 
             if not self.client:
-                self.client = MongoClient(app_config.MONGODB_URI)
+                self.client = MongoClient(app_config.MONGODB_URI, **client_options())
                 self.db = self.client[self.db_name]
                 self.collection = self.db[self.collection_name]
-                print("✅ MongoDB connection established.")
+                logger.info("✅ MongoDB connection established.")
 
         except Exception as e:
-            print(f"❌ MongoDB connection error: {e}")
+            logger.error(f"❌ MongoDB connection error: {e}")
             self.close_connection()
 
     def insert_one(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Insert a single document into MongoDB."""
-        if not self.collection:
+        if self.collection is None:
             return {"status": "error", "message": "No database connection"}
 
         try:
-            result = self.collection.insert_one(data)
-            inserted_doc = self.collection.find_one({"_id": result.inserted_id})
-            print("✅ Document inserted successfully.")
+            # insert_one sets data["_id"], so the stored document needs no read-back
+            self.collection.insert_one(data)
+            logger.debug("✅ Document inserted successfully.")
             return {
                 "status": "success",
                 "message": "Document inserted successfully",
-                "data": inserted_doc,
+                "data": data,
             }
         except Exception as e:
-            print(f"❌ Error inserting document: {e}")
+            logger.error(f"❌ Error inserting document: {e}")
             return {"status": "error", "message": str(e)}
 
     def insert_many(self, data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Insert multiple documents into MongoDB."""
-        if not self.collection:
+        if self.collection is None:
             return {"status": "error", "message": "No database connection"}
 
         try:
             result = self.collection.insert_many(data_list)
-            print(f"✅ {len(result.inserted_ids)} documents inserted successfully.")
+            logger.debug(f"✅ {len(result.inserted_ids)} documents inserted successfully.")
             return {
                 "status": "success",
                 "message": f"{len(result.inserted_ids)} documents inserted successfully",
                 "inserted_ids": result.inserted_ids,
             }
         except Exception as e:
-            print(f"❌ Error inserting documents: {e}")
+            logger.error(f"❌ Error inserting documents: {e}")
             return {"status": "error", "message": str(e)}
 
     def find_one(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Find a single document in MongoDB."""
-        if not self.collection:
+        if self.collection is None:
             return None
 
         try:
             document = self.collection.find_one(query)
             return document
         except Exception as e:
-            print(f"❌ Error finding document: {e}")
+            logger.error(f"❌ Error finding document: {e}")
             return None
 
     def find_many(self, query: Dict[str, Any], limit: int = 0) -> List[Dict[str, Any]]:
         """Find multiple documents in MongoDB."""
         # import pdb; pdb.set_trace()
-        # if not self.collection:
+        # if self.collection is None:
         #     return []
         # import pdb; pdb.set_trace()
 
@@ -99,76 +113,76 @@ class BaseMongoDBHandler:
                 cursor = cursor.limit(limit)
             return list(cursor)
         except Exception as e:
-            print(f"❌ Error finding documents: {e}")
+            logger.error(f"❌ Error finding documents: {e}")
             return []
 
     def update_one(
         self, query: Dict[str, Any], update_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Update a single document in MongoDB."""
-        if not self.collection:
+        if self.collection is None:
             return {"status": "error", "message": "No database connection"}
 
         try:
             result = self.collection.update_one(query, {"$set": update_data})
             if result.modified_count > 0:
-                print("✅ Document updated successfully.")
+                logger.debug("✅ Document updated successfully.")
                 return {
                     "status": "success",
                     "message": "Document updated successfully",
                     "modified_count": result.modified_count,
                 }
             else:
-                print("ℹ️ No document was updated.")
+                logger.debug("ℹ️ No document was updated.")
                 return {
                     "status": "info",
                     "message": "No document was updated",
                     "modified_count": 0,
                 }
         except Exception as e:
-            print(f"❌ Error updating document: {e}")
+            logger.error(f"❌ Error updating document: {e}")
             return {"status": "error", "message": str(e)}
 
     def delete_one(self, query: Dict[str, Any]) -> Dict[str, Any]:
         """Delete a single document from MongoDB."""
-        if not self.collection:
+        if self.collection is None:
             return {"status": "error", "message": "No database connection"}
 
         try:
             result = self.collection.delete_one(query)
             if result.deleted_count > 0:
-                print("✅ Document deleted successfully.")
+                logger.debug("✅ Document deleted successfully.")
                 return {
                     "status": "success",
                     "message": "Document deleted successfully",
                     "deleted_count": result.deleted_count,
                 }
             else:
-                print("ℹ️ No document was deleted.")
+                logger.debug("ℹ️ No document was deleted.")
                 return {
                     "status": "info",
                     "message": "No document was deleted",
                     "deleted_count": 0,
                 }
         except Exception as e:
-            print(f"❌ Error deleting document: {e}")
+            logger.error(f"❌ Error deleting document: {e}")
             return {"status": "error", "message": str(e)}
 
     def delete_many(self, query: Dict[str, Any]) -> Dict[str, Any]:
         """Delete multiple documents from MongoDB."""
-        if not self.collection:
+        if self.collection is None:
             return {"status": "error", "message": "No database connection"}
 
         try:
             result = self.collection.delete_many(query)
-            print(f"✅ {result.deleted_count} documents deleted successfully.")
+            logger.debug(f"✅ {result.deleted_count} documents deleted successfully.")
             return {
                 "status": "success",
                 "message": f"{result.deleted_count} documents deleted successfully",
                 "deleted_count": result.deleted_count,
             }
         except Exception as e:
-            print(f"❌ Error deleting documents: {e}")
+            logger.error(f"❌ Error deleting documents: {e}")
             return {"status": "error", "message": str(e)}
 
     def close_connection(self):
@@ -179,9 +193,9 @@ class BaseMongoDBHandler:
                 self.client = None
                 self.db = None
                 self.collection = None
-                print("🔒 MongoDB connection closed.")
+                logger.info("🔒 MongoDB connection closed.")
         except Exception as e:
-            print(f"⚠️ Error closing MongoDB connection: {e}")
+            logger.warning(f"⚠️ Error closing MongoDB connection: {e}")
 
     def __enter__(self):
         """Context manager entry."""
@@ -193,87 +207,236 @@ class BaseMongoDBHandler:
         self.close_connection()
 
 
-class MemoryHandler(BaseMongoDBHandler):
-    def __init__(self, db_name: str, collection_name: str):
+class ConversationQueries:
+    """
+    Conversation document queries shared by MemoryHandler and AsyncMemoryHandler.
+
+    A conversation document keeps only the latest `max_messages` messages; older ones
+    are moved to bucketed documents in the archive collection, so a thread never
+    approaches MongoDB's document size limit. `message_count` counts every message
+    ever added.
+    """
+
+    THREAD_KEY = [("user_id", ASCENDING), ("thread_id", ASCENDING), ("agent_name", ASCENDING)]
+
+    def configure_conversations(self, archive_collection_name: Optional[str] = None,
+                                max_messages: Optional[int] = None, archive_bucket_size: Optional[int] = None):
+        self.archive_collection_name = archive_collection_name or app_config.CONVERSATION_ARCHIVE_COLLECTION
+        self.max_messages = max_messages or app_config.CONVERSATION_MAX_MESSAGES
+        self.archive_bucket_size = archive_bucket_size or app_config.CONVERSATION_ARCHIVE_BUCKET_SIZE
+        self.archive = None
+
+    @staticmethod
+    def thread_filter(thread_infor: UserThread) -> Dict[str, Any]:
+        return {
+            "user_id": thread_infor.user_id,
+            "thread_id": thread_infor.thread_id,
+            "agent_name": thread_infor.agent_name,
+        }
+
+    @staticmethod
+    def conversation_projection(last_n: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        return {"messages": {"$slice": -last_n}} if last_n else None
+
+    def append_operation(self, conversation_infor: ConversationInfor) -> Dict[str, Any]:
+        """Update appending messages and trimming the window to max_messages."""
+        thread = conversation_infor.user_thread_infor
+        messages_as_dicts = [
+            {"role": msg.role, "content": msg.content}
+            for msg in conversation_infor.messages
+        ]
+        return {
+            "$setOnInsert": {
+                **self.thread_filter(thread),
+                "created_at": datetime.datetime.utcnow(),
+            },
+            "$push": {
+                "messages": {
+                    "$each": messages_as_dicts,
+                    "$slice": -self.max_messages,
+                }
+            },
+            "$inc": {"message_count": len(messages_as_dicts)},
+        }
+
+    def append_update(self, conversation_infor: ConversationInfor) -> Dict[str, Any]:
+        """find_one_and_update arguments that append and trim in one operation."""
+        return {
+            "filter": self.thread_filter(conversation_infor.user_thread_infor),
+            "update": self.append_operation(conversation_infor),
+            # The pre-update window tells which messages the $slice trimmed
+            "projection": {"messages": 1, "message_count": 1},
+            "upsert": True,
+            "return_document": ReturnDocument.BEFORE,
+        }
+
+    def guarded_append_filter(self, conversation_infor: ConversationInfor,
+                              previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Filter matching the thread only while it still has the message_count read in previous.
+
+        Used for batched appends, where the trimmed messages are computed from an
+        earlier read: if the thread changed meanwhile the update does not apply (the
+        upsert then fails on the unique thread index) and is retried on a fresh read.
+        """
+        query = self.thread_filter(conversation_infor.user_thread_infor)
+        if previous is not None and "message_count" in previous:
+            query["message_count"] = previous["message_count"]
+        else:
+            query["message_count"] = {"$exists": False}
+        return query
+
+    @staticmethod
+    def thread_key(thread_infor: UserThread) -> Tuple[str, str, str]:
+        return thread_infor.user_id, thread_infor.thread_id, thread_infor.agent_name
+
+    def merge_conversations(self, conversations: List[ConversationInfor]) -> List[ConversationInfor]:
+        """Combine updates of the same thread, keeping message order."""
+        merged: Dict[Tuple[str, str, str], ConversationInfor] = {}
+        for conversation in conversations:
+            key = self.thread_key(conversation.user_thread_infor)
+            if key in merged:
+                merged[key].messages.extend(conversation.messages)
+            else:
+                merged[key] = ConversationInfor(
+                    user_thread_infor=conversation.user_thread_infor,
+                    messages=list(conversation.messages),
+                )
+        return list(merged.values())
+
+    def trimmed_messages(self, previous: Optional[Dict[str, Any]],
+                         conversation_infor: ConversationInfor) -> Tuple[List[Dict[str, Any]], int]:
+        """Messages pushed out of the window by an append, and the absolute index of the first one."""
+        old_messages = (previous or {}).get("messages", [])
+        new_messages = [{"role": msg.role, "content": msg.content} for msg in conversation_infor.messages]
+        overflow = len(old_messages) + len(new_messages) - self.max_messages
+        first_index = (previous or {}).get("message_count", len(old_messages)) - len(old_messages)
+        return (old_messages + new_messages)[:max(overflow, 0)], first_index
+
+    def archive_updates(self, thread_infor: UserThread, messages: List[Dict[str, Any]], first_index: int):
+        """
+        update_one arguments (all upserts) archiving trimmed messages into buckets keyed by absolute message index.
+
+        Bucket n starts at message n * archive_bucket_size (its first_index) and `count`
+        is the position after its last message. An update only matches the bucket the
+        messages belong to, and only while it ends exactly where they start, so a
+        repeated update never appends twice: its upsert fails on the unique
+        (thread, first_index) index instead.
+        """
+        size = self.archive_bucket_size
+        index, end = first_index, first_index + len(messages)
+        while index < end:
+            bucket_start = index - index % size
+            stop = min(bucket_start + size, end)
+            yield (
+                {**self.thread_filter(thread_infor), "first_index": bucket_start, "count": index - bucket_start},
+                {
+                    "$setOnInsert": {"created_at": datetime.datetime.utcnow()},
+                    "$push": {"messages": {"$each": messages[index - first_index:stop - first_index]}},
+                    "$inc": {"count": stop - index},
+                },
+            )
+            index = stop
+
+    def summary_update(self, thread_infor: UserThread, summary: str, summarized_count: int,
+                       previous_count: int = 0) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        update_one arguments storing the rolling summary and how many messages it covers.
+
+        The update only applies if the summary still covers previous_count messages,
+        so two concurrent summarizations of the same thread cannot overwrite each other.
+        """
+        return (
+            {
+                **self.thread_filter(thread_infor),
+                "summarized_count": {"$in": [previous_count, None]} if not previous_count else previous_count,
+            },
+            {"$set": {"summary": summary, "summarized_count": summarized_count}},
+        )
+
+
+class MemoryHandler(ConversationQueries, BaseMongoDBHandler):
+    """
+    Conversation store: one document per (user_id, thread_id, agent_name), see ConversationQueries.
+
+    The unique thread and archive bucket indexes are created by
+    AsyncMemoryHandler.create_indexes when the API starts.
+    """
+
+    def __init__(self, db_name: str, collection_name: str, archive_collection_name: Optional[str] = None,
+                 max_messages: Optional[int] = None, archive_bucket_size: Optional[int] = None):
         super().__init__(db_name, collection_name)
+        self.configure_conversations(archive_collection_name, max_messages, archive_bucket_size)
+
+    def connect_to_database(self):
+        super().connect_to_database()
+        if self.collection is not None:
+            self.archive = self.db[self.archive_collection_name]
 
     def clear_collection(self):
         """Clear all documents from the collection."""
         self.collection.delete_many({})
-        print(f"Collection '{self.collection.name}' cleared.")
+        self.archive.delete_many({})
+        logger.info(f"Collection '{self.collection.name}' cleared.")
 
     def clear_conversation(self, thread_infor: UserThread):
         """Clear a specific conversation."""
-        result = self.collection.delete_one(
-            {"user_id": thread_infor.user_id, "thread_id": thread_infor.thread_id}
-        )
+        query = {"user_id": thread_infor.user_id, "thread_id": thread_infor.thread_id}
+        result = self.collection.delete_one(query)
+        self.archive.delete_many(query)
         if result.deleted_count > 0:
-            print(
+            logger.info(
                 f"Conversation for user_id '{thread_infor.user_id}' and thread_id '{thread_infor.thread_id}' cleared."
             )
             return True
         else:
-            print(
+            logger.debug(
                 f"No conversation found for user_id '{thread_infor.user_id}' and thread_id '{thread_infor.thread_id}'."
             )
             return False
 
     def insert_or_update_conversation(self, conversation_infor: ConversationInfor):
         if not conversation_infor.messages:
-            print("No messages provided. Skipping update.")
+            logger.debug("No messages provided. Skipping update.")
             return
 
-        messages_as_dicts = [
-            {"role": msg.role, "content": msg.content}
-            for msg in conversation_infor.messages
-        ]
-
-        result = self.collection.update_one(
-            {
-                "user_id": conversation_infor.user_thread_infor.user_id,
-                "thread_id": conversation_infor.user_thread_infor.thread_id,
-                "agent_name": conversation_infor.user_thread_infor.agent_name,
-            },
-            {
-                "$setOnInsert": {
-                    "user_id": conversation_infor.user_thread_infor.user_id,
-                    "thread_id": conversation_infor.user_thread_infor.thread_id,
-                    "agent_name": conversation_infor.user_thread_infor.agent_name,
-                    "created_at": datetime.datetime.utcnow(),
-                },
-                "$push": {
-                    "messages": {
-                        "$each": messages_as_dicts,
-                        # "$slice": -50,  # Keeps only the last 50 messages
-                    }
-                },
-            },
-            upsert=True,
-        )
-
-        if result.upserted_id:
-            print("New conversation inserted.")
-        else:
-            print("Conversation updated, keeping only the last 50 messages.")
-
-    def retrieve_conversation(self, thread_infor: UserThread) -> ConversationInfor:
-        conversation = self.collection.find_one(
-            {
-                "user_id": thread_infor.user_id,
-                "thread_id": thread_infor.thread_id,
-                "agent_name": thread_infor.agent_name,
-            }
-        )
+        previous = self.collection.find_one_and_update(**self.append_update(conversation_infor))
+        if previous is None:
+            logger.debug("New conversation inserted.")
+        trimmed, first_index = self.trimmed_messages(previous, conversation_infor)
+        self.archive_messages(conversation_infor.user_thread_infor, trimmed, first_index)
+        logger.debug(f"Conversation updated, keeping the last {self.max_messages} messages.")
+
+    def archive_messages(self, thread_infor: UserThread, messages: List[Dict[str, Any]], first_index: int):
+        for query, update in self.archive_updates(thread_infor, messages, first_index):
+            try:
+                self.archive.update_one(query, update, upsert=True)
+            except DuplicateKeyError:
+                logger.debug(f"Messages from {query['first_index'] + query['count']} already archived")
+
+    def retrieve_conversation(self, thread_infor: UserThread, last_n: Optional[int] = None) -> ConversationInfor:
+        """Fetch a conversation; with last_n only its latest last_n messages are read."""
+        conversation = self.collection.find_one(self.thread_filter(thread_infor), self.conversation_projection(last_n))
         if conversation:
             conversation["_id"] = str(conversation["_id"])  # Convert ObjectId to string
             return conversation
-        print(
+        logger.debug(
             f"No conversation found for user_id '{thread_infor.user_id}' and thread_id '{thread_infor.thread_id}'."
         )
         return {}
 
+    def retrieve_archived_messages(self, thread_infor: UserThread) -> List[Dict[str, Any]]:
+        """All archived messages of a thread, oldest first."""
+        buckets = self.archive.find(self.thread_filter(thread_infor), {"messages": 1}).sort("first_index", ASCENDING)
+        return [message for bucket in buckets for message in bucket["messages"]]
+
+    def update_summary(self, thread_infor: UserThread, summary: str, summarized_count: int,
+                       previous_count: int = 0) -> bool:
+        result = self.collection.update_one(*self.summary_update(thread_infor, summary, summarized_count, previous_count))
+        return result.modified_count > 0
+
     def format_conversation(self, conversation: Dict) -> str:
-        """Format the last two messages of a conversation."""
+        """Format the last two messages of a conversation (read with retrieve_conversation(..., last_n=2))."""
         if "messages" not in conversation or not isinstance(
             conversation["messages"], list
         ):
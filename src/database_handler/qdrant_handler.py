@@ -1,86 +1,475 @@
-from qdrant_client import QdrantClient
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import batched
+import httpx
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Tuple, Union
 import logging
 import os
 import markdown
 from bs4 import BeautifulSoup
 import hashlib
+import uuid
 from src.app_config import app_config
-from langchain.retrievers.contextual_compression import ContextualCompressionRetriever
-from langchain_community.document_compressors.rankllm_rerank import RankLLMRerank
-from langchain_core.documents import Document
-# from langchain.retrievers.document_compressors import FlashrankRerank
-from typing import List
-from sentence_transformers import SentenceTransformer
-# from flashrank.reranker import FlashrankRerank
+from src.database_handler.collection_profiles import CollectionProfile, get_collection_profile, profile_for_collection
+from src.database_handler.embedding_backend import create_embedding_backend, parse_embedding_spec
+from src.database_handler.embedding_cache import create_embedding_cache
+from src.database_handler.index_manifest import IndexManifest
+from src.database_handler.micro_batcher import MicroBatcher
+from src.database_handler.rerank_policy import RerankPolicy
+from src.database_handler.text_chunker import TextChunker
+from src.logger import TRACE, trace
+from src.metrics import RERANK_DECISIONS, RETRIEVAL_STAGE_LATENCY
+from src.schema import SearchFilter
 from flashrank import Ranker, RerankRequest
 from tqdm import tqdm 
 
 
+logger = logging.getLogger(__name__)
+
 COLLECTION_NAME = "knowledgebase"
+ANSWER_CACHE_COLLECTION_NAME = "answer_cache"
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "sparse"
+
+# Payload fields that SearchFilter can match on, indexed so filters are applied server-side during the search
+PAYLOAD_INDEXES = {
+    "product_line": models.PayloadSchemaType.KEYWORD,
+    "language": models.PayloadSchemaType.KEYWORD,
+    "document_type": models.PayloadSchemaType.KEYWORD,
+    "filename": models.PayloadSchemaType.KEYWORD,
+    "doc_id": models.PayloadSchemaType.KEYWORD,
+    "page": models.PayloadSchemaType.INTEGER,
+}
+
+# Models are loaded lazily, once per process, and shared by every QdrantHandler.
+# Loading them before the server forks its workers (PRELOAD_MODELS) shares the pages copy-on-write.
+shared_models: Dict[str, Any] = {}
+shared_models_lock = threading.Lock()
+
+
+def load_shared_model(key: str, factory):
+    """Return the process-wide model registered under key, building it on first use."""
+    model = shared_models.get(key)
+    if model is None:
+        with shared_models_lock:
+            model = shared_models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = factory()
+                shared_models[key] = model
+                logger.info(f"✅ Loaded {key} in {time.perf_counter() - start:.2f}s")
+    return model
+
+# One client pair per process, shared by every QdrantHandler so connections (and the gRPC channel) are reused
+shared_clients: Dict[str, Any] = {}
+shared_clients_lock = threading.Lock()
+
+
+def client_options(transport: str) -> Dict[str, Any]:
+    """Client settings for the "grpc" or "rest" transport, with keep-alive and timeouts from AppConfig."""
+    options = {
+        "url": app_config.QDRANT_URL,
+        "api_key": app_config.QDRANT_API_KEY,
+        "timeout": app_config.QDRANT_TIMEOUT,
+    }
+    if transport == "grpc":
+        options.update(
+            prefer_grpc=True,
+            grpc_port=app_config.QDRANT_GRPC_PORT,
+            grpc_options={
+                "grpc.keepalive_time_ms": app_config.QDRANT_KEEPALIVE_MS,
+                "grpc.keepalive_timeout_ms": app_config.QDRANT_TIMEOUT * 1000,
+                "grpc.keepalive_permit_without_calls": 1,
+            },
+        )
+    else:
+        options.update(
+            prefer_grpc=False,
+            limits=httpx.Limits(
+                max_keepalive_connections=app_config.QDRANT_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=app_config.QDRANT_KEEPALIVE_MS / 1000,
+            ),
+        )
+    return options
+
+
+def create_client(transport: str) -> Tuple[QdrantClient, str]:
+    """
+    Connect with the requested transport and return the client and the transport in use.
+    gRPC is probed with a cheap call and falls back to REST when the gRPC port is unreachable.
+    """
+    if transport == "grpc":
+        client = QdrantClient(**client_options("grpc"))
+        try:
+            client.get_collections()
+            return client, "grpc"
+        except Exception as e:
+            client.close()
+            logger.warning(f"⚠️ Qdrant gRPC transport unavailable, falling back to REST: {e}")
+    return QdrantClient(**client_options("rest")), "rest"
+
+
+def get_qdrant_clients() -> Tuple[QdrantClient, AsyncQdrantClient]:
+    """The process-wide sync and async clients, created on first use."""
+    with shared_clients_lock:
+        if "sync" not in shared_clients:
+            client, transport = create_client(app_config.QDRANT_TRANSPORT)
+            # The async client follows whichever transport the sync client ended up on
+            shared_clients["sync"] = client
+            shared_clients["async"] = AsyncQdrantClient(**client_options(transport))
+            shared_clients["transport"] = transport
+            logger.info(f"✅ Qdrant clients created ({transport})")
+        return shared_clients["sync"], shared_clients["async"]
+
+
+def take_shared_clients():
+    with shared_clients_lock:
+        client = shared_clients.pop("sync", None)
+        async_client = shared_clients.pop("async", None)
+        shared_clients.clear()
+    return client, async_client
+
+
+def close_qdrant_clients():
+    """
+    Close the shared clients from synchronous code (e.g. CLI scripts). Called while an
+    event loop is running, the async client is closed in a task on that loop; prefer
+    awaiting aclose_qdrant_clients there.
+    """
+    client, async_client = take_shared_clients()
+    if async_client:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(async_client.close())
+        else:
+            loop.create_task(async_client.close())
+    if client:
+        client.close()
+        logger.info("🔒 Qdrant connection closed")
+
+
+async def aclose_qdrant_clients():
+    client, async_client = take_shared_clients()
+    if async_client:
+        await async_client.close()
+    if client:
+        client.close()
+        logger.info("🔒 Qdrant connection closed")
+
 
 class QdrantHandler:
     def __init__(self):
         """Initialize Qdrant client."""
         self.client = None
+        self.async_client = None
         self.collection_name = COLLECTION_NAME
-        self.vector_size = 768
-        self.llm_model = SentenceTransformer("nomic-ai/nomic-embed-text-v1.5", trust_remote_code=True)
-        self.reranker = Ranker(max_length=128)
+        self.answer_cache_collection = app_config.COLLECTION_NAME_MEM or ANSWER_CACHE_COLLECTION_NAME
+        self.embedding_backend_name, self.embedding_model_name = parse_embedding_spec(app_config.EMBEDDING_MODEL)
+        self.embedding_key = f"embedding:{self.embedding_backend_name}:{self.embedding_model_name}"
+        self.embedding_cache = create_embedding_cache(namespace=self.embedding_key)
+        self.chunker = TextChunker()
+        # collection name -> whether it stores named dense + sparse vectors (hybrid layout)
+        self.hybrid_collections: Dict[str, bool] = {}
+        # collection name -> dense vector size (smaller than the model's with Matryoshka truncation)
+        self.vector_dimensions: Dict[str, int] = {}
+        # Storage/index profile for new collections
+        self.profile = get_collection_profile(app_config.QDRANT_COLLECTION_PROFILE)
+        # collection name -> its profile, as created or read from its Qdrant config; searches use its search settings
+        self.collection_profiles: Dict[str, CollectionProfile] = {}
+        self.rerank_policy = RerankPolicy()
+        # Collections whose payload indexes were ensured by this handler
+        self.indexed_collections = set()
+        # Bounded pool for CPU-bound embedding/rerank work so async callers never block the event loop
+        self.executor = ThreadPoolExecutor(max_workers=app_config.MODEL_WORKERS, thread_name_prefix="qdrant-model")
+        # Queries embedded within a few ms of each other share one batched encode call
+        self.embedding_batcher = MicroBatcher(
+            self.get_query_embeddings,
+            self.run_blocking,
+            max_batch_size=app_config.EMBED_BATCH_MAX_SIZE,
+            max_wait_ms=app_config.EMBED_BATCH_MAX_WAIT_MS,
+        ) if app_config.EMBED_BATCH_ENABLED else None
+
+    @property
+    def embedder(self):
+        return load_shared_model(
+            self.embedding_key,
+            partial(create_embedding_backend, f"{self.embedding_backend_name}:{self.embedding_model_name}"),
+        )
+
+    @property
+    def vector_size(self) -> int:
+        """Dense vector size of the embedding model; collections may store fewer dimensions (see CollectionProfile)."""
+        return self.embedder.dimension
+
+    @property
+    def reranker(self):
+        """First-stage reranker (RERANK_MODEL)."""
+        return self.rerank_model(self.rerank_policy.model)
+
+    def rerank_model(self, model_name: str) -> Ranker:
+        return load_shared_model(
+            f"reranker:{model_name}:{app_config.RERANK_MAX_LENGTH}",
+            partial(Ranker, model_name=model_name, max_length=app_config.RERANK_MAX_LENGTH),
+        )
+
+    @property
+    def sparse_embedder(self):
+        def load_sparse_model():
+            from fastembed import SparseTextEmbedding
+            return SparseTextEmbedding(model_name=app_config.SPARSE_MODEL)
+
+        return load_shared_model(f"sparse:{app_config.SPARSE_MODEL}", load_sparse_model)
+
+    def load_models(self):
+        """Load and warm up the embedding and rerank models (the cascade model too, if configured)."""
+        self.embedder.encode(["warm-up"])
+        request = RerankRequest(query="warm-up", passages=[{"id": "0", "text": "warm-up"}])
+        self.reranker.rerank(request)
+        if self.rerank_policy.cascade_model:
+            self.rerank_model(self.rerank_policy.cascade_model).rerank(request)
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """Run a blocking call on the model executor and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
 
     def get_embedding(self, text: str) -> List[float]:
-        return self.llm_model.encode(text).tolist()
+        return self.embedder.encode([text], batch_size=1)[0]
+
+    def get_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """Embed a list of texts in one batched encode call."""
+        return self.embedder.encode(texts, batch_size=batch_size or app_config.EMBEDDING_BATCH_SIZE)
+
+    async def aget_embedding(self, text: str) -> List[float]:
+        return await self.run_blocking(self.get_embedding, text)
+
+    def get_query_embedding(self, query: str) -> List[float]:
+        """Embed a search query, reusing cached embeddings of previously seen queries."""
+        vector = self.embedding_cache.get(query)
+        if vector is None:
+            vector = self.get_embedding(query)
+            self.embedding_cache.set(query, vector)
+        return vector
+
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embed several search queries, encoding only the cache misses in one batched call."""
+        vectors = [self.embedding_cache.get(query) for query in queries]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            encoded = self.get_embeddings([queries[i] for i in misses])
+            for i, vector in zip(misses, encoded):
+                vectors[i] = vector
+                self.embedding_cache.set(queries[i], vector)
+        return vectors
+
+    def get_sparse_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> List[models.SparseVector]:
+        """Sparse (BM25/SPLADE) document embeddings for hybrid collections."""
+        return [
+            models.SparseVector(indices=vector.indices.tolist(), values=vector.values.tolist())
+            for vector in self.sparse_embedder.embed(texts, batch_size=batch_size or app_config.EMBEDDING_BATCH_SIZE)
+        ]
+
+    def get_sparse_query_embedding(self, query: str) -> models.SparseVector:
+        vector = next(iter(self.sparse_embedder.query_embed(query)))
+        return models.SparseVector(indices=vector.indices.tolist(), values=vector.values.tolist())
+
+    def build_vectors(self, texts: List[str], collection_name: Optional[str] = None) -> List[Any]:
+        """Embed texts into the vector layout of the target collection (plain dense or named dense + sparse)."""
+        hybrid = self.is_hybrid_collection(collection_name)
+        size = self.vector_dimensions.get(collection_name or self.collection_name)
+        dense = [self.fit_vector(vector, size) for vector in self.get_embeddings(texts)]
+        if not hybrid:
+            return dense
+        sparse = self.get_sparse_embeddings(texts)
+        return [{DENSE_VECTOR_NAME: d, SPARSE_VECTOR_NAME: sp} for d, sp in zip(dense, sparse)]
+
+    async def aget_query_embedding(self, query: str) -> List[float]:
+        # In-process hits are served on the event loop; misses go to the executor
+        vector = self.embedding_cache.get(query, local_only=True)
+        if vector is not None:
+            return vector
+        if self.embedding_batcher:
+            return await self.embedding_batcher.submit(query)
+        return await self.run_blocking(self.get_query_embedding, query)
 
     def connect_to_database(self):
-        """Establish connection to Qdrant database."""
+        """Bind to the process-wide Qdrant clients (QDRANT_TRANSPORT, gRPC with REST fallback)."""
         try:
-            self.client = QdrantClient(
-                url=app_config.QDRANT_URL,
-                api_key=app_config.QDRANT_API_KEY,
-                prefer_grpc=False
-            )
-            logging.info("✅ Qdrant connection established")
+            self.client, self.async_client = get_qdrant_clients()
+            logger.info("✅ Qdrant connection established")
             return True
         except Exception as e:
-            logging.error(f"❌ Qdrant connection error: {e}")
+            logger.error(f"❌ Qdrant connection error: {e}")
             self.client = None
+            self.async_client = None
             return False
 
-    def create_collection(self, collection_name: Optional[str] = None):
-        """Create a new collection in Qdrant."""
+    def create_collection(self, collection_name: Optional[str] = None, hybrid: Optional[bool] = None,
+                          profile: Optional[Union[CollectionProfile, str]] = None):
+        """
+        Create a new collection in Qdrant.
+
+        With hybrid=True (default HYBRID_SEARCH) the collection stores a named dense
+        vector and a named sparse vector with IDF weighting for hybrid search.
+        profile (default QDRANT_COLLECTION_PROFILE) sets quantization, on-disk
+        storage, HNSW parameters and Matryoshka truncation of the dense vectors.
+        """
         if not self.client:
-            logging.error("❌ No Qdrant connection")
+            logger.error("❌ No Qdrant connection")
             return False
 
         try:
             collection = collection_name or self.collection_name
-            self.client.create_collection(
-                collection_name=collection,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=Distance.COSINE
-                )
+            hybrid = app_config.HYBRID_SEARCH if hybrid is None else hybrid
+            if profile is None:
+                profile = self.profile
+            elif isinstance(profile, str):
+                profile = get_collection_profile(profile)
+            size = profile.vector_size(self.vector_size)
+            dense_params = VectorParams(
+                size=size,
+                distance=Distance.COSINE,
+                on_disk=profile.on_disk or None
             )
-            logging.info(f"✅ Collection '{collection}' created successfully")
+            collection_params = {
+                "on_disk_payload": profile.on_disk,
+                "hnsw_config": profile.hnsw_config(),
+                "quantization_config": profile.quantization_config(),
+            }
+            if hybrid:
+                self.client.create_collection(
+                    collection_name=collection,
+                    vectors_config={DENSE_VECTOR_NAME: dense_params},
+                    sparse_vectors_config={
+                        SPARSE_VECTOR_NAME: models.SparseVectorParams(
+                            modifier=models.Modifier.IDF,
+                            index=models.SparseIndexParams(on_disk=True) if profile.on_disk else None
+                        )
+                    },
+                    **collection_params
+                )
+            else:
+                self.client.create_collection(
+                    collection_name=collection,
+                    vectors_config=dense_params,
+                    **collection_params
+                )
+            self.hybrid_collections[collection] = hybrid
+            self.vector_dimensions[collection] = size
+            self.record_profile(collection, profile)
+            logger.info(f"✅ Collection '{collection}' created successfully")
+            return self.create_payload_indexes(collection)
+        except Exception as e:
+            logger.error(f"❌ Error creating collection: {e}")
+            return False
+
+    def create_payload_indexes(self, collection_name: Optional[str] = None) -> bool:
+        """Index the filterable payload fields (PAYLOAD_INDEXES). Existing indexes are left as they are."""
+        collection = collection_name or self.collection_name
+        if collection in self.indexed_collections:
             return True
+        try:
+            for field_name, field_schema in PAYLOAD_INDEXES.items():
+                self.client.create_payload_index(collection, field_name, field_schema)
+            self.indexed_collections.add(collection)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error creating payload indexes: {e}")
+            return False
+
+    def record_profile(self, collection: str, profile: CollectionProfile):
+        """Remember the profile of a new collection; the IndexManifest keeps its name as a hint for other processes."""
+        self.collection_profiles[collection] = profile
+        try:
+            manifest = IndexManifest().load()
+            manifest.set_profile(collection, profile.name)
+            manifest.save()
         except Exception as e:
-            logging.error(f"❌ Error creating collection: {e}")
+            logger.error(f"❌ Error recording the profile of collection '{collection}': {e}")
+
+    @staticmethod
+    def profile_hint(collection: str) -> Optional[str]:
+        try:
+            return IndexManifest().load().profile(collection)
+        except Exception as e:
+            logger.warning(f"⚠️ Error reading the recorded profile of collection '{collection}': {e}")
+            return None
+
+    def collection_profile(self, collection: str) -> CollectionProfile:
+        """
+        Profile of the collection, derived from its Qdrant config by remember_layout.
+        Collections whose config could not be read use QDRANT_COLLECTION_PROFILE.
+        """
+        return self.collection_profiles.get(collection, self.profile)
+
+    def remember_layout(self, collection: str, info: models.CollectionInfo):
+        """Cache the vector layout, size and profile of an existing collection from its get_collection info."""
+        vectors_config = info.config.params.vectors
+        if isinstance(vectors_config, dict):
+            vectors_config = vectors_config[DENSE_VECTOR_NAME]
+        self.vector_dimensions[collection] = vectors_config.size
+        self.hybrid_collections[collection] = bool(info.config.params.sparse_vectors)
+        self.collection_profiles[collection] = profile_for_collection(
+            vectors_config, info.config, self.profile_hint(collection)
+        )
+
+    @staticmethod
+    def fit_vector(vector: List[float], size: Optional[int]) -> List[float]:
+        """Truncate a Matryoshka embedding to the collection's vector size."""
+        return list(vector[:size]) if size and len(vector) > size else vector
+
+    def is_hybrid_collection(self, collection_name: Optional[str] = None) -> bool:
+        """Whether the collection has the named dense + sparse layout. Cached per collection, with its vector size."""
+        collection = collection_name or self.collection_name
+        if collection not in self.hybrid_collections:
+            try:
+                self.remember_layout(collection, self.client.get_collection(collection_name=collection))
+            except Exception as e:
+                logger.error(f"❌ Error getting collection layout: {e}")
+                return False
+        return self.hybrid_collections[collection]
+
+    async def ais_hybrid_collection(self, collection_name: Optional[str] = None) -> bool:
+        collection = collection_name or self.collection_name
+        if collection not in self.hybrid_collections:
+            try:
+                self.remember_layout(collection, await self.async_client.get_collection(collection_name=collection))
+            except Exception as e:
+                logger.error(f"❌ Error getting collection layout: {e}")
+                return False
+        return self.hybrid_collections[collection]
+
+    def use_hybrid(self, hybrid: Optional[bool], is_hybrid_collection: bool) -> bool:
+        hybrid = app_config.HYBRID_SEARCH if hybrid is None else hybrid
+        if hybrid and not is_hybrid_collection:
+            logger.warning("⚠️ Hybrid search requested on a dense-only collection, falling back to dense search")
             return False
+        return hybrid
 
-    def read_markdown_file(self, file_path: str) -> str:
-        """Read and parse markdown file content."""
+    def markdown_to_text(self, content: str) -> str:
+        """Convert markdown content to plain text."""
+        # Convert markdown to HTML
+        html = markdown.markdown(content)
+        # Extract text from HTML
+        soup = BeautifulSoup(html, 'html.parser')
+        return soup.get_text()
+
+    def read_markdown_file(self, file_path: str, raw: bool = False) -> str:
+        """Read and parse markdown file content. With raw=True the markdown source is returned."""
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
                 content = file.read()
-                # Convert markdown to HTML
-                html = markdown.markdown(content)
-                # Extract text from HTML
-                soup = BeautifulSoup(html, 'html.parser')
-                return soup.get_text()
+                return content if raw else self.markdown_to_text(content)
         except Exception as e:
-            logging.error(f"❌ Error reading file {file_path}: {e}")
+            logger.error(f"❌ Error reading file {file_path}: {e}")
             return ""
 
     # def get_next_doc_id(self, collection_name: Optional[str] = None) -> int:
@@ -93,135 +482,484 @@ class QdrantHandler:
     #         info = self.client.get_collection(collection_name=collection)
     #         return info.points_count + 1
     #     except Exception as e:
-    #         logging.error(f"❌ Error getting collection size: {e}")
+    #         logger.error(f"❌ Error getting collection size: {e}")
     #         return 1
 
-    def generate_doc_id(self, filename: str) -> int:
+    def generate_doc_id(self, filename: str) -> str:
         """Generate a document ID from filename hash."""
-        # Create a hash of the filename
-        hash_object = hashlib.md5(filename.encode())
-        # Convert hash to integer and take modulo to get a reasonable size
-        return int(hash_object.hexdigest(), 16) % 1000000
+        # The full 128-bit MD5 digest maps 1:1 onto a UUID, so distinct names never share an ID
+        return str(uuid.UUID(hex=hashlib.md5(filename.encode()).hexdigest()))
+
+    def content_hash(self, content: str) -> str:
+        """Hash document content to detect changes between indexing runs."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def preview_text(text: str) -> str:
+        """Leading SEARCH_PREVIEW_CHARS of a chunk, reranked on when the full text is fetched after rerank."""
+        return text[:app_config.SEARCH_PREVIEW_CHARS]
+
+    def chunk_markdown(self, content: str, filename: str, file_path: str,
+                       mtime: Optional[float] = None) -> List[Dict]:
+        """Split a markdown document into chunk points with chunk-level IDs and offsets."""
+        doc_id = self.generate_doc_id(filename)
+        digest = self.content_hash(content)
+        points = []
+        for chunk in self.chunker.chunk(content):
+            text = self.markdown_to_text(chunk["text"]).strip()
+            if not text:
+                continue
+            points.append({
+                "id": self.generate_doc_id(f"{filename}#{chunk['chunk_index']}"),
+                "vector": None,  # Will be set by save_text_to_qdrant
+                "payload": {
+                    "text": text,
+                    "preview": self.preview_text(text),
+                    "document_type": "markdown",
+                    "filename": filename,
+                    "file_path": file_path,
+                    "doc_id": doc_id,
+                    "chunk_id": f"{doc_id}-{chunk['chunk_index']}",
+                    "chunk_index": chunk["chunk_index"],
+                    "start_offset": chunk["start_offset"],
+                    "end_offset": chunk["end_offset"],
+                    "page": chunk["page"],
+                    "heading": chunk["heading"],
+                    "content_hash": digest,
+                    "mtime": mtime,
+                }
+            })
+        for point in points:
+            point["payload"]["chunk_count"] = len(points)
+        return points
 
     def process_markdown_directory(self, directory_path: str, collection_name: Optional[str] = None) -> List[Dict]:
-        """Process all markdown files in a directory."""
+        """Process all markdown files in a directory into chunk points."""
         points = []
-        # next_id = self.get_next_doc_id(collection_name)
-        # import pdb; pdb.set_trace()
 
         for filename in tqdm(os.listdir(directory_path)):
             if filename.endswith('.md'):
                 file_path = os.path.join(directory_path, filename)
-                content = self.read_markdown_file(file_path)
+                content = self.read_markdown_file(file_path, raw=True)
                 if content:
-                    doc_id = self.generate_doc_id(filename)
-                    points.append({
-                        "id": doc_id,
-                        "vector": None,  # Will be set by save_text_to_qdrant
-                        "payload": {
-                            "text": content,
-                            "filename": filename,
-                            "file_path": file_path
-                        }
-                    })
-        # import pdb; pdb.set_trace()
+                    points.extend(self.chunk_markdown(content, filename, file_path, os.path.getmtime(file_path)))
         return points
 
-    def insert_markdown_directory(self, directory_path: str, collection_name: Optional[str] = None) -> bool:
+    def insert_markdown_directory(self, directory_path: str, collection_name: Optional[str] = None,
+                                  bulk: bool = True) -> bool:
         """
         Process and insert all markdown files from a directory into Qdrant.
         
         Args:
             directory_path: Path to directory containing markdown files
             collection_name: Collection to insert into. If None, uses default from config.
+            bulk: Embed in batches and upsert in pages (see bulk_insert_points) instead of one point at a time.
             
         Returns:
             bool: True if all files were processed successfully, False otherwise
         """
         if not self.client:
-            logging.error("❌ No Qdrant connection")
+            logger.error("❌ No Qdrant connection")
             return False
 
         if not os.path.exists(directory_path):
-            logging.error(f"❌ Directory {directory_path} does not exist")
+            logger.error(f"❌ Directory {directory_path} does not exist")
             return False
 
         try:
             # import pdb; pdb.set_trace()
             points = self.process_markdown_directory(directory_path, collection_name)
-            logging.info(f"✅ Found {len(points)} markdown files to process")
-            # import pdb; pdb.set_trace()
+            logger.info(f"✅ Found {len(points)} markdown chunks to process")
+            if bulk:
+                success = self.bulk_insert_points(points, collection_name)
+                self.invalidate_answer_cache()
+                return success
+
             success = True
             for point in points:
                 if not self.save_text_to_qdrant(
                     id=point["id"],
                     text=point["payload"]["text"],
-                    metadata={
-                        "filename": point["payload"]["filename"],
-                        "file_path": point["payload"]["file_path"]
-                    },
+                    metadata={k: v for k, v in point["payload"].items() if k != "text"},
                     collection_name=collection_name
                 ):
                     success = False
-                    logging.error(f"❌ Failed to insert document: {point['payload']['filename']}")
+                    logger.error(f"❌ Failed to insert chunk: {point['payload']['chunk_id']} ({point['payload']['filename']})")
                 else:
-                    logging.info(f"✅ Successfully inserted document: {point['payload']['filename']}")
+                    logger.info(f"✅ Successfully inserted chunk: {point['payload']['chunk_id']} ({point['payload']['filename']})")
 
+            self.invalidate_answer_cache()
             return success
         except Exception as e:
-            logging.error(f"❌ Error processing markdown directory: {e}")
+            logger.error(f"❌ Error processing markdown directory: {e}")
+            return False
+
+    def bulk_insert_points(self, points: Iterable[Dict[str, Any]], collection_name: Optional[str] = None,
+                           batch_size: Optional[int] = None, upload_workers: Optional[int] = None) -> bool:
+        """
+        Embed and upsert points in pages, uploading one page while the next is being encoded.
+
+        Args:
+            points: Points with "id" and "payload" (payload["text"] is embedded). May be a generator.
+            collection_name: Collection to insert into. If None, uses the default collection.
+            batch_size: Points per encode call and upsert request. Defaults to INGEST_BATCH_SIZE.
+            upload_workers: Concurrent upsert requests. Defaults to INGEST_UPLOAD_WORKERS.
+
+        Returns:
+            bool: True if every page was inserted successfully, False otherwise
+        """
+        if not self.client:
+            logger.error("❌ No Qdrant connection")
+            return False
+
+        batch_size = batch_size or app_config.INGEST_BATCH_SIZE
+        upload_workers = upload_workers or app_config.INGEST_UPLOAD_WORKERS
+        self.create_payload_indexes(collection_name)
+        success = True
+        inserted = 0
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="qdrant-upload") as uploader:
+            for batch in batched(points, batch_size):
+                vectors = self.build_vectors([point["payload"]["text"] for point in batch], collection_name)
+                page = [
+                    {"id": point["id"], "vector": vector, "payload": point["payload"]}
+                    for point, vector in zip(batch, vectors)
+                ]
+                pending.append(uploader.submit(self.insert_vectors, page, collection_name))
+                inserted += len(page)
+                # Keep at most upload_workers pages in flight so encoding cannot outrun the uploads
+                while len(pending) > upload_workers:
+                    success = pending.popleft().result() and success
+            while pending:
+                success = pending.popleft().result() and success
+
+        logger.info(f"✅ Bulk ingestion finished: {inserted} points")
+        return success
+
+    def sync_markdown_directory(self, directory_path: str, collection_name: Optional[str] = None,
+                                manifest_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Incrementally index a markdown directory.
+
+        Only new or changed files (by mtime, then content hash) are chunked, embedded
+        and upserted. Points of removed files, and chunks that no longer exist in a
+        changed file, are deleted. State is kept in a local IndexManifest.
+
+        Args:
+            directory_path: Path to directory containing markdown files
+            collection_name: Collection to sync. If None, uses the default collection.
+            manifest_path: Manifest location. Defaults to INDEX_MANIFEST_PATH.
+
+        Returns:
+            Dict[str, Any]: Counts of added, updated, unchanged and removed files and a success flag
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "success": False}
+        if not self.client:
+            logger.error("❌ No Qdrant connection")
+            return stats
+
+        if not os.path.exists(directory_path):
+            logger.error(f"❌ Directory {directory_path} does not exist")
+            return stats
+
+        collection = collection_name or self.collection_name
+        manifest = IndexManifest(manifest_path).load()
+        entries = manifest.entries(collection)
+        changed_points = []
+        changed_files = {}
+        stale_ids = []
+        seen = set()
+
+        try:
+            for filename in sorted(os.listdir(directory_path)):
+                if not filename.endswith('.md'):
+                    continue
+                seen.add(filename)
+                file_path = os.path.join(directory_path, filename)
+                mtime = os.stat(file_path).st_mtime
+                entry = entries.get(filename)
+                if entry and entry["mtime"] == mtime:
+                    stats["unchanged"] += 1
+                    continue
+
+                content = self.read_markdown_file(file_path, raw=True)
+                digest = self.content_hash(content)
+                if entry and entry["content_hash"] == digest:
+                    entry["mtime"] = mtime
+                    stats["unchanged"] += 1
+                    continue
+
+                points = self.chunk_markdown(content, filename, file_path, mtime) if content else []
+                point_ids = [point["id"] for point in points]
+                if entry:
+                    stale_ids.extend(set(entry["point_ids"]) - set(point_ids))
+                    stats["updated"] += 1
+                else:
+                    stats["added"] += 1
+                changed_points.extend(points)
+                changed_files[filename] = (digest, mtime, point_ids)
+
+            # Entries of other sources (e.g. PDF/XLSX ingested into the same collection) are left alone
+            removed_files = {filename for filename in entries if filename.endswith('.md')} - seen
+            for filename in removed_files:
+                stale_ids.extend(entries[filename]["point_ids"])
+                stats["removed"] += 1
+
+            logger.info(
+                f"✅ Sync plan: {stats['added']} added, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+            )
+            success = True
+            if changed_points:
+                success = self.bulk_insert_points(changed_points, collection)
+            if success and stale_ids:
+                success = self.delete_vectors(stale_ids, collection)
+            # Dropped only once the writes are done, so no answer built on the old index is cached meanwhile.
+            # A partly failed run may still have changed the index, so it drops the cache too.
+            if changed_points or stale_ids:
+                self.invalidate_answer_cache()
+
+            # Only record files whose points made it into Qdrant; failures are retried next run
+            if success:
+                for filename, (digest, mtime, point_ids) in changed_files.items():
+                    manifest.set(collection, filename, digest, mtime, point_ids)
+                for filename in removed_files:
+                    manifest.remove(collection, filename)
+            manifest.save()
+            stats["success"] = success
+            return stats
+        except Exception as e:
+            logger.error(f"❌ Error syncing markdown directory: {e}")
+            return stats
+
+    def invalidate_answer_cache(self) -> bool:
+        """Drop the semantic answer cache so no answer built on the old knowledge base is served."""
+        if not self.client:
+            logger.error("❌ No Qdrant connection")
+            return False
+
+        try:
+            if self.client.collection_exists(self.answer_cache_collection):
+                self.client.delete_collection(self.answer_cache_collection)
+                logger.info(f"🗑️ Answer cache '{self.answer_cache_collection}' invalidated")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error invalidating answer cache: {e}")
             return False
 
     def insert_vectors(self, points: List[Dict[str, Any]], collection_name: Optional[str] = None) -> bool:
         if not self.client:
-            logging.error("❌ No Qdrant connection")
+            logger.error("❌ No Qdrant connection")
             return False
 
         try:
             collection = collection_name or self.collection_name
             self.client.upsert(
                 collection_name=collection,
-                points=points
+                points=[point if isinstance(point, models.PointStruct) else models.PointStruct(**point)
+                        for point in points]
             )
-            logging.info(f"✅ Successfully inserted {len(points)} vectors")
+            logger.info(f"✅ Successfully inserted {len(points)} vectors")
             return True
         except Exception as e:
-            logging.error(f"❌ Error inserting vectors: {e}")
+            logger.error(f"❌ Error inserting vectors: {e}")
             return False
 
+    @staticmethod
+    def payload_selector(payload_fields: Optional[Sequence[str]]) -> Union[bool, models.PayloadSelectorInclude]:
+        """with_payload value for the given fields; None fetches the whole payload."""
+        if payload_fields is None:
+            return True
+        return models.PayloadSelectorInclude(include=list(payload_fields))
+
+    @staticmethod
+    def search_filter(filters: Optional[Union[SearchFilter, Dict[str, Any]]]) -> Optional[models.Filter]:
+        """Translate SearchFilter into a Qdrant filter on the indexed payload fields."""
+        if not filters:
+            return None
+        if isinstance(filters, dict):
+            filters = SearchFilter(**filters)
+        conditions = [
+            models.FieldCondition(key=key, match=models.MatchAny(any=values))
+            for key, values in filters.model_dump(exclude={"page_from", "page_to"}, exclude_none=True).items()
+            if values
+        ]
+        if filters.page_from is not None or filters.page_to is not None:
+            conditions.append(models.FieldCondition(
+                key="page", range=models.Range(gte=filters.page_from, lte=filters.page_to)
+            ))
+        return models.Filter(must=conditions) if conditions else None
+
+    @staticmethod
+    def point_results(points) -> List[Dict[str, Any]]:
+        return [{
+            "id": point.id,
+            "score": point.score,
+            "payload": point.payload or {}
+        } for point in points]
+
+    def dense_query_params(self, query_vector: List[float], limit: int, collection_name: str, named_vectors: bool,
+                           score_threshold: Optional[float], filters: Optional[SearchFilter],
+                           payload_fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+        params = {
+            "collection_name": collection_name,
+            "query": self.fit_vector(query_vector, self.vector_dimensions.get(collection_name)),
+            "query_filter": self.search_filter(filters),
+            "search_params": self.collection_profile(collection_name).search_params(),
+            "limit": limit,
+            "with_payload": self.payload_selector(payload_fields),
+        }
+        if named_vectors:
+            params["using"] = DENSE_VECTOR_NAME
+        if score_threshold is not None:
+            params["score_threshold"] = score_threshold
+        return params
+
     def search_vectors(self, query_vector: List[float], limit: int = 10,
                        collection_name: Optional[str] = None,
-                       score_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+                       score_threshold: Optional[float] = None,
+                       filters: Optional[SearchFilter] = None,
+                       payload_fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Dense search with query_points.
+
+        Args:
+            filters: Metadata filters, applied by Qdrant during the search.
+            payload_fields: Payload fields to return. None returns the whole payload.
+        """
         if not self.client:
-            logging.error("❌ No Qdrant connection")
+            logger.error("❌ No Qdrant connection")
             return []
 
         try:
             collection = collection_name or self.collection_name
-            search_params = {}
-            if score_threshold is not None:
-                search_params["score_threshold"] = score_threshold
+            response = self.client.query_points(**self.dense_query_params(
+                query_vector, limit, collection, self.is_hybrid_collection(collection),
+                score_threshold, filters, payload_fields
+            ))
+            return self.point_results(response.points)
 
-            results = self.client.search(
-                collection_name=collection,
-                query_vector=query_vector,
-                limit=limit,
-                **search_params
+        except Exception as e:
+            logger.error(f"❌ Error searching vectors: {e}")
+            return []
+
+    async def asearch_vectors(self, query_vector: List[float], limit: int = 10,
+                              collection_name: Optional[str] = None,
+                              score_threshold: Optional[float] = None,
+                              filters: Optional[SearchFilter] = None,
+                              payload_fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not self.async_client:
+            logger.error("❌ No Qdrant connection")
+            return []
+
+        try:
+            collection = collection_name or self.collection_name
+            response = await self.async_client.query_points(**self.dense_query_params(
+                query_vector, limit, collection, await self.ais_hybrid_collection(collection),
+                score_threshold, filters, payload_fields
+            ))
+            return self.point_results(response.points)
+
+        except Exception as e:
+            logger.error(f"❌ Error searching vectors: {e}")
+            return []
+
+    def hybrid_query_params(self, query_vector: List[float], sparse_vector: models.SparseVector,
+                            limit: int, collection_name: Optional[str], filters: Optional[SearchFilter] = None,
+                            payload_fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        collection = collection_name or self.collection_name
+        prefetch_limit = max(limit, app_config.HYBRID_PREFETCH_LIMIT)
+        # Filtering in the prefetches keeps both candidate lists inside the filter before fusion
+        query_filter = self.search_filter(filters)
+        return {
+            "collection_name": collection,
+            "prefetch": [
+                models.Prefetch(query=self.fit_vector(query_vector, self.vector_dimensions.get(collection)),
+                                using=DENSE_VECTOR_NAME, filter=query_filter,
+                                params=self.collection_profile(collection).search_params(), limit=prefetch_limit),
+                models.Prefetch(query=sparse_vector, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=prefetch_limit),
+            ],
+            # Reciprocal rank fusion of the dense and sparse candidate lists
+            "query": models.FusionQuery(fusion=models.Fusion.RRF),
+            "limit": limit,
+            "with_payload": self.payload_selector(payload_fields),
+        }
+
+    def hybrid_search_vectors(self, query_vector: List[float], sparse_vector: models.SparseVector,
+                              limit: int = 10, collection_name: Optional[str] = None,
+                              filters: Optional[SearchFilter] = None,
+                              payload_fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Search dense and sparse vectors and fuse both rankings with reciprocal rank fusion."""
+        if not self.client:
+            logger.error("❌ No Qdrant connection")
+            return []
+
+        try:
+            self.is_hybrid_collection(collection_name)
+            response = self.client.query_points(
+                **self.hybrid_query_params(query_vector, sparse_vector, limit, collection_name, filters, payload_fields)
             )
+            return self.point_results(response.points)
+        except Exception as e:
+            logger.error(f"❌ Error in hybrid search: {e}")
+            return []
 
-            return [{
-                "id": result.id,
-                "score": result.score,
-                "payload": result.payload
-            } for result in results]
+    async def ahybrid_search_vectors(self, query_vector: List[float], sparse_vector: models.SparseVector,
+                                     limit: int = 10, collection_name: Optional[str] = None,
+                                     filters: Optional[SearchFilter] = None,
+                                     payload_fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not self.async_client:
+            logger.error("❌ No Qdrant connection")
+            return []
 
+        try:
+            await self.ais_hybrid_collection(collection_name)
+            response = await self.async_client.query_points(
+                **self.hybrid_query_params(query_vector, sparse_vector, limit, collection_name, filters, payload_fields)
+            )
+            return self.point_results(response.points)
         except Exception as e:
-            logging.error(f"❌ Error searching vectors: {e}")
+            logger.error(f"❌ Error in hybrid search: {e}")
             return []
 
-    def delete_vectors(self, point_ids: List[int], collection_name: Optional[str] = None) -> bool:
+    def fetch_payloads(self, point_ids: List[Union[int, str]], payload_fields: Optional[Sequence[str]] = None,
+                       collection_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Payloads of the given points by id (as str), without vectors."""
+        if not self.client or not point_ids:
+            return {}
+
+        try:
+            points = self.client.retrieve(
+                collection_name=collection_name or self.collection_name,
+                ids=point_ids,
+                with_payload=self.payload_selector(payload_fields),
+                with_vectors=False,
+            )
+            return {str(point.id): point.payload or {} for point in points}
+        except Exception as e:
+            logger.error(f"❌ Error fetching payloads: {e}")
+            return {}
+
+    async def afetch_payloads(self, point_ids: List[Union[int, str]], payload_fields: Optional[Sequence[str]] = None,
+                              collection_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        if not self.async_client or not point_ids:
+            return {}
+
+        try:
+            points = await self.async_client.retrieve(
+                collection_name=collection_name or self.collection_name,
+                ids=point_ids,
+                with_payload=self.payload_selector(payload_fields),
+                with_vectors=False,
+            )
+            return {str(point.id): point.payload or {} for point in points}
+        except Exception as e:
+            logger.error(f"❌ Error fetching payloads: {e}")
+            return {}
+
+    def delete_vectors(self, point_ids: List[Union[int, str]], collection_name: Optional[str] = None) -> bool:
         if not self.client:
-            logging.error("❌ No Qdrant connection")
+            logger.error("❌ No Qdrant connection")
             return False
 
         try:
@@ -230,77 +968,74 @@ class QdrantHandler:
                 collection_name=collection,
                 points_selector=models.PointIdsList(points=point_ids)
             )
-            logging.info(f"✅ Successfully deleted {len(point_ids)} vectors")
+            logger.info(f"✅ Successfully deleted {len(point_ids)} vectors")
             return True
         except Exception as e:
-            logging.error(f"❌ Error deleting vectors: {e}")
+            logger.error(f"❌ Error deleting vectors: {e}")
             return False
 
     def get_collection_info(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
         if not self.client:
-            logging.error("❌ No Qdrant connection")
+            logger.error("❌ No Qdrant connection")
             return {}
 
         try:
             collection = collection_name or self.collection_name
             info = self.client.get_collection(collection_name=collection)
+            vectors_config = info.config.params.vectors
+            if isinstance(vectors_config, dict):
+                vectors_config = vectors_config[DENSE_VECTOR_NAME]
             return {
-                "name": info.name,
-                "vector_size": info.vectors_config.size,
-                "distance": info.vectors_config.distance,
-                "points_count": info.points_count
+                "name": collection,
+                "vector_size": vectors_config.size,
+                "distance": vectors_config.distance,
+                "points_count": info.points_count,
+                "hybrid": bool(info.config.params.sparse_vectors),
+                "on_disk": bool(vectors_config.on_disk),
+                "quantization": info.config.quantization_config,
+                "hnsw": info.config.hnsw_config
             }
         except Exception as e:
-            logging.error(f"❌ Error getting collection info: {e}")
+            logger.error(f"❌ Error getting collection info: {e}")
             return {}
 
-    def save_text_to_qdrant(self, id: int, text: str, metadata: dict = {}, collection_name: Optional[str] = None) -> bool:
+    def save_text_to_qdrant(self, id: Union[int, str], text: str, metadata: dict = {}, collection_name: Optional[str] = None) -> bool:
         """Embed the text and store it in Qdrant."""
-        vector = self.get_embedding(text)
+        vector = self.build_vectors([text], collection_name)[0]
         return self.insert_vectors([{
             "id": id,
             "vector": vector,
             "payload": {
                 "text": text,
+                "preview": self.preview_text(text),
                 **metadata
             }
         }], collection_name)
 
-    def search_similar_texts(self, query: str, limit: int = 7) -> List[Dict[str, Any]]:
-        """
-        Search Qdrant for texts similar to the input query and rerank them using a reranker.
-
-        Args:
-            query (str): The user query for similarity search.
-            limit (int): Number of initial candidates to retrieve. Default is 7.
-
-        Returns:
-            List[Dict[str, Any]]: Reranked list of documents with score, id, payload, and text.
-        """
-        # Step 1: Embed the query
-        query_vector = self.get_embedding(query)
-
-        # Step 2: Search vector DB
-        results = self.search_vectors(query_vector=query_vector, limit=limit)
+    def rerank_results(self, query: str, results: List[Dict[str, Any]], top_k: int = 5,
+                       model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rerank vector search results with the cross-encoder (default the first-stage one) and keep the top_k."""
         if not results:
             return []
 
-        # Step 3: Format results into reranker-friendly format
+        # Format results into reranker-friendly format; without text the chunk preview is reranked
         passages = [
             {
                 "id": str(doc["id"]),
-                "text": doc["payload"]["text"],
-                "meta": {k: v for k, v in doc["payload"].items() if k != "text"}
+                "text": doc["payload"].get("text") or doc["payload"].get("preview", ""),
+                "meta": {k: v for k, v in doc["payload"].items() if k not in ("text", "preview")}
             }
             for doc in results
         ]
         rerank_request = RerankRequest(query=query, passages=passages)
-        reranked = self.reranker.rerank(rerank_request)
-        reranked = reranked[0:5]
-        for i in reranked:
-            print(i.get("text"))
-            print("--------------------------------")
-        final_results = [
+        ranker = self.rerank_model(model) if model else self.reranker
+        reranked = ranker.rerank(rerank_request)
+        reranked = reranked[0:top_k]
+        if logger.isEnabledFor(TRACE):
+            trace(logger, "retrieval.reranked", query=query, passages=[
+                {"id": item.get("id"), "score": float(item.get("score")), "text": item.get("text")} for item in reranked
+            ])
+        return [
             {
                 "score": item.get("score"),
                 "id": item.get("id"),
@@ -309,16 +1044,172 @@ class QdrantHandler:
             }
             for item in reranked
         ]
-        return final_results
 
+    @staticmethod
+    def dense_results(results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """The top_k search results in dense order, shaped like rerank_results output."""
+        return [
+            {
+                "score": doc["score"],
+                "id": str(doc["id"]),
+                "text": doc["payload"].get("text") or doc["payload"].get("preview", ""),
+                "payload": {k: v for k, v in doc["payload"].items() if k not in ("text", "preview")}
+            }
+            for doc in results[:top_k]
+        ]
+
+    def adaptive_rerank(self, query: str, results: List[Dict[str, Any]], hybrid: bool = False,
+                        start: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Rerank the candidates as rerank_policy decides: keep a confident dense order,
+        rerank with the small model, and cascade ambiguous sets to the large model,
+        within the latency budget counted from start.
+        """
+        if not results:
+            return []
+        decision, reranked = self.rerank_decision(query, results, hybrid, start)
+        RERANK_DECISIONS.labels(decision).inc()
+        if logger.isEnabledFor(TRACE):
+            trace(logger, "retrieval.rerank_decision", query=query, decision=decision, candidates=len(results))
+        return reranked
+
+    def rerank_decision(self, query: str, results: List[Dict[str, Any]], hybrid: bool = False,
+                        start: Optional[float] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        policy = self.rerank_policy
+        if policy.should_skip(results, hybrid):
+            return "skip", self.dense_results(results, policy.top_k)
 
-    def close_connection(self):
-        if self.client:
-            self.client.close()
-            self.client = None
-            logging.info("🔒 Qdrant connection closed")
-        else:
-            logging.info("ℹ️ No active Qdrant connection to close")
+        deadline = policy.deadline(time.perf_counter() if start is None else start)
+        if not policy.fits_budget(policy.model, len(results), deadline, time.perf_counter()):
+            return "budget", self.dense_results(results, policy.top_k)
+        started = time.perf_counter()
+        reranked = self.rerank_results(query, results, top_k=len(results), model=policy.model)
+        policy.record_cost(policy.model, len(results), time.perf_counter() - started)
+        if not policy.is_ambiguous(reranked):
+            return "rerank", reranked[:policy.top_k]
+
+        shortlist = reranked[:policy.cascade_candidates]
+        if not policy.fits_budget(policy.cascade_model, len(shortlist), deadline, time.perf_counter()):
+            return "cascade_budget", reranked[:policy.top_k]
+        started = time.perf_counter()
+        refined = self.rerank_results(query, [
+            {"id": item["id"], "score": item["score"], "payload": {**item["payload"], "text": item["text"]}}
+            for item in shortlist
+        ], top_k=policy.top_k, model=policy.cascade_model)
+        policy.record_cost(policy.cascade_model, len(shortlist), time.perf_counter() - started)
+        return "cascade", refined
+
+    @staticmethod
+    def candidate_fields(text_after_rerank: bool) -> List[str]:
+        """Payload fields fetched per candidate: what rerank and citations need."""
+        fields = list(app_config.SEARCH_PAYLOAD_FIELDS)
+        if text_after_rerank:
+            fields = [field for field in fields if field != "text"] + ["preview"]
+        return fields
 
-    def __del__(self):
+    @staticmethod
+    def final_ids(reranked: List[Dict[str, Any]], candidates: List[Dict[str, Any]]) -> List[Union[int, str]]:
+        # The reranker returns ids as str; Qdrant needs the original (int or UUID) ids back
+        ids = {str(doc["id"]): doc["id"] for doc in candidates}
+        return [ids[item["id"]] for item in reranked]
+
+    @staticmethod
+    def with_texts(reranked: List[Dict[str, Any]], payloads: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for item in reranked:
+            text = payloads.get(item["id"], {}).get("text")
+            if text is not None:
+                item["text"] = text
+        return reranked
+
+    def search_similar_texts(self, query: str, limit: Optional[int] = None, hybrid: Optional[bool] = None,
+                             filters: Optional[SearchFilter] = None,
+                             text_after_rerank: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Search Qdrant for texts similar to the input query and rerank them using a reranker.
+
+        Args:
+            query (str): The user query for similarity search.
+            limit (Optional[int]): Number of initial candidates to retrieve. Defaults to RERANK_CANDIDATES.
+            hybrid (Optional[bool]): Fuse dense and sparse retrieval. Defaults to HYBRID_SEARCH.
+            filters (Optional[SearchFilter]): Metadata filters, applied by Qdrant during the search.
+            text_after_rerank (Optional[bool]): Rerank on chunk previews and fetch the full text of the
+                final top-k only. Defaults to SEARCH_TEXT_AFTER_RERANK.
+
+        Returns:
+            List[Dict[str, Any]]: Reranked list of documents with score, id, payload, and text.
+        """
+        start = time.perf_counter()
+        limit = limit or self.rerank_policy.candidates
+        hybrid = self.use_hybrid(hybrid, self.is_hybrid_collection())
+        text_after_rerank = app_config.SEARCH_TEXT_AFTER_RERANK if text_after_rerank is None else text_after_rerank
+        fields = self.candidate_fields(text_after_rerank)
+
+        # Step 1: Embed the query
+        with RETRIEVAL_STAGE_LATENCY.labels("embed").time():
+            query_vector = self.get_query_embedding(query)
+            sparse_vector = self.get_sparse_query_embedding(query) if hybrid else None
+
+        # Step 2: Search vector DB
+        with RETRIEVAL_STAGE_LATENCY.labels("search").time():
+            if hybrid:
+                results = self.hybrid_search_vectors(query_vector, sparse_vector, limit=limit,
+                                                     filters=filters, payload_fields=fields)
+            else:
+                results = self.search_vectors(query_vector=query_vector, limit=limit,
+                                              filters=filters, payload_fields=fields)
+
+        # Step 3: Rerank the candidates, as far as the rerank policy finds it worth it
+        with RETRIEVAL_STAGE_LATENCY.labels("rerank").time():
+            reranked = self.adaptive_rerank(query, results, hybrid, start)
+
+        # Step 4: Fetch the full text of the final top-k
+        if text_after_rerank and reranked:
+            with RETRIEVAL_STAGE_LATENCY.labels("fetch").time():
+                reranked = self.with_texts(reranked, self.fetch_payloads(self.final_ids(reranked, results), ["text"]))
+        return reranked
+
+    async def asearch_similar_texts(self, query: str, limit: Optional[int] = None, hybrid: Optional[bool] = None,
+                                    filters: Optional[SearchFilter] = None,
+                                    text_after_rerank: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Async counterpart of search_similar_texts; model work runs on the bounded executor."""
+        start = time.perf_counter()
+        limit = limit or self.rerank_policy.candidates
+        hybrid = self.use_hybrid(hybrid, await self.ais_hybrid_collection())
+        text_after_rerank = app_config.SEARCH_TEXT_AFTER_RERANK if text_after_rerank is None else text_after_rerank
+        fields = self.candidate_fields(text_after_rerank)
+
+        with RETRIEVAL_STAGE_LATENCY.labels("embed").time():
+            query_vector = await self.aget_query_embedding(query)
+            sparse_vector = await self.run_blocking(self.get_sparse_query_embedding, query) if hybrid else None
+
+        with RETRIEVAL_STAGE_LATENCY.labels("search").time():
+            if hybrid:
+                results = await self.ahybrid_search_vectors(query_vector, sparse_vector, limit=limit,
+                                                            filters=filters, payload_fields=fields)
+            else:
+                results = await self.asearch_vectors(query_vector=query_vector, limit=limit,
+                                                     filters=filters, payload_fields=fields)
+        if not results:
+            return []
+
+        with RETRIEVAL_STAGE_LATENCY.labels("rerank").time():
+            reranked = await self.run_blocking(self.adaptive_rerank, query, results, hybrid, start)
+
+        if text_after_rerank and reranked:
+            with RETRIEVAL_STAGE_LATENCY.labels("fetch").time():
+                payloads = await self.afetch_payloads(self.final_ids(reranked, results), ["text"])
+            reranked = self.with_texts(reranked, payloads)
+        return reranked
+
+    async def aclose_connection(self):
+        if self.embedding_batcher:
+            await self.embedding_batcher.close()
+        self.embedding_cache.close()
         self.close_connection()
+
+    def close_connection(self):
+        """Release this handler; the shared clients are closed by (a)close_qdrant_clients()."""
+        self.client = None
+        self.async_client = None
+        # Queued model work is dropped, running calls finish in their threads
+        self.executor.shutdown(wait=False, cancel_futures=True)
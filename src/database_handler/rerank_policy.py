@@ -0,0 +1,72 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.app_config import app_config
+
+
+class RerankPolicy:
+    """
+    Decides how much reranking a candidate set gets.
+
+    - candidates: how many results the vector search fetches for reranking
+    - skip: when the top dense hit leads the runner-up by skip_gap (and scores at
+      least skip_score), the dense order is kept and the cross-encoder is not run.
+      Only applies to dense cosine scores; RRF scores of hybrid search are ranks.
+    - cascade: the small model (RERANK_MODEL) reranks first; when its top two
+      scores are within cascade_margin, the large model reranks the top
+      cascade_candidates again
+    - budget: a stage is skipped when its expected cost, learned per model and
+      passage, would overrun budget_ms counted from the start of the call
+    """
+
+    def __init__(self, candidates: Optional[int] = None, top_k: Optional[int] = None,
+                 skip_gap: Optional[float] = None, skip_score: Optional[float] = None,
+                 model: Optional[str] = None, cascade_model: Optional[str] = None,
+                 cascade_margin: Optional[float] = None, cascade_candidates: Optional[int] = None,
+                 budget_ms: Optional[float] = None):
+        self.candidates = candidates or app_config.RERANK_CANDIDATES
+        self.top_k = top_k or app_config.RERANK_TOP_K
+        self.skip_gap = app_config.RERANK_SKIP_GAP if skip_gap is None else skip_gap
+        self.skip_score = app_config.RERANK_SKIP_SCORE if skip_score is None else skip_score
+        self.model = model or app_config.RERANK_MODEL
+        self.cascade_model = cascade_model or app_config.RERANK_CASCADE_MODEL
+        self.cascade_margin = app_config.RERANK_CASCADE_MARGIN if cascade_margin is None else cascade_margin
+        self.cascade_candidates = cascade_candidates or app_config.RERANK_CASCADE_CANDIDATES
+        self.budget_ms = app_config.RERANK_BUDGET_MS if budget_ms is None else budget_ms
+        # model -> moving average of seconds per reranked passage
+        self.costs: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def should_skip(self, results: List[Dict[str, Any]], hybrid: bool) -> bool:
+        """Whether the dense ranking is confident enough to return as is."""
+        if hybrid or self.skip_gap is None or not results:
+            return False
+        top = results[0]["score"]
+        runner_up = results[1]["score"] if len(results) > 1 else 0.0
+        return top >= (self.skip_score or 0.0) and top - runner_up >= self.skip_gap
+
+    def is_ambiguous(self, reranked: List[Dict[str, Any]]) -> bool:
+        """Whether the small model's top two are too close to call, so the large model should decide."""
+        if not self.cascade_model or len(reranked) < 2:
+            return False
+        return float(reranked[0]["score"]) - float(reranked[1]["score"]) < self.cascade_margin
+
+    def fits_budget(self, model: str, passages: int, deadline: Optional[float], now: float) -> bool:
+        """Whether reranking passages with model is expected to finish before the deadline."""
+        if deadline is None:
+            return True
+        cost = self.costs.get(model)
+        # Without a measurement yet, run the stage if any time is left
+        expected = cost * passages if cost is not None else 0.0
+        return now + expected <= deadline
+
+    def record_cost(self, model: str, passages: int, seconds: float):
+        if not passages:
+            return
+        per_passage = seconds / passages
+        with self.lock:
+            previous = self.costs.get(model)
+            self.costs[model] = per_passage if previous is None else 0.8 * previous + 0.2 * per_passage
+
+    def deadline(self, start: float) -> Optional[float]:
+        return start + self.budget_ms / 1000 if self.budget_ms else None
@@ -0,0 +1,172 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from qdrant_client.http import models
+from qdrant_client.http.models import Distance, VectorParams
+
+from src.app_config import app_config
+from src.database_handler.qdrant_handler import QdrantHandler
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Semantic answer cache stored in a dedicated Qdrant collection.
+
+    A question whose embedding is within `threshold` cosine similarity of a cached
+    question gets the cached answer back. Entries expire after `ttl` seconds, the
+    collection is capped at `max_entries` (oldest evicted first) and the whole
+    cache is dropped by QdrantHandler.invalidate_answer_cache() whenever the
+    knowledge base is re-indexed.
+    """
+
+    def __init__(self, qdrant_db: QdrantHandler, collection_name: Optional[str] = None,
+                 threshold: Optional[float] = None, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        self.qdrant_db = qdrant_db
+        self.collection_name = collection_name or qdrant_db.answer_cache_collection
+        self.threshold = threshold or app_config.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = app_config.SEMANTIC_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or app_config.SEMANTIC_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+
+    def collection_config(self, vector_size: int):
+        return {
+            "collection_name": self.collection_name,
+            "vectors_config": VectorParams(size=vector_size, distance=Distance.COSINE),
+        }
+
+    def freshness_filter(self) -> Optional[models.Filter]:
+        if not self.ttl:
+            return None
+        return models.Filter(must=[
+            models.FieldCondition(key="created_at", range=models.Range(gte=time.time() - self.ttl))
+        ])
+
+    def make_point(self, question: str, answer: str, vector):
+        return models.PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vector,
+            payload={"question": question, "answer": answer, "created_at": time.time()},
+        )
+
+    def record(self, answer: Optional[str]) -> Optional[str]:
+        if answer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return answer
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def ensure_collection(self, vector_size: int):
+        """
+        Create the cache collection, sized like the query embeddings it will store.
+
+        Concurrent stores may all find it missing; the ones that lose the creation race
+        get an error from Qdrant, which is fine as long as the collection now exists.
+        Creating the payload index again is a no-op, so every creator runs it.
+        """
+        client = self.qdrant_db.client
+        if client.collection_exists(self.collection_name):
+            return
+        try:
+            client.create_collection(**self.collection_config(vector_size))
+            logger.info(f"✅ Answer cache collection '{self.collection_name}' created")
+        except Exception:
+            if not client.collection_exists(self.collection_name):
+                raise
+        client.create_payload_index(self.collection_name, "created_at", models.PayloadSchemaType.FLOAT)
+
+    async def aensure_collection(self, vector_size: int):
+        client = self.qdrant_db.async_client
+        if await client.collection_exists(self.collection_name):
+            return
+        try:
+            await client.create_collection(**self.collection_config(vector_size))
+            logger.info(f"✅ Answer cache collection '{self.collection_name}' created")
+        except Exception:
+            if not await client.collection_exists(self.collection_name):
+                raise
+        await client.create_payload_index(self.collection_name, "created_at", models.PayloadSchemaType.FLOAT)
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Return a cached answer for a semantically equivalent question, if any."""
+        try:
+            vector = self.qdrant_db.get_query_embedding(question)
+            results = self.qdrant_db.client.query_points(
+                collection_name=self.collection_name,
+                query=vector,
+                query_filter=self.freshness_filter(),
+                limit=1,
+                score_threshold=self.threshold,
+                with_payload=["answer"],
+            ).points
+        except Exception as e:
+            # A missing collection (never filled or just invalidated) is a plain miss
+            logger.debug(f"Answer cache lookup failed: {e}")
+            return self.record(None)
+        return self.record(results[0].payload["answer"] if results else None)
+
+    async def alookup(self, question: str) -> Optional[str]:
+        try:
+            vector = await self.qdrant_db.aget_query_embedding(question)
+            results = (await self.qdrant_db.async_client.query_points(
+                collection_name=self.collection_name,
+                query=vector,
+                query_filter=self.freshness_filter(),
+                limit=1,
+                score_threshold=self.threshold,
+                with_payload=["answer"],
+            )).points
+        except Exception as e:
+            logger.debug(f"Answer cache lookup failed: {e}")
+            return self.record(None)
+        return self.record(results[0].payload["answer"] if results else None)
+
+    def store(self, question: str, answer: str):
+        try:
+            vector = self.qdrant_db.get_query_embedding(question)
+            self.ensure_collection(len(vector))
+            self.qdrant_db.client.upsert(self.collection_name, points=[self.make_point(question, answer, vector)])
+            self.evict()
+        except Exception as e:
+            logger.error(f"❌ Error storing answer in cache: {e}")
+
+    async def astore(self, question: str, answer: str):
+        try:
+            vector = await self.qdrant_db.aget_query_embedding(question)
+            await self.aensure_collection(len(vector))
+            await self.qdrant_db.async_client.upsert(
+                self.collection_name, points=[self.make_point(question, answer, vector)]
+            )
+            await self.aevict()
+        except Exception as e:
+            logger.error(f"❌ Error storing answer in cache: {e}")
+
+    def evict(self):
+        """Delete the oldest entries beyond max_entries."""
+        client = self.qdrant_db.client
+        excess = client.count(self.collection_name, exact=True).count - self.max_entries
+        if excess > 0:
+            points, _ = client.scroll(
+                self.collection_name, limit=excess, order_by="created_at", with_payload=False
+            )
+            client.delete(self.collection_name, points_selector=models.PointIdsList(points=[p.id for p in points]))
+
+    async def aevict(self):
+        client = self.qdrant_db.async_client
+        excess = (await client.count(self.collection_name, exact=True)).count - self.max_entries
+        if excess > 0:
+            points, _ = await client.scroll(
+                self.collection_name, limit=excess, order_by="created_at", with_payload=False
+            )
+            await client.delete(
+                self.collection_name, points_selector=models.PointIdsList(points=[p.id for p in points])
+            )
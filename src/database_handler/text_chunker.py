@@ -0,0 +1,109 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from src.app_config import app_config
+
+HEADING_PATTERN = re.compile(r"^#{1,6}[ \t]+(.+?)[ \t]*$", re.MULTILINE)
+PAGE_HEADING_PATTERN = re.compile(r"^Page\s+(\d+)$", re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r"\S+")
+
+
+class TextChunker:
+    """
+    Split markdown documents into retrieval-sized chunks.
+
+    Markdown headings (including the "## Page N" headings emitted by
+    DataParser.pdf_to_markdown) are used as natural boundaries. Small sections on
+    the same page are merged, and sections longer than chunk_size tokens are split
+    into overlapping token windows. Every chunk keeps its character offsets into the
+    original document.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None):
+        self.chunk_size = chunk_size or app_config.CHUNK_SIZE
+        self.chunk_overlap = app_config.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        if self.chunk_overlap >= self.chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
+    def split_sections(self, content: str) -> List[Dict[str, Any]]:
+        """Split a markdown document at its headings, tracking the current page."""
+        boundaries = [match.start() for match in HEADING_PATTERN.finditer(content)]
+        if not boundaries or boundaries[0] != 0:
+            boundaries.insert(0, 0)
+        boundaries.append(len(content))
+
+        sections = []
+        page = None
+        for start, end in zip(boundaries, boundaries[1:]):
+            heading = None
+            match = HEADING_PATTERN.match(content, start)
+            if match:
+                heading = match.group(1)
+                page_match = PAGE_HEADING_PATTERN.match(heading)
+                if page_match:
+                    page = int(page_match.group(1))
+            text = content[start:end]
+            if not text.strip():
+                continue
+            sections.append({
+                "start_offset": start,
+                "end_offset": end,
+                "heading": heading,
+                "page": page,
+                "tokens": [(m.start() + start, m.end() + start) for m in TOKEN_PATTERN.finditer(text)],
+            })
+        return sections
+
+    def merge_sections(self, sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge consecutive small sections of the same page up to chunk_size tokens."""
+        merged = []
+        for section in sections:
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None
+                and previous["page"] == section["page"]
+                and len(previous["tokens"]) + len(section["tokens"]) <= self.chunk_size
+            ):
+                previous["end_offset"] = section["end_offset"]
+                previous["tokens"].extend(section["tokens"])
+            else:
+                merged.append(dict(section, tokens=list(section["tokens"])))
+        return merged
+
+    def split_window(self, section: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Split a section into overlapping token windows."""
+        tokens = section["tokens"]
+        if len(tokens) <= self.chunk_size:
+            return [{k: v for k, v in section.items() if k != "tokens"}]
+
+        windows = []
+        step = self.chunk_size - self.chunk_overlap
+        for begin in range(0, len(tokens), step):
+            window = tokens[begin:begin + self.chunk_size]
+            windows.append({
+                "start_offset": window[0][0],
+                "end_offset": window[-1][1],
+                "heading": section["heading"],
+                "page": section["page"],
+            })
+            if begin + self.chunk_size >= len(tokens):
+                break
+        return windows
+
+    def chunk(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Chunk a markdown document.
+
+        Returns:
+            List[Dict[str, Any]]: Chunks with chunk_index, text, start_offset,
+            end_offset, heading and page (None if the document has no page headings).
+        """
+        chunks = []
+        for section in self.merge_sections(self.split_sections(content)):
+            for window in self.split_window(section):
+                chunks.append({
+                    "chunk_index": len(chunks),
+                    "text": content[window["start_offset"]:window["end_offset"]],
+                    **window,
+                })
+        return chunks
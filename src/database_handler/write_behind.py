@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+from contextlib import suppress
+from typing import Callable, List, Optional
+
+from src.app_config import app_config
+from src.database_handler.async_mongo_handler import AsyncMemoryHandler
+from src.schema import ConversationInfor, UserThread
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSpill:
+    """
+    Durable overflow of the write-behind queue: one JSON line per update in a local file.
+
+    Updates that find the queue full, and updates still unwritten at shutdown, are
+    kept here instead of being dropped, and written back (oldest first) once the
+    queue has drained. The file survives restarts, so a later process picks up what
+    an earlier one could not write.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or app_config.CONVERSATION_WRITE_SPILL_PATH
+        self.count: Optional[int] = None
+
+    def read_lines(self) -> List[str]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return [line for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def write_lines(self, lines: List[str]):
+        if not lines:
+            with suppress(FileNotFoundError):
+                os.remove(self.path)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+
+    def size(self) -> int:
+        if self.count is None:
+            self.count = len(self.read_lines())
+        return self.count
+
+    def append(self, conversations: List[ConversationInfor], front: bool = False):
+        """Persist updates after the spilled ones, or before them for updates that are older (front=True)."""
+        lines = [conversation.model_dump_json() + "\n" for conversation in conversations]
+        if front:
+            lines.extend(self.read_lines())
+            self.write_lines(lines)
+            self.count = len(lines)
+            return
+        count = self.size()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.count = count + len(lines)
+
+    def peek(self, limit: int) -> List[ConversationInfor]:
+        return [ConversationInfor.model_validate_json(line) for line in self.read_lines()[:limit]]
+
+    def discard(self, n: int):
+        """Remove the n oldest updates, once they are written."""
+        lines = self.read_lines()[n:]
+        self.write_lines(lines)
+        self.count = len(lines)
+
+
+class ConversationWriteBehind:
+    """
+    Write-behind queue for conversation updates.
+
+    Updates are queued and written by a background worker in bulk_write batches,
+    once max_batch_size updates are pending or flush_interval_ms has passed since
+    the first one. No update is ever dropped: a failed batch is retried with
+    backoff until it is written, and back-pressure stays bounded because submit()
+    waits at most submit_timeout seconds for room and then appends the update to
+    a ConversationSpill file, which the worker writes back once the queue is
+    empty. While the spill holds updates, new ones go there too, so each thread
+    keeps its message order. close() spills whatever it could not write in time.
+    Delivery is at least once: an update interrupted mid-write may be written twice.
+    on_flush is called with the threads of each written batch; it must only
+    schedule follow-up work, never run it, so it cannot hold up the writes.
+    """
+
+    def __init__(self, handler: AsyncMemoryHandler,
+                 on_flush: Optional[Callable[[List[UserThread]], None]] = None,
+                 max_batch_size: Optional[int] = None, flush_interval_ms: Optional[float] = None,
+                 max_queue_size: Optional[int] = None, retry_backoff_ms: Optional[float] = None,
+                 submit_timeout: Optional[float] = None, spill: Optional[ConversationSpill] = None):
+        self.handler = handler
+        self.on_flush = on_flush
+        self.max_batch_size = max_batch_size or app_config.CONVERSATION_WRITE_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or app_config.CONVERSATION_WRITE_FLUSH_MS) / 1000
+        self.max_queue_size = max_queue_size or app_config.CONVERSATION_WRITE_QUEUE_SIZE
+        self.retry_backoff = (retry_backoff_ms or app_config.CONVERSATION_WRITE_RETRY_MS) / 1000
+        self.submit_timeout = app_config.CONVERSATION_WRITE_SUBMIT_TIMEOUT if submit_timeout is None else submit_timeout
+        self.spill = spill or ConversationSpill()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        # The batch the worker is collecting or writing, spilled if shutdown interrupts it
+        self.inflight: List[ConversationInfor] = []
+        self.batches = 0
+        self.written = 0
+        self.retries = 0
+        self.spilled = 0
+
+    def ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        if self.worker is None or self.worker.done():
+            self.worker = loop.create_task(self.run())
+
+    async def submit(self, conversation_infor: ConversationInfor) -> bool:
+        """
+        Queue an update. Waits up to submit_timeout while the queue is full, then spills
+        the update to disk instead; returns False when it was spilled.
+        """
+        self.ensure_worker()
+        if not self.spill.size():
+            try:
+                await asyncio.wait_for(self.queue.put(conversation_infor), self.submit_timeout)
+                return True
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Conversation write queue full ({self.max_queue_size}), spilling updates to "
+                               f"{self.spill.path}")
+        self.spill.append([conversation_infor])
+        self.spilled += 1
+        return False
+
+    async def collect(self) -> List[ConversationInfor]:
+        batch = self.inflight = [await self.queue.get()]
+        deadline = self.loop.time() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self.loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        while True:
+            if self.queue.empty() and self.spill.size():
+                await self.replay()
+                continue
+            batch = await self.collect()
+            await self.write(batch)
+            self.inflight = []
+            for _ in batch:
+                self.queue.task_done()
+
+    async def replay(self):
+        """Write the oldest spilled updates, removing them from the spill once written."""
+        batch = self.spill.peek(self.max_batch_size)
+        await self.write(batch)
+        self.spill.discard(len(batch))
+        logger.info(f"✅ Wrote {len(batch)} spilled conversation updates, {self.spill.size()} left")
+
+    async def write(self, batch: List[ConversationInfor]):
+        """Write a batch, retrying with backoff (capped at 30s) until every update applied."""
+        pending = self.handler.merge_conversations(batch)
+        threads = [conversation.user_thread_infor for conversation in pending]
+        backoff = self.retry_backoff
+        attempts = 0
+        while pending:
+            if attempts:
+                self.retries += 1
+            attempts += 1
+            try:
+                # Updates rejected because the thread changed under them are retried on a fresh read
+                pending = await self.handler.bulk_append(pending)
+            except Exception as e:
+                logger.error(f"❌ Conversation batch write of {len(pending)} updates failed "
+                             f"(attempt {attempts}), retrying in {backoff:.1f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+        self.batches += 1
+        self.written += len(batch)
+        if self.on_flush:
+            try:
+                self.on_flush(threads)
+            except Exception as e:
+                logger.error(f"❌ Error after conversation flush: {e}")
+
+    def pending(self) -> int:
+        return (self.queue.qsize() if self.queue else 0) + self.spill.size()
+
+    def stats(self):
+        return {
+            "pending": self.pending(),
+            "batches": self.batches,
+            "written": self.written,
+            "retries": self.retries,
+            "spilled": self.spilled,
+        }
+
+    async def close(self, timeout: Optional[float] = None):
+        """
+        Flush everything queued, waiting at most timeout seconds, then stop the worker.
+        Updates still unwritten go to the spill, ahead of those already there.
+        """
+        timeout = app_config.CONVERSATION_WRITE_SHUTDOWN_TIMEOUT if timeout is None else timeout
+        if self.queue is not None and self.worker is not None:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        if self.worker is not None:
+            self.worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.worker
+            self.worker = None
+        unwritten, self.inflight = self.inflight, []
+        while self.queue is not None and not self.queue.empty():
+            unwritten.append(self.queue.get_nowait())
+        for _ in unwritten:
+            self.queue.task_done()
+        if unwritten:
+            self.spill.append(unwritten, front=True)
+            self.spilled += len(unwritten)
+            logger.warning(f"⚠️ Shutdown flush timed out, spilled {len(unwritten)} conversation updates to "
+                           f"{self.spill.path}")
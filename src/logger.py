@@ -0,0 +1,91 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from src.app_config import app_config
+
+# Debug-only events: disabled unless LOG_LEVEL=TRACE, and free when disabled
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the record's structured fields merged in."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Enqueue records without blocking the caller; drop them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level: Optional[str] = None, sample_rate: Optional[float] = None,
+                  json_format: Optional[bool] = None) -> QueueListener:
+    """
+    Route all logging through a bounded queue drained by a background thread.
+
+    The calling thread only formats the message and enqueues it; the stdout write
+    happens on the listener thread. Returns the started listener, which must be
+    stopped on shutdown to flush pending records.
+    """
+    level = (level or app_config.LOG_LEVEL).upper()
+    sample_rate = app_config.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    json_format = app_config.LOG_JSON if json_format is None else json_format
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter() if json_format else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=app_config.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(TRACE if level == "TRACE" else getattr(logging, level, logging.INFO))
+
+    listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def trace(logger: logging.Logger, event: str, **fields: Any):
+    """Emit a debug trace event; a single level check when tracing is disabled."""
+    if logger.isEnabledFor(TRACE):
+        logger.log(TRACE, event, extra={"fields": fields})
@@ -1,11 +1,14 @@
+import asyncio
 import json
+import logging
 import sys
 import time
+from contextlib import asynccontextmanager, suppress
 
 import psutil
 import uvicorn
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from src.app_config import app_config
@@ -13,11 +16,65 @@ from pydantic import BaseModel
 from fastapi import Body
 from fastapi import Query
 from pydantic import BaseModel
+from src.database_handler.qdrant_handler import QdrantHandler
+from src.logger import setup_logging
 from src.main_agent import ReactAgent
+from src.metrics import ASK_LATENCY, FIRST_TOKEN_LATENCY, IN_FLIGHT, render_metrics
 from src.schema import UserQuestion, MessageResponse
 
-app = FastAPI()
-agent = ReactAgent()
+log_listener = setup_logging()
+# Built in lifespan(), so importing the app opens no connections
+agent: Optional[ReactAgent] = None
+if app_config.PRELOAD_MODELS:
+    # Load at import so a pre-forking server (gunicorn --preload) shares one copy across workers;
+    # the models are kept in the shared registry the agent's handler loads from
+    preloader = QdrantHandler()
+    preloader.load_models()
+    preloader.embedding_cache.close()
+    preloader.close_connection()
+
+startup_state = {"ready": False, "startup_seconds": None, "error": None}
+
+
+def process_stats() -> dict:
+    process = psutil.Process()
+    return {
+        "uptime_seconds": round(time.time() - process.create_time(), 2),
+        "rss_mb": round(process.memory_info().rss / 1024 / 1024, 1),
+    }
+
+
+async def warm_up():
+    """
+    Connect to the databases and load the models in the background, so the server
+    binds and answers liveness checks meanwhile.
+    """
+    try:
+        await agent.astart()
+        await agent.qdrant_db.run_blocking(agent.qdrant_db.load_models)
+        startup_state["ready"] = True
+        startup_state["startup_seconds"] = round(time.time() - psutil.Process().create_time(), 2)
+        stats = process_stats()
+        logging.info(f"✅ Ready after {startup_state['startup_seconds']}s, RSS {stats['rss_mb']} MB")
+    except Exception as e:
+        startup_state["error"] = str(e)
+        logging.error(f"❌ Warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global agent
+    agent = ReactAgent()
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up_task
+    await agent.aclose()
+    log_listener.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 # question = "What’s the heaviest load you’ll need to lift?"
 # question = UserQuestion(question=question)
 # print(agent.process_question(question))
@@ -28,10 +85,33 @@ async def root():
     return {"message": "AI Agent platform is running v1!", "datetime": current_time}
 
 
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and the event loop is responsive."""
+    return {"status": "alive", **process_stats()}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: databases are connected and models are loaded and warmed up."""
+    body = {**startup_state, **process_stats()}
+    if not startup_state["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics."""
+    body, content_type = render_metrics(agent.cache_stats())
+    return Response(content=body, media_type=content_type)
+
+
 @app.post("/ask")
 async def ask(request: UserQuestion):
     try:
-        ans = agent.process_question(request)
+        with IN_FLIGHT.labels("/ask").track_inprogress(), ASK_LATENCY.labels("/ask").time():
+            ans = await agent.aprocess_question(request)
         agent_response = {
             "response": ans,
         }
@@ -39,5 +119,31 @@ async def ask(request: UserQuestion):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_stream(request: UserQuestion):
+    async def event_source():
+        start = time.perf_counter()
+        first_token = True
+        with IN_FLIGHT.labels("/ask/stream").track_inprogress():
+            try:
+                async for event in agent.astream_question(request):
+                    if first_token and event["event"] == "token":
+                        FIRST_TOKEN_LATENCY.observe(time.perf_counter() - start)
+                        first_token = False
+                    yield format_sse(event["event"], event["data"])
+            except Exception as e:
+                yield format_sse("error", {"detail": str(e)})
+        ASK_LATENCY.labels("/ask/stream").observe(time.perf_counter() - start)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=7888, reload=True)
+    uvicorn.run(app, host="0.0.0.0", port=7888)
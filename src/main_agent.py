@@ -1,42 +1,229 @@
+import asyncio
+import logging
+from typing import Optional
+
+from langchain_core.messages import AIMessageChunk
+from langchain_core.tools import StructuredTool
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from src.app_config import app_config
+from src.context_packer import ContextPacker
+from src.conversation_memory import ConversationMemory
 from src.schema import (
     UserQuestion,
     MessageResponse,
+    SearchFilter,
+    SearchQuery,
 )
-from src.database_handler.qdrant_handler import QdrantHandler
-from src.prompt import SYSEM_PROMPT
+from src.database_handler.qdrant_handler import QdrantHandler, aclose_qdrant_clients
+from src.database_handler.semantic_cache import SemanticCache
+from src.logger import TRACE, trace
+from src.metrics import AgentRunMetrics
+from src.prompt import CITATION_PROMPT, SYSEM_PROMPT
+
+logger = logging.getLogger(__name__)
+
+
+def describe_message(message) -> dict:
+    """Trace fields of an agent message."""
+    if isinstance(message, tuple):
+        return {"message": str(message)}
+    return {
+        "type": message.type,
+        "content": message.content,
+        "tool_calls": getattr(message, "tool_calls", None),
+    }
+
+
 class ReactAgent:
     def __init__(self):
         self.llm = ChatOpenAI(model=app_config.MODEL_NAME, temperature=0.9)
         self.qdrant_db = QdrantHandler()
-        self.qdrant_db.connect_to_database()
-        self.tools = [self.qdrant_db.search_similar_texts]
+        self.answer_cache = SemanticCache(self.qdrant_db) if app_config.SEMANTIC_CACHE_ENABLED else None
+        self.memory = ConversationMemory(self.llm) if app_config.CONVERSATION_MEMORY_ENABLED else None
+        self.context_packer = ContextPacker() if app_config.CONTEXT_PACKING_ENABLED else None
+        self.background_tasks = set()
+        self.tools = [self.create_search_tool()]
         self.agent = self.create_agent()
 
+    async def astart(self):
+        """
+        Open the connections: the Qdrant clients (the gRPC transport is probed, a blocking
+        call, so it runs on the executor) and MongoDB with its conversation indexes.
+        """
+        await self.qdrant_db.run_blocking(self.qdrant_db.connect_to_database)
+        if self.memory:
+            await self.memory.astart()
+
+    def run_in_background(self, coro):
+        """Schedule work that must not delay the response, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    def search_context(self, query: str, limit: Optional[int] = None, filters: Optional[SearchFilter] = None) -> str:
+        """Search the knowledge base and return the most relevant passages, each with a numbered citation."""
+        results = self.qdrant_db.search_similar_texts(query, limit, filters=filters)
+        return self.context_packer.pack_results(query, results)
+
+    async def asearch_context(self, query: str, limit: Optional[int] = None,
+                              filters: Optional[SearchFilter] = None) -> str:
+        results = await self.qdrant_db.asearch_similar_texts(query, limit, filters=filters)
+        # Tokenizing and sentence matching are CPU-bound
+        return await self.qdrant_db.run_blocking(self.context_packer.pack_results, query, results)
+
+    def create_search_tool(self):
+        # Sync and async implementations behind one tool, so ainvoke never blocks the event loop
+        if self.context_packer:
+            func, coroutine = self.search_context, self.asearch_context
+        else:
+            func, coroutine = self.qdrant_db.search_similar_texts, self.qdrant_db.asearch_similar_texts
+        return StructuredTool.from_function(
+            func=func,
+            coroutine=coroutine,
+            name="search_similar_texts",
+            args_schema=SearchQuery,
+        )
+
     def create_agent(self):
         return create_react_agent(
             self.llm,
             tools=self.tools,
-            prompt=SYSEM_PROMPT,
+            prompt=SYSEM_PROMPT + CITATION_PROMPT if self.context_packer else SYSEM_PROMPT,
         )
 
     def print_stream(self, inputs):
         message = None
-        for s in self.agent.stream(inputs, stream_mode="values"):
+        run_metrics = AgentRunMetrics()
+        for s in self.agent.stream(inputs, stream_mode="values", config={"callbacks": [run_metrics]}):
             message = s["messages"][-1]
-            if isinstance(message, tuple):
-                print(message)
-            else:
-                message.pretty_print()
+            if logger.isEnabledFor(TRACE):
+                trace(logger, "agent.message", **describe_message(message))
+        run_metrics.finish()
         return message.content if message else ""
 
+    async def aprint_stream(self, inputs):
+        message = None
+        run_metrics = AgentRunMetrics()
+        async for s in self.agent.astream(inputs, stream_mode="values", config={"callbacks": [run_metrics]}):
+            message = s["messages"][-1]
+            if logger.isEnabledFor(TRACE):
+                trace(logger, "agent.message", **describe_message(message))
+        run_metrics.finish()
+        return message.content if message else ""
+
+    async def aload_context(self, user_question: UserQuestion):
+        """Thread, rolling summary and recent history of the conversation the question belongs to."""
+        thread = self.memory.thread(user_question) if self.memory else None
+        if thread is None:
+            return None, "", []
+        return (thread, *(await self.memory.aload(thread)))
+
+    def use_answer_cache(self, summary: str, history: list) -> bool:
+        # Follow-up questions depend on earlier turns, so only opening questions are cached
+        return self.answer_cache is not None and not summary and not history
+
     def process_question(self, user_question: UserQuestion) -> MessageResponse:
-        messages = [{"role": "user", "content": user_question.question}]
-        answer = self.print_stream({"messages": messages})
+        """Answer without conversation memory, which is only served by the async paths."""
+        question = user_question.question
+        answer = self.answer_cache.lookup(question) if self.answer_cache else None
+        if answer is None:
+            answer = self.print_stream({"messages": ConversationMemory.build_messages(question)})
+            if self.answer_cache and answer:
+                self.answer_cache.store(question, answer)
         return answer
 
+    async def aprocess_question(self, user_question: UserQuestion) -> MessageResponse:
+        question = user_question.question
+        thread, summary, history = await self.aload_context(user_question)
+        use_cache = self.use_answer_cache(summary, history)
+        answer = await self.answer_cache.alookup(question) if use_cache else None
+        if answer is None:
+            messages = ConversationMemory.build_messages(question, summary, history)
+            answer = await self.aprint_stream({"messages": messages})
+            if use_cache and answer:
+                self.run_in_background(self.answer_cache.astore(question, answer))
+        if thread and answer:
+            # Only queues the turn; spilled to disk if the queue stays full for CONVERSATION_WRITE_SUBMIT_TIMEOUT
+            await self.memory.asave_turn(thread, question, answer)
+        return answer
+
+    async def aclose(self):
+        """
+        Let pending cache writes and queued conversation turns finish, then close the connections.
+        The whole drain is bounded by CONVERSATION_WRITE_SHUTDOWN_TIMEOUT.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + app_config.CONVERSATION_WRITE_SHUTDOWN_TIMEOUT
+        if self.background_tasks:
+            _, unfinished = await asyncio.wait(self.background_tasks, timeout=app_config.CONVERSATION_WRITE_SHUTDOWN_TIMEOUT)
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                logger.error(f"❌ Shutdown timed out, cancelled {len(unfinished)} background tasks")
+        if self.memory:
+            await self.memory.aclose(timeout=max(deadline - loop.time(), 0))
+        await self.qdrant_db.aclose_connection()
+        await aclose_qdrant_clients()
+
+    def cache_stats(self):
+        stats = {"embedding": self.qdrant_db.embedding_cache.stats()}
+        if self.answer_cache:
+            stats["answer"] = self.answer_cache.stats()
+        return stats
+
+    async def astream_question(self, user_question: UserQuestion):
+        """
+        Stream the agent run as events while the graph executes.
+
+        Yields dicts of the form {"event": ..., "data": ...} where event is one of
+        "token" (LLM text delta), "tool_call" (the agent invoked a tool),
+        "tool_result" (a tool finished) and "done" (final answer).
+        """
+        question = user_question.question
+        thread, summary, history = await self.aload_context(user_question)
+        use_cache = self.use_answer_cache(summary, history)
+        if use_cache:
+            cached = await self.answer_cache.alookup(question)
+            if cached is not None:
+                if thread:
+                    await self.memory.asave_turn(thread, question, cached)
+                yield {"event": "token", "data": {"content": cached}}
+                yield {"event": "done", "data": {"response": cached, "cached": True}}
+                return
+
+        messages = ConversationMemory.build_messages(question, summary, history)
+        answer = ""
+        run_metrics = AgentRunMetrics()
+        async for mode, chunk in self.agent.astream(
+            {"messages": messages}, stream_mode=["messages", "updates"], config={"callbacks": [run_metrics]}
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if isinstance(message, AIMessageChunk) and message.content and metadata.get("langgraph_node") == "agent":
+                    yield {"event": "token", "data": {"content": message.content}}
+                continue
+
+            for node, update in chunk.items():
+                if not isinstance(update, dict):
+                    continue
+                for message in update.get("messages", []):
+                    if node == "agent":
+                        for tool_call in getattr(message, "tool_calls", None) or []:
+                            yield {"event": "tool_call", "data": {"name": tool_call["name"], "args": tool_call["args"]}}
+                        if not getattr(message, "tool_calls", None):
+                            answer = message.content
+                    elif node == "tools":
+                        yield {"event": "tool_result", "data": {"name": message.name, "status": getattr(message, "status", "success")}}
+
+        run_metrics.finish()
+        if use_cache and answer:
+            self.run_in_background(self.answer_cache.astore(question, answer))
+        if thread and answer:
+            await self.memory.asave_turn(thread, question, answer)
+        yield {"event": "done", "data": {"response": answer}}
+
 
 
 # agent = ReactAgent()
@@ -0,0 +1,104 @@
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+import psutil
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+ASK_LATENCY = Histogram(
+    "chatbot_ask_latency_seconds", "Total latency of an ask request.", ["endpoint"], buckets=LATENCY_BUCKETS
+)
+FIRST_TOKEN_LATENCY = Histogram(
+    "chatbot_first_token_latency_seconds", "Time until the first streamed token.", buckets=LATENCY_BUCKETS
+)
+LLM_STEP_LATENCY = Histogram(
+    "chatbot_llm_step_seconds", "Latency of a single LLM call inside the ReAct loop.", buckets=LATENCY_BUCKETS
+)
+REACT_ITERATIONS = Histogram(
+    "chatbot_react_iterations", "LLM calls per answered question.", buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 25)
+)
+TOOL_LATENCY = Histogram(
+    "chatbot_tool_call_seconds", "Latency of a tool call.", ["tool"], buckets=LATENCY_BUCKETS
+)
+RETRIEVAL_STAGE_LATENCY = Histogram(
+    "chatbot_retrieval_stage_seconds", "Latency of a retrieval stage in search_similar_texts.", ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+RERANK_DECISIONS = Counter(
+    "chatbot_rerank_decisions", "Rerank policy decisions: skip, budget, rerank, cascade_budget, cascade.", ["decision"]
+)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 1500, 2500, 5000, 10000, 20000)
+CONTEXT_TOKENS = Histogram(
+    "chatbot_context_tokens", "Tokens of a search tool result, raw (serialized results) or packed.", ["kind"],
+    buckets=TOKEN_BUCKETS,
+)
+CONTEXT_TOKENS_SAVED = Histogram(
+    "chatbot_context_tokens_saved", "Prompt tokens saved by packing a search tool result.", buckets=TOKEN_BUCKETS
+)
+IN_FLIGHT = Gauge("chatbot_requests_in_flight", "Ask requests currently being served.", ["endpoint"])
+PROCESS_RSS = Gauge("chatbot_process_rss_bytes", "Resident set size of the API process.")
+CACHE_HITS = Gauge("chatbot_cache_hits", "Cache hits since process start.", ["cache"])
+CACHE_MISSES = Gauge("chatbot_cache_misses", "Cache misses since process start.", ["cache"])
+CACHE_HIT_RATIO = Gauge("chatbot_cache_hit_ratio", "Cache hit ratio since process start.", ["cache"])
+
+
+class AgentRunMetrics(BaseCallbackHandler):
+    """LangChain callback recording LLM step and tool call latency for one agent run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.started: Dict[UUID, float] = {}
+        self.tools: Dict[UUID, str] = {}
+        self.llm_calls = 0
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs: Any):
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs: Any):
+        self.started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        started = self.started.pop(run_id, None)
+        if started is not None:
+            self.llm_calls += 1
+            LLM_STEP_LATENCY.observe(time.perf_counter() - started)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self.started.pop(run_id, None)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+        self.started[run_id] = time.perf_counter()
+        self.tools[run_id] = (serialized or {}).get("name", "unknown")
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any):
+        started = self.started.pop(run_id, None)
+        tool = self.tools.pop(run_id, "unknown")
+        if started is not None:
+            TOOL_LATENCY.labels(tool).observe(time.perf_counter() - started)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self.on_tool_end(None, run_id=run_id)
+
+    def finish(self):
+        """Record the number of ReAct iterations (LLM calls) of the run."""
+        if self.llm_calls:
+            REACT_ITERATIONS.observe(self.llm_calls)
+
+
+def update_cache_metrics(name: str, stats: Dict[str, Any]):
+    CACHE_HITS.labels(name).set(stats.get("hits", 0))
+    CACHE_MISSES.labels(name).set(stats.get("misses", 0))
+    CACHE_HIT_RATIO.labels(name).set(stats.get("hit_rate", 0.0))
+
+
+def render_metrics(cache_stats: Dict[str, Dict[str, Any]]):
+    """Refresh scrape-time gauges and return (body, content type) in the Prometheus text format."""
+    PROCESS_RSS.set(psutil.Process().memory_info().rss)
+    for name, stats in cache_stats.items():
+        update_cache_metrics(name, stats)
+    return generate_latest(), CONTENT_TYPE_LATEST
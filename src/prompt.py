@@ -2,4 +2,18 @@ SYSEM_PROMPT="""
 You are an Chani.AI Agent a customer service chatbot who help to answer the question related to companies context product.
 For any question, please use the following tools to retrieve information as the context then answer based on the context.
 - search_similar_texts: search information from database
-"""
\ No newline at end of file
+"""
+# Appended to SYSEM_PROMPT when search results are packed with citations (CONTEXT_PACKING_ENABLED)
+CITATION_PROMPT="""Passages come with numbered citations such as [1]; cite the numbers of the passages you used.
+"""
+SUMMARY_PROMPT="""
+Update the running summary of a customer service conversation with the new messages below.
+Keep the facts the customer gave, the products and questions discussed and any open issues.
+Answer with the updated summary only, in at most 200 words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+"""
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 from datetime import datetime
 
@@ -12,6 +12,31 @@ class InitializeMessageRequest(BaseModel):
 
 class UserQuestion(BaseModel):
     question: str
+    user_id: Optional[str] = None
+    thread_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def thread_needs_user(self):
+        # Threads are namespaced per user; without a user_id callers would share one namespace
+        if self.thread_id and not self.user_id:
+            raise ValueError("user_id is required when thread_id is given")
+        return self
+
+
+class SearchFilter(BaseModel):
+    product_line: Optional[List[str]] = Field(default=None, description="Only documents of these product lines.")
+    language: Optional[List[str]] = Field(default=None, description="Only documents in these languages.")
+    document_type: Optional[List[str]] = Field(default=None, description="Only these document types: pdf, xlsx, markdown.")
+    filename: Optional[List[str]] = Field(default=None, description="Only these source files.")
+    doc_id: Optional[List[str]] = Field(default=None, description="Only these documents.")
+    page_from: Optional[int] = Field(default=None, description="First page to search.")
+    page_to: Optional[int] = Field(default=None, description="Last page to search.")
+
+
+class SearchQuery(BaseModel):
+    query: str = Field(description="The user query for similarity search.")
+    limit: Optional[int] = Field(default=None, description="Number of initial candidates to retrieve (default RERANK_CANDIDATES).")
+    filters: Optional[SearchFilter] = Field(default=None, description="Optional metadata filters for the search.")
 
 class AskResponse(BaseModel):
     response: str
@@ -36,3 +61,15 @@ class Message(BaseModel):
     role: str
     content: str
 
+
+
+
+class UserThread(BaseModel):
+    user_id: str
+    thread_id: str
+    agent_name: str
+
+
+class ConversationInfor(BaseModel):
+    user_thread_infor: UserThread
+    messages: List[Message]
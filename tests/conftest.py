@@ -0,0 +1,35 @@
+import hashlib
+
+import pytest
+from qdrant_client import QdrantClient
+
+from src.app_config import app_config
+from src.database_handler import qdrant_handler
+from src.database_handler.embedding_backend import EmbeddingBackend
+from src.database_handler.qdrant_handler import QdrantHandler
+
+VECTOR_SIZE = 16
+
+
+class FakeEmbedding(EmbeddingBackend):
+    """Deterministic vectors derived from the text, so the tests need no embedding model."""
+
+    name = "fake"
+
+    def encode(self, texts, batch_size=32):
+        return [
+            [byte / 255 - 0.5 for byte in hashlib.sha256(text.encode("utf-8")).digest()[:VECTOR_SIZE]]
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def qdrant_db(monkeypatch, tmp_path):
+    """QdrantHandler on an in-process Qdrant with fake embeddings and a scratch index manifest."""
+    monkeypatch.setattr(app_config, "INDEX_MANIFEST_PATH", str(tmp_path / "index_manifest.json"))
+    handler = QdrantHandler()
+    monkeypatch.setitem(qdrant_handler.shared_models, handler.embedding_key, FakeEmbedding())
+    handler.client = QdrantClient(":memory:")
+    yield handler
+    handler.client.close()
+    handler.executor.shutdown()
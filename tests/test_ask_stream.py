@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+class StreamingAgent:
+    """astream_question stand-in that replays fixed events, then optionally fails."""
+
+    def __init__(self, events=(), error=None):
+        self.events = events
+        self.error = error
+
+    async def astream_question(self, request):
+        for event in self.events:
+            yield event
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    from src import main
+
+    def post(agent):
+        monkeypatch.setattr(main, "agent", agent)
+        return TestClient(main.app).post("/ask/stream", json={"question": "Wie schwer?"})
+    return post
+
+
+def parse(body):
+    frames = body.split("\n\n")
+    assert frames.pop() == ""
+    parsed = []
+    for frame in frames:
+        event, data = frame.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        parsed.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+def test_events_are_framed_one_per_message(stream):
+    events = [
+        {"event": "tool_call", "data": {"name": "search", "args": {"query": "Gewicht"}}},
+        {"event": "token", "data": {"content": "Zwölf\nkg"}},
+        {"event": "done", "data": {"response": "Zwölf\nkg"}},
+    ]
+    response = stream(StreamingAgent(events))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    # Newlines inside the payload stay escaped, non-ASCII text is sent as is
+    assert "Zwölf\\nkg" in response.text
+    assert parse(response.text) == [(event["event"], event["data"]) for event in events]
+
+
+def test_failure_mid_stream_ends_with_an_error_event(stream):
+    events = [{"event": "token", "data": {"content": "Zw"}}]
+    response = stream(StreamingAgent(events, error=RuntimeError("LLM unavailable")))
+    assert parse(response.text) == [("token", {"content": "Zw"}), ("error", {"detail": "LLM unavailable"})]
@@ -0,0 +1,97 @@
+import pytest
+import pytest_asyncio
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import UpdateOne
+
+from src.database_handler.async_mongo_handler import AsyncMemoryHandler
+from src.schema import ConversationInfor, Message, UserThread
+
+THREAD = UserThread(user_id="u1", thread_id="t1", agent_name="test")
+
+
+@pytest_asyncio.fixture
+async def memory():
+    """AsyncMemoryHandler on an in-memory MongoDB: windows of 4 messages, archive buckets of 3."""
+    handler = AsyncMemoryHandler("test", "conversations", client=AsyncMongoMockClient(),
+                                 archive_collection_name="archive", max_messages=4, archive_bucket_size=3)
+    handler.connect_to_database()
+    await handler.create_indexes()
+    return handler
+
+
+def turn(*contents, thread=THREAD):
+    return ConversationInfor(
+        user_thread_infor=thread,
+        messages=[Message(role="user" if i % 2 == 0 else "assistant", content=c) for i, c in enumerate(contents)],
+    )
+
+
+def contents(messages):
+    return [message["content"] for message in messages]
+
+
+async def buckets(memory):
+    return [(bucket["first_index"], bucket["count"]) async for bucket in memory.archive.find({}).sort("first_index", 1)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_append_trims_window_into_archive_buckets(memory):
+    for n in range(0, 10, 2):
+        assert await memory.bulk_append([turn(f"m{n}", f"m{n + 1}")]) == []
+
+    conversation = await memory.retrieve_conversation(THREAD)
+    assert contents(conversation["messages"]) == ["m6", "m7", "m8", "m9"]
+    assert conversation["message_count"] == 10
+    # Buckets start at multiples of the bucket size, whatever the size of the appends
+    assert await buckets(memory) == [(0, 3), (3, 3)]
+    assert contents(await memory.retrieve_archived_messages(THREAD)) == [f"m{n}" for n in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_append_writes_one_update_per_thread(memory):
+    other = UserThread(user_id="u2", thread_id="t2", agent_name="test")
+    batch = memory.merge_conversations([turn("a0", "a1"), turn("b0", "b1", thread=other), turn("a2", "a3")])
+    assert await memory.bulk_append(batch) == []
+    assert contents((await memory.retrieve_conversation(THREAD))["messages"]) == ["a0", "a1", "a2", "a3"]
+    assert contents((await memory.retrieve_conversation(other))["messages"]) == ["b0", "b1"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_append_lost_race_is_retried_without_archiving_twice(memory):
+    await memory.bulk_append([turn("m0", "m1", "m2", "m3")])
+    bulk_write = memory.collection.bulk_write
+
+    async def racing_bulk_write(operations, **kwargs):
+        # Another writer appends to the thread between bulk_append's read and its write
+        memory.collection.bulk_write = bulk_write
+        await memory.insert_or_update_conversation(turn("x0", "x1"))
+        return await bulk_write(operations, **kwargs)
+
+    memory.collection.bulk_write = racing_bulk_write
+    update = turn("m4", "m5")
+    assert await memory.bulk_append([update]) == [update]
+    assert await memory.bulk_append([update]) == []
+
+    conversation = await memory.retrieve_conversation(THREAD)
+    assert contents(conversation["messages"]) == ["x0", "x1", "m4", "m5"]
+    assert conversation["message_count"] == 8
+    assert contents(await memory.retrieve_archived_messages(THREAD)) == ["m0", "m1", "m2", "m3"]
+
+
+@pytest.mark.asyncio
+async def test_repeated_archive_updates_are_ignored(memory):
+    messages = [{"role": "user", "content": f"m{n}"} for n in range(5)]
+    operations = [UpdateOne(query, update, upsert=True) for query, update in memory.archive_updates(THREAD, messages, 0)]
+    await memory.archive_trimmed(operations)
+    await memory.archive_trimmed(operations)
+    assert await buckets(memory) == [(0, 3), (3, 2)]
+    assert contents(await memory.retrieve_archived_messages(THREAD)) == contents(messages)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_conversation_slices_latest_messages(memory):
+    await memory.bulk_append([turn("m0", "m1", "m2")])
+    # MongoDB also returns the other fields next to a $slice projection; mongomock only returns the sliced one
+    assert contents((await memory.retrieve_conversation(THREAD, last_n=2))["messages"]) == ["m1", "m2"]
+    assert contents((await memory.retrieve_conversation(THREAD))["messages"]) == ["m0", "m1", "m2"]
+    assert await memory.retrieve_conversation(UserThread(user_id="u1", thread_id="none", agent_name="test")) == {}
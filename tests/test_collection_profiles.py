@@ -0,0 +1,54 @@
+from qdrant_client.http import models
+
+from src.database_handler.collection_profiles import get_collection_profile, profile_for_collection
+
+SCALAR = models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8))
+BINARY = models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+
+
+def collection_config(quantization=None, m=16):
+    return models.CollectionConfig.model_construct(
+        params=models.CollectionParams(vectors=models.VectorParams(size=256, distance=models.Distance.COSINE)),
+        hnsw_config=models.HnswConfig(m=m, ef_construct=100, full_scan_threshold=10000),
+        quantization_config=quantization,
+    )
+
+
+def test_profile_is_read_from_the_collection_config():
+    config = collection_config(BINARY, m=8)
+    vectors = models.VectorParams(size=256, distance=models.Distance.COSINE, on_disk=True)
+    profile = profile_for_collection(vectors, config)
+    assert (profile.quantization, profile.on_disk, profile.hnsw_m, profile.dimensions) == ("binary", True, 8, 256)
+    assert profile.search_params().quantization.oversampling == 3.0
+
+
+def test_per_vector_settings_override_the_collection():
+    vectors = models.VectorParams(size=256, distance=models.Distance.COSINE, quantization_config=SCALAR,
+                                  hnsw_config=models.HnswConfigDiff(m=4))
+    profile = profile_for_collection(vectors, collection_config())
+    assert (profile.quantization, profile.hnsw_m, profile.hnsw_ef_construct) == ("scalar", 4, 100)
+
+
+def test_manifest_hint_only_supplies_matching_search_settings():
+    vectors = models.VectorParams(size=256, distance=models.Distance.COSINE)
+    assert profile_for_collection(vectors, collection_config(SCALAR), hint="compact").search_params().hnsw_ef == 64
+    # A stale hint does not make searches of an unquantized collection ask for rescoring
+    assert profile_for_collection(vectors, collection_config(), hint="binary").search_params() is None
+
+
+def test_searches_use_the_config_of_their_collection(qdrant_db, monkeypatch):
+    qdrant_db.create_collection("kb", hybrid=False, profile="default")
+    info = qdrant_db.client.get_collection("kb")
+    info.config.quantization_config = BINARY
+    monkeypatch.setattr(qdrant_db.client, "get_collection", lambda collection_name: info)
+
+    # A fresh handler (another process) with another configured profile reads the collection's own config
+    handler = type(qdrant_db)()
+    handler.client = qdrant_db.client
+    handler.profile = get_collection_profile("scalar")
+    assert not handler.is_hybrid_collection("kb")
+    binary = handler.dense_query_params([0.0] * 16, 5, "kb", False, None, None, None)["search_params"]
+    assert binary.quantization.oversampling == 3.0
+    unknown = handler.dense_query_params([0.0] * 16, 5, "other_kb", False, None, None, None)["search_params"]
+    assert unknown.quantization.oversampling == 2.0
+    handler.executor.shutdown()
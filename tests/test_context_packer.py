@@ -0,0 +1,37 @@
+from src.context_packer import ContextPacker
+
+QUERY = "What torque for the M8 bolt?"
+MANUAL = {
+    "text": "The M8 bolt needs 25 Nm of torque. Clean the thread first. Lunch is at noon.",
+    "payload": {"filename": "manual.pdf", "page": 3, "heading": "Page 3"},
+}
+PARTS = {
+    "text": "Apply torque evenly. The M8 bolt needs 25 Nm of torque.",
+    "payload": {"filename": "parts.xlsx", "sheet": "Bolts"},
+}
+
+
+def packer(max_tokens=1000):
+    packer = ContextPacker(model_name="gpt-4o", max_tokens=max_tokens, max_sentences=6, dedupe_threshold=0.8)
+    # Whitespace tokens keep the budget arithmetic independent of the tokenizer
+    packer.count_tokens = lambda text: len(text.split())
+    return packer
+
+
+def test_dedupe_drops_near_duplicates_of_better_ranked_passages():
+    duplicate = dict(MANUAL, text=MANUAL["text"] + " Noon.")
+    assert packer().dedupe([MANUAL, duplicate, PARTS]) == [MANUAL, PARTS]
+
+
+def test_pack_keeps_query_sentences_once_with_numbered_citations():
+    assert packer().pack(QUERY, [MANUAL, PARTS]) == (
+        "[1] manual.pdf, p. 3, Page 3\nThe M8 bolt needs 25 Nm of torque.\n\n"
+        "[2] parts.xlsx, sheet Bolts\nApply torque evenly."
+    )
+
+
+def test_pack_stops_at_the_token_budget():
+    assert packer(max_tokens=15).pack(QUERY, [MANUAL, PARTS]) == (
+        "[1] manual.pdf, p. 3, Page 3\nThe M8 bolt needs 25 Nm of torque."
+    )
+    assert packer(max_tokens=5).pack(QUERY, [MANUAL, PARTS]) == "No relevant information found."
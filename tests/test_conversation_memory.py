@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from src.conversation_memory import ConversationMemory
+from src.database_handler.async_mongo_handler import AsyncMemoryHandler
+from src.database_handler.write_behind import ConversationSpill
+from src.schema import UserQuestion, UserThread
+
+THREAD = UserThread(user_id="u1", thread_id="t1", agent_name="test")
+
+
+class BlockingLLM:
+    """ainvoke stand-in that waits until released, like a slow summarization call."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        await self.release.wait()
+        return SimpleNamespace(content="summary")
+
+
+@pytest.fixture
+def memory(tmp_path):
+    async_handler = AsyncMemoryHandler("test", "conversations", client=AsyncMongoMockClient())
+    async_handler.connect_to_database()
+    memory = ConversationMemory(BlockingLLM(), async_handler=async_handler, window=2, summary_min_messages=2)
+    memory.writer.spill = ConversationSpill(str(tmp_path / "spill.jsonl"))
+    return memory
+
+
+@pytest.mark.asyncio
+async def test_summaries_run_outside_the_write_path(memory):
+    turns = [memory.turn(THREAD, "q1", "a1"), memory.turn(THREAD, "q2", "a2")]
+    # Returns while the summarization LLM call is still blocked
+    await asyncio.wait_for(memory.writer.write(turns), 1)
+    while not memory.llm.prompts:
+        await asyncio.sleep(0.01)
+    assert memory.writer.stats()["written"] == 2
+
+    memory.llm.release.set()
+    await asyncio.wait_for(memory.summarizer, 1)
+    conversation = await memory.async_handler.retrieve_conversation(THREAD)
+    assert conversation["summary"] == "summary" and conversation["summarized_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_close_abandons_pending_summaries(memory):
+    await memory.writer.write([memory.turn(THREAD, "q1", "a1"), memory.turn(THREAD, "q2", "a2")])
+    summarizer = memory.summarizer
+    # The blocked LLM call does not hold up shutdown
+    await asyncio.wait_for(memory.aclose(timeout=0.05), 1)
+    assert summarizer.cancelled()
+    assert memory.summarizer is None and not memory.summary_queue
+
+
+def test_threads_are_namespaced_per_user(memory):
+    with pytest.raises(ValueError):
+        UserQuestion(question="hi", thread_id="t1")
+    assert memory.thread(UserQuestion(question="hi")) is None
+    thread = memory.thread(UserQuestion(question="hi", user_id="u2", thread_id="t1"))
+    assert (thread.user_id, thread.thread_id) == ("u2", "t1")
@@ -0,0 +1,21 @@
+import os
+
+import pymupdf
+
+from src.database_handler.data_parser import convert_pages
+
+
+def test_cmyk_images_are_saved_as_rgb(tmp_path):
+    cmyk = pymupdf.Pixmap(pymupdf.csCMYK, pymupdf.IRect(0, 0, 8, 8), False)
+    cmyk.set_rect(cmyk.irect, (0, 255, 255, 0))
+    with pymupdf.open() as doc:
+        doc.new_page().insert_image(pymupdf.Rect(0, 0, 50, 50), pixmap=cmyk)
+        doc.save(str(tmp_path / "red.pdf"))
+
+    images_dir = str(tmp_path / "images")
+    assert convert_pages(str(tmp_path / "red.pdf"), str(tmp_path / "red.md"), images_dir, 0, 1) == (1, 1)
+    [name] = os.listdir(images_dir)
+    assert name.endswith(".png")
+    image = pymupdf.Pixmap(os.path.join(images_dir, name))
+    assert image.colorspace.name == "DeviceRGB"
+    assert name in (tmp_path / "red.md").read_text(encoding="utf-8")
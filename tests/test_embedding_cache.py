@@ -0,0 +1,64 @@
+from src.database_handler import embedding_cache
+from src.database_handler.embedding_cache import EmbeddingCache, SQLiteEmbeddingStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lookups_normalize_the_query_text():
+    cache = EmbeddingCache(max_size=10, ttl=0)
+    cache.set("How do I  reset the pump?", [1.0])
+    assert cache.get("how do i reset the pump") == [1.0]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EmbeddingCache(max_size=2, ttl=0)
+    cache.set("a", [1.0])
+    cache.set("b", [2.0])
+    assert cache.get("a") == [1.0]
+    cache.set("c", [3.0])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0] and cache.get("c") == [3.0]
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(embedding_cache.time, "time", clock)
+    cache = EmbeddingCache(max_size=10, ttl=60)
+    cache.set("a", [1.0])
+    clock.now += 59
+    assert cache.get("a") == [1.0]
+    clock.now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_local_only_probes_do_not_count_misses():
+    cache = EmbeddingCache(max_size=10, ttl=0)
+    assert cache.get("a", local_only=True) is None
+    assert cache.get("a") is None
+    cache.set("a", [1.0])
+    assert cache.get("a", local_only=True) == [1.0]
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "max_size": 10, "hit_rate": 0.5}
+
+
+def test_store_backs_the_lru_and_honours_ttl(monkeypatch, tmp_path):
+    clock = Clock()
+    monkeypatch.setattr(embedding_cache.time, "time", clock)
+    store = SQLiteEmbeddingStore(str(tmp_path / "cache.sqlite3"))
+    cache = EmbeddingCache(namespace="model", max_size=10, ttl=60, store=store)
+    cache.set("a", [0.5, 0.25])
+    cache.clear()
+    assert cache.get("a", local_only=True) is None
+    assert cache.get("a") == [0.5, 0.25]
+    cache.clear()
+    clock.now += 61
+    assert cache.get("a") is None
+    assert EmbeddingCache(namespace="other", max_size=10, ttl=0, store=store).get("a") is None
+    cache.close()
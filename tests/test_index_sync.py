@@ -0,0 +1,84 @@
+import os
+
+from openpyxl import Workbook
+
+from src.database_handler.index_manifest import IndexManifest
+from src.database_handler.ingest_pipeline import IngestPipeline
+from src.database_handler.semantic_cache import SemanticCache
+
+COLLECTION = "sync_test"
+
+
+def write_sources(directory):
+    with open(os.path.join(directory, "guide.md"), "w", encoding="utf-8") as f:
+        f.write("# Guide\n\nThe pump must be primed before the first start.\n")
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Parts"
+    sheet.append(["part", "price"])
+    sheet.append(["impeller", "42"])
+    workbook.save(os.path.join(directory, "parts.xlsx"))
+
+
+def filenames(qdrant_db):
+    points, _ = qdrant_db.client.scroll(COLLECTION, with_payload=["filename"], limit=100)
+    return {point.payload["filename"] for point in points}
+
+
+def test_markdown_and_ingest_syncs_share_a_collection(qdrant_db, tmp_path):
+    write_sources(tmp_path)
+    manifest_path = str(tmp_path / "manifest.json")
+    qdrant_db.create_collection(COLLECTION, hybrid=False)
+    pipeline = IngestPipeline(qdrant_db)
+
+    assert qdrant_db.sync_markdown_directory(str(tmp_path), COLLECTION, manifest_path)["added"] == 1
+    assert pipeline.ingest_directory(str(tmp_path), COLLECTION, manifest_path)["added"] == 1
+    assert filenames(qdrant_db) == {"guide.md", "parts.xlsx"}
+
+    # Each sync leaves the files of the other source alone
+    markdown_stats = qdrant_db.sync_markdown_directory(str(tmp_path), COLLECTION, manifest_path)
+    ingest_stats = pipeline.ingest_directory(str(tmp_path), COLLECTION, manifest_path)
+    assert (markdown_stats["removed"], markdown_stats["unchanged"]) == (0, 1)
+    assert (ingest_stats["removed"], ingest_stats["unchanged"]) == (0, 1)
+    assert filenames(qdrant_db) == {"guide.md", "parts.xlsx"}
+    assert set(IndexManifest(manifest_path).load().entries(COLLECTION)) == {"guide.md", "parts.xlsx"}
+
+    # Removing a markdown file only deletes its own points
+    os.remove(tmp_path / "guide.md")
+    assert qdrant_db.sync_markdown_directory(str(tmp_path), COLLECTION, manifest_path)["removed"] == 1
+    assert filenames(qdrant_db) == {"parts.xlsx"}
+
+
+def test_sync_drops_answer_cache_after_writing(qdrant_db, tmp_path):
+    write_sources(tmp_path)
+    qdrant_db.create_collection(COLLECTION, hybrid=False)
+    cache = SemanticCache(qdrant_db, ttl=0)
+    cache.store("How do I prime the pump?", "Fill the casing first.")
+    assert cache.lookup("How do I prime the pump?") == "Fill the casing first."
+
+    writes = []
+    bulk_insert_points = qdrant_db.bulk_insert_points
+
+    def record_insert(points, collection_name=None):
+        writes.append(qdrant_db.client.collection_exists(cache.collection_name))
+        return bulk_insert_points(points, collection_name)
+
+    qdrant_db.bulk_insert_points = record_insert
+    assert qdrant_db.sync_markdown_directory(str(tmp_path), COLLECTION, str(tmp_path / "manifest.json"))["success"]
+    # The cache was still there while the points were written, and is gone afterwards
+    assert writes == [True]
+    assert not qdrant_db.client.collection_exists(cache.collection_name)
+
+
+
+def test_cache_creation_tolerates_a_concurrent_creator(qdrant_db):
+    cache = SemanticCache(qdrant_db, ttl=0)
+    cache.ensure_collection(16)
+    # A second store saw the collection missing just before the first one created it
+    collection_exists = qdrant_db.client.collection_exists
+    answers = [False]
+    qdrant_db.client.collection_exists = lambda name: answers.pop() if answers else collection_exists(name)
+    cache.ensure_collection(16)
+    assert not answers
+    cache.store("How do I prime the pump?", "Fill the casing first.")
+    assert cache.lookup("How do I prime the pump?") == "Fill the casing first."
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from src.database_handler.micro_batcher import MicroBatcher
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, items):
+        self.calls.append(list(items))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return [item * 10 for item in items]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_call():
+    batch_fn = Recorder()
+    batcher = MicroBatcher(batch_fn, run_inline, max_batch_size=8, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(n) for n in range(5)))
+    assert results == [0, 10, 20, 30, 40]
+    assert batch_fn.calls == [[0, 1, 2, 3, 4]]
+    assert batcher.stats() == {"batches": 1, "items": 5, "mean_batch_size": 5.0}
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_at_max_batch_size():
+    batch_fn = Recorder()
+    batcher = MicroBatcher(batch_fn, run_inline, max_batch_size=2, max_wait_ms=20)
+    assert await asyncio.gather(*(batcher.submit(n) for n in range(5))) == [0, 10, 20, 30, 40]
+    assert batch_fn.calls == [[0, 1], [2, 3], [4]]
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_a_failed_call_fails_every_caller_in_the_batch():
+    batcher = MicroBatcher(Recorder(fail=True), run_inline, max_batch_size=8, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(n) for n in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    await batcher.close()
+
+
+@pytest.mark.asyncio
+async def test_close_fails_queued_and_running_items():
+    started = asyncio.Event()
+
+    async def run_forever(fn, items):
+        started.set()
+        await asyncio.Event().wait()
+
+    batcher = MicroBatcher(Recorder(), run_forever, max_batch_size=1, max_wait_ms=1)
+    running = asyncio.ensure_future(batcher.submit(0))
+    await started.wait()
+    queued = asyncio.ensure_future(batcher.submit(1))
+    await asyncio.sleep(0)
+    await batcher.close()
+    for caller in (running, queued):
+        with pytest.raises(RuntimeError, match="closed"):
+            await asyncio.wait_for(caller, 1)
+    assert not batcher.inflight and not batcher.waiting
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from qdrant_client import QdrantClient
+
+from src.database_handler import qdrant_handler
+from src.database_handler.qdrant_handler import QdrantHandler, close_qdrant_clients
+
+
+class ClosingClient:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_sync_close_works_inside_a_running_loop(monkeypatch):
+    client, async_client = QdrantClient(":memory:"), ClosingClient()
+    monkeypatch.setattr(qdrant_handler, "shared_clients", {"sync": client, "async": async_client})
+    close_qdrant_clients()
+    await asyncio.sleep(0)
+    assert async_client.closed and not qdrant_handler.shared_clients
+
+
+def test_sync_close_without_a_loop(monkeypatch):
+    async_client = ClosingClient()
+    monkeypatch.setattr(qdrant_handler, "shared_clients", {"async": async_client})
+    close_qdrant_clients()
+    assert async_client.closed
+
+
+def test_closing_a_handler_stops_its_model_threads():
+    handler = QdrantHandler()
+    handler.executor.submit(lambda: None).result()
+    handler.close_connection()
+    with pytest.raises(RuntimeError):
+        handler.executor.submit(lambda: None)
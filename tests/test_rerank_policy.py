@@ -0,0 +1,51 @@
+import pytest
+
+from src.database_handler.rerank_policy import RerankPolicy
+
+
+def hits(*scores):
+    return [{"score": score} for score in scores]
+
+
+def test_skip_needs_a_clear_dense_leader():
+    policy = RerankPolicy(skip_gap=0.2, skip_score=0.5)
+    assert policy.should_skip(hits(0.9, 0.6), hybrid=False)
+    assert policy.should_skip(hits(0.9), hybrid=False)
+    assert not policy.should_skip(hits(0.9, 0.8), hybrid=False)
+    assert not policy.should_skip(hits(0.45, 0.1), hybrid=False)
+    # RRF scores are ranks, not similarities
+    assert not policy.should_skip(hits(0.9, 0.6), hybrid=True)
+    assert not policy.should_skip([], hybrid=False)
+
+
+def test_skip_is_off_without_a_gap():
+    assert not RerankPolicy(skip_gap=None).should_skip(hits(0.99, 0.0), hybrid=False)
+
+
+def test_cascade_only_when_the_small_model_is_unsure():
+    policy = RerankPolicy(cascade_model="large", cascade_margin=0.1)
+    assert policy.is_ambiguous(hits(0.55, 0.5))
+    assert not policy.is_ambiguous(hits(0.9, 0.5))
+    assert not policy.is_ambiguous(hits(0.9))
+    assert not RerankPolicy(cascade_model=None).is_ambiguous(hits(0.55, 0.5))
+
+
+def test_budget_uses_the_learned_cost_per_passage():
+    policy = RerankPolicy(budget_ms=100)
+    deadline = policy.deadline(start=10.0)
+    assert deadline == pytest.approx(10.1)
+    # No measurement yet: run while any time is left
+    assert policy.fits_budget("small", 50, deadline, now=10.05)
+    assert not policy.fits_budget("small", 50, deadline, now=10.2)
+    policy.record_cost("small", 10, 0.01)
+    assert policy.costs["small"] == pytest.approx(0.001)
+    assert policy.fits_budget("small", 40, deadline, now=10.05)
+    assert not policy.fits_budget("small", 60, deadline, now=10.05)
+    policy.record_cost("small", 10, 0.06)
+    assert policy.costs["small"] == pytest.approx(0.8 * 0.001 + 0.2 * 0.006)
+
+
+def test_no_budget_means_no_deadline():
+    policy = RerankPolicy(budget_ms=0)
+    assert policy.deadline(start=10.0) is None
+    assert policy.fits_budget("small", 1000, None, now=10.0)
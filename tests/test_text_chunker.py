@@ -0,0 +1,38 @@
+import pytest
+
+from src.database_handler.text_chunker import TextChunker
+
+DOCUMENT = (
+    "# Manual\n"
+    "Intro text.\n"
+    "## Page 1\n"
+    "Alpha beta gamma.\n"
+    "### Safety\n"
+    "Wear gloves.\n"
+    "## Page 2\n"
+    "Delta epsilon.\n"
+)
+
+
+def test_small_sections_merge_within_a_page_only():
+    chunks = TextChunker(chunk_size=50, chunk_overlap=5).chunk(DOCUMENT)
+    assert [(chunk["page"], chunk["heading"]) for chunk in chunks] == [(None, "Manual"), (1, "Page 1"), (2, "Page 2")]
+    assert "Wear gloves." in chunks[1]["text"]
+    assert [chunk["chunk_index"] for chunk in chunks] == [0, 1, 2]
+
+
+def test_chunk_offsets_point_into_the_document():
+    for chunk in TextChunker(chunk_size=50, chunk_overlap=5).chunk(DOCUMENT):
+        assert DOCUMENT[chunk["start_offset"]:chunk["end_offset"]] == chunk["text"]
+
+
+def test_long_sections_split_into_overlapping_windows():
+    content = " ".join(f"w{i}" for i in range(10))
+    chunks = TextChunker(chunk_size=4, chunk_overlap=1).chunk(content)
+    assert [chunk["text"] for chunk in chunks] == ["w0 w1 w2 w3", "w3 w4 w5 w6", "w6 w7 w8 w9"]
+    assert all(chunk["page"] is None and chunk["heading"] is None for chunk in chunks)
+
+
+def test_overlap_must_be_smaller_than_chunk_size():
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=4, chunk_overlap=4)
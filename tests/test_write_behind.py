@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from src.database_handler.mongo_handler import ConversationQueries
+from src.database_handler.write_behind import ConversationSpill, ConversationWriteBehind
+from src.schema import ConversationInfor, Message, UserThread
+
+
+class FailingHandler(ConversationQueries):
+    """bulk_append stand-in that fails a given number of times, or blocks until released."""
+
+    def __init__(self, failures=0, release=None):
+        self.failures = failures
+        self.release = release
+        self.calls = 0
+        self.written = []
+
+    async def bulk_append(self, conversations):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.calls <= self.failures:
+            raise ConnectionError("MongoDB unavailable")
+        self.written.extend(conversation.user_thread_infor.thread_id for conversation in conversations)
+        return []
+
+
+def turn(thread_id="t1"):
+    return ConversationInfor(
+        user_thread_infor=UserThread(user_id="u1", thread_id=thread_id, agent_name="test"),
+        messages=[Message(role="user", content="hi"), Message(role="assistant", content="hello")],
+    )
+
+
+@pytest.fixture
+def spill(tmp_path):
+    return ConversationSpill(str(tmp_path / "spill.jsonl"))
+
+
+async def drained(writer):
+    while writer.pending() or writer.inflight:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_write_retries_until_written(spill):
+    handler = FailingHandler(failures=8)
+    writer = ConversationWriteBehind(handler, retry_backoff_ms=1, spill=spill)
+    await writer.write([turn()])
+    assert handler.calls == 9 and handler.written == ["t1"]
+    assert writer.stats()["written"] == 1 and writer.stats()["retries"] == 8
+
+
+@pytest.mark.asyncio
+async def test_full_queue_spills_and_writes_back_in_order(spill):
+    handler = FailingHandler(release=asyncio.Event())
+    writer = ConversationWriteBehind(handler, max_queue_size=1, max_batch_size=1, submit_timeout=0.05, spill=spill)
+    assert await writer.submit(turn("a"))
+    await asyncio.sleep(0.01)  # the worker takes "a" and blocks in bulk_append
+    assert await writer.submit(turn("b"))
+    assert not await writer.submit(turn("c"))
+    # Once the spill holds updates, new ones follow them there
+    assert not await writer.submit(turn("d"))
+    assert spill.size() == 2 and writer.stats()["spilled"] == 2
+    handler.release.set()
+    await asyncio.wait_for(drained(writer), 1)
+    assert handler.written == ["a", "b", "c", "d"]
+    await writer.close(timeout=0.05)
+    assert spill.size() == 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_spills_unwritten_updates_for_the_next_run(spill):
+    stuck = FailingHandler(release=asyncio.Event())
+    writer = ConversationWriteBehind(stuck, max_batch_size=1, flush_interval_ms=1, spill=spill)
+    assert await writer.submit(turn("a"))
+    assert await writer.submit(turn("b"))
+    await asyncio.sleep(0.01)
+    await writer.close(timeout=0.05)
+    assert writer.worker is None and stuck.written == []
+    assert [conversation.user_thread_infor.thread_id for conversation in spill.peek(10)] == ["a", "b"]
+
+    handler = FailingHandler()
+    restarted = ConversationWriteBehind(handler, spill=ConversationSpill(spill.path))
+    restarted.ensure_worker()
+    await asyncio.wait_for(drained(restarted), 1)
+    assert handler.written == ["a", "b"]
+    await restarted.close(timeout=0.05)